@@ -0,0 +1,146 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark of cache backends for webwhois.
+
+Compares the local memory, file based and SQLite cache backends on operations typical for webwhois,
+i.e. status descriptions, public responses and rendered pages.
+Backends marked as ``-cull`` are smaller than the number of stored values, so their writes include culling.
+Workers run in separate processes, as in uWSGI, sharing the cache where the backend allows it.
+
+Usage:
+    python benchmarks/cache_backends.py [--operations 2000] [--workers 4]
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import django
+from django.conf import settings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PAYLOADS = {
+    'descriptions': {'status{}'.format(i): 'Description of status {}'.format(i) for i in range(20)},
+    'page': b'<html>' + b'x' * 20000 + b'</html>',
+}
+# Size of the culled caches.
+CULL_MAX_ENTRIES = 300
+
+
+def setup(directory: str) -> None:
+    """Configure Django with all the benchmarked cache backends."""
+    options = {'MAX_ENTRIES': 1000000}
+    cull_options = {'MAX_ENTRIES': CULL_MAX_ENTRIES}
+    settings.configure(CACHES={
+        'locmem': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'OPTIONS': options},
+        'file': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                 'LOCATION': os.path.join(directory, 'file'), 'OPTIONS': options},
+        'sqlite': {'BACKEND': 'webwhois.cache.SQLiteCache', 'LOCATION': os.path.join(directory, 'cache.sqlite3'),
+                   'OPTIONS': options},
+        'file-cull': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                      'LOCATION': os.path.join(directory, 'file-cull'), 'OPTIONS': cull_options},
+        'sqlite-cull': {'BACKEND': 'webwhois.cache.SQLiteCache',
+                        'LOCATION': os.path.join(directory, 'cache-cull.sqlite3'), 'OPTIONS': cull_options},
+    })
+    django.setup()
+
+
+def measure(operation: Callable[[int], Any], count: int) -> List[float]:
+    """Return durations of the operation in microseconds."""
+    durations = []
+    for i in range(count):
+        start = time.perf_counter()
+        operation(i)
+        durations.append((time.perf_counter() - start) * 1e6)
+    return durations
+
+
+def run_worker(alias: str, payload: str, count: int) -> Dict[str, List[float]]:
+    """Run operations on the cache and return their durations."""
+    from django.core.cache import caches
+    cache = caches[alias]
+    value = PAYLOADS[payload]
+    pid = os.getpid()
+    return {
+        'set': measure(lambda i: cache.set('{}-{}-{}'.format(payload, pid, i), value), count),
+        'get': measure(lambda i: cache.get('{}-{}-{}'.format(payload, pid, i)), count),
+        'miss': measure(lambda i: cache.get('missing-{}-{}'.format(pid, i)), count),
+        # Values stored by other workers, e.g. public responses.
+        'shared': measure(lambda i: cache.get('shared-{}'.format(i % 100)), count),
+    }
+
+
+def prime_shared(alias: str) -> None:
+    """Store values read by all workers."""
+    from django.core.cache import caches
+    for i in range(100):
+        caches[alias].set('shared-{}'.format(i), PAYLOADS['descriptions'])
+
+
+def count_shared_hits(alias: str) -> int:
+    """Return number of shared values visible to this process."""
+    from django.core.cache import caches
+    return sum(caches[alias].get('shared-{}'.format(i)) is not None for i in range(100))
+
+
+def benchmark(alias: str, payload: str, operations: int, workers: int) -> Tuple[Dict[str, List[float]], int]:
+    """Run the benchmark in worker processes and return merged durations and shared hits in a worker."""
+    context = multiprocessing.get_context('fork')
+    # Shared values are stored by another process, so they're not inherited by workers.
+    primer = context.Process(target=prime_shared, args=(alias, ))
+    primer.start()
+    primer.join()
+    with context.Pool(workers) as pool:
+        results = pool.starmap(run_worker, [(alias, payload, operations)] * workers)
+        hits = pool.apply(count_shared_hits, (alias, ))
+    merged = {key: [d for result in results for d in result[key]] for key in results[0]}
+    return merged, hits
+
+
+def percentile(durations: List[float], value: int) -> float:
+    """Return the percentile of durations."""
+    return statistics.quantiles(durations, n=100)[value - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--operations', type=int, default=2000, help='Number of operations per worker')
+    parser.add_argument('--workers', type=int, default=4, help='Number of worker processes')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        setup(directory)
+        print('{:11} {:13} {:6} {:>10} {:>10} {:>12}'.format('backend', 'payload', 'op', 'p50 [us]', 'p95 [us]',
+                                                             'shared hits'))
+        for alias in ('locmem', 'file', 'sqlite', 'file-cull', 'sqlite-cull'):
+            for payload in PAYLOADS:
+                durations, hits = benchmark(alias, payload, args.operations, args.workers)
+                for operation, values in durations.items():
+                    print('{:11} {:13} {:6} {:10.1f} {:10.1f} {:>12}'.format(
+                        alias, payload, operation, percentile(values, 50), percentile(values, 95),
+                        '{}/100'.format(hits) if operation == 'shared' else ''))
+
+
+if __name__ == '__main__':
+    main()
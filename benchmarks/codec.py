@@ -0,0 +1,87 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark of the codec of registry objects.
+
+Compares size and speed of serialization and deserialization of registry objects
+by the webwhois codec and by pickle, which is used by Django caches by default.
+
+Usage:
+    python benchmarks/codec.py [--repeat 10000]
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+from typing import Any, Callable, Dict
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def get_objects() -> Dict[str, Any]:
+    """Return registry objects used in tests."""
+    from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
+    fixtures = GetRegistryObjectMixin()
+    return {
+        'domain': fixtures._get_domain(),
+        'contact': fixtures._get_contact(),
+        'nsset': fixtures._get_nsset(),
+        'keyset': fixtures._get_keyset(),
+        'registrar': fixtures._get_registrar(),
+        'statuses': fixtures._get_contact_status(),
+    }
+
+
+def measure(operation: Callable[[], Any], repeat: int) -> float:
+    """Return mean duration of the operation in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        operation()
+    return (time.perf_counter() - start) * 1e6 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10000, help='Number of repetitions of each operation')
+    args = parser.parse_args()
+
+    # Test settings provide settings required by webwhois, the registry isn't used.
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'webwhois.tests.settings')
+    django.setup()
+    from webwhois.utils import codec
+    if codec.msgpack is None:
+        print('msgpack is not installed, the codec falls back to pickle.')
+
+    formats = {
+        'codec': (codec.dumps, codec.loads),
+        'pickle': (lambda value: pickle.dumps(value, pickle.HIGHEST_PROTOCOL), pickle.loads),
+    }
+    print('{:10} {:7} {:>10} {:>10} {:>10}'.format('object', 'format', 'size [B]', 'dump [us]', 'load [us]'))
+    for name, value in get_objects().items():
+        for format_name, (dumps, loads) in formats.items():
+            data = dumps(value)
+            print('{:10} {:7} {:10} {:10.1f} {:10.1f}'.format(
+                name, format_name, len(data), measure(lambda: dumps(value), args.repeat),
+                measure(lambda: loads(data), args.repeat)))
+
+
+if __name__ == '__main__':
+    main()
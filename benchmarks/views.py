@@ -0,0 +1,426 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark of the views with a simulated backend.
+
+Requests every URL of `webwhois.urls` by the Django test client. Backends are replaced by fakes returning
+registry objects used in tests, each backend call is delayed by a simulated latency.
+Reports median and 95th percentile of request durations and numbers of backend calls of each view.
+
+Results can be saved as a baseline. If a baseline exists, results are compared with it and the script fails,
+if any view is slower by more than the tolerance or makes different backend calls.
+Durations depend on the machine, so compare only results from the same machine.
+
+Usage:
+    python benchmarks/views.py [--requests 100] [--latency 1] [--save] [--baseline FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import warnings
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from unittest.mock import patch
+
+import django
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'views-baseline.json')
+PUBLIC_KEY = 'benchmark-public-key'
+
+
+class Request(NamedTuple):
+    """Benchmarked request of a view."""
+
+    url_name: str
+    kwargs: Dict[str, str] = {}
+    method: str = 'get'
+    data: Any = None
+    content_type: Optional[str] = None
+
+
+REQUESTS = (
+    Request('form_whois'),
+    Request('jsi18n', {'packages': 'webwhois'}),
+    Request('registry_object_type', {'handle': 'KONTAKT'}),
+    Request('detail_contact', {'handle': 'KONTAKT'}),
+    Request('detail_nsset', {'handle': 'NSSET-1'}),
+    Request('detail_keyset', {'handle': 'KEYSID-1'}),
+    Request('detail_domain', {'handle': 'fred.cz'}),
+    Request('scan_results', {'handle': 'fred.cz'}),
+    Request('scan_results_raw', {'handle': 'fred.cz'}),
+    Request('scan_results_export', {'handle': 'fred.cz', 'format': 'ndjson'}),
+    Request('detail_registrar', {'handle': 'REG-FRED_A'}),
+    Request('registrars'),
+    Request('api_contact', {'handle': 'KONTAKT'}),
+    Request('api_nsset', {'handle': 'NSSET-1'}),
+    Request('api_keyset', {'handle': 'KEYSID-1'}),
+    Request('api_domain', {'handle': 'fred.cz'}),
+    Request('api_registrar', {'handle': 'REG-FRED_A'}),
+    Request('api_batch', method='post', content_type='application/json',
+            data=json.dumps({'type': 'domain', 'handles': ['domain{}.cz'.format(i) for i in range(10)]})),
+    Request('download_evaluation_file', {'handle': 'REG-MOJEID'}),
+    Request('form_send_password', method='post',
+            data={'object_type': 'domain', 'handle': 'fred.cz', 'confirmation_method': 'signed_email',
+                  'send_to_0': 'email_in_registry'}),
+    Request('form_personal_info', method='post',
+            data={'object_type': 'contact', 'handle': 'KONTAKT', 'send_to_0': 'email_in_registry'}),
+    Request('form_block_object', method='post',
+            data={'object_type': 'domain', 'handle': 'fred.cz', 'confirmation_method': 'signed_email',
+                  'lock_type': 'transfer'}),
+    Request('form_unblock_object', method='post',
+            data={'object_type': 'domain', 'handle': 'fred.cz', 'confirmation_method': 'signed_email',
+                  'lock_type': 'transfer'}),
+    Request('public_response', {'public_key': PUBLIC_KEY}),
+    Request('public_response_pdf', {'public_key': PUBLIC_KEY}),
+    Request('response_not_found', {'public_key': PUBLIC_KEY}),
+    Request('email_in_registry_response', {'public_key': PUBLIC_KEY}),
+    Request('custom_email_response', {'public_key': PUBLIC_KEY}),
+    Request('notarized_letter_response', {'public_key': PUBLIC_KEY}),
+    Request('notarized_letter_serve_pdf', {'public_key': PUBLIC_KEY}),
+    Request('record_statement_pdf', {'object_type': 'domain', 'handle': 'fred.cz'}),
+)
+
+
+class DelayedClient:
+    """Proxy of a fake backend, which delays each call by the latency in seconds."""
+
+    def __init__(self, client: Any, latency: float):
+        self.client = client
+        self.latency = latency
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self.client, name)
+        if name.startswith('_') or not callable(value):
+            return value
+
+        def delayed(*args: Any, **kwargs: Any) -> Any:
+            time.sleep(self.latency)
+            return value(*args, **kwargs)
+        return delayed
+
+
+class FakeWhois:
+    """Fake of the WHOIS backend returning the same registry objects for any handle."""
+
+    def __init__(self) -> None:
+        from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
+        fixtures = GetRegistryObjectMixin()
+        self.contact = fixtures._get_contact()
+        self.nsset = fixtures._get_nsset()
+        self.keyset = fixtures._get_keyset()
+        self.domain = fixtures._get_domain()
+        self.registrar = fixtures._get_registrar()
+        self.certifications = fixtures._get_registrar_certs()
+        self.descriptions = {
+            'contact': fixtures._get_contact_status(),
+            'nsset': fixtures._get_nsset_status(),
+            'keyset': fixtures._get_keyset_status(),
+            'domain': fixtures._get_domain_status(),
+        }
+
+    def get_contact_by_handle(self, handle: str) -> Any:
+        return self.contact
+
+    def get_nsset_by_handle(self, handle: str) -> Any:
+        return self.nsset
+
+    def get_keyset_by_handle(self, handle: str) -> Any:
+        return self.keyset
+
+    def get_domain_by_handle(self, handle: str) -> Any:
+        return self.domain
+
+    def get_registrar_by_handle(self, handle: str) -> Any:
+        return self.registrar
+
+    def get_contact_status_descriptions(self, lang: str) -> Any:
+        return self.descriptions['contact']
+
+    def get_nsset_status_descriptions(self, lang: str) -> Any:
+        return self.descriptions['nsset']
+
+    def get_keyset_status_descriptions(self, lang: str) -> Any:
+        return self.descriptions['keyset']
+
+    def get_domain_status_descriptions(self, lang: str) -> Any:
+        return self.descriptions['domain']
+
+    def get_managed_zone_list(self) -> List[str]:
+        return ['cz']
+
+    def get_registrars(self) -> List[Any]:
+        return [self.registrar]
+
+    def get_registrar_groups(self) -> List[Any]:
+        return []
+
+    def get_registrar_certification_list(self) -> List[Any]:
+        return self.certifications
+
+
+class FakePublicRequest:
+    """Fake of the PUBLIC_REQUEST backend."""
+
+    def create_authinfo_request_registry_email(self, *args: Any) -> int:
+        return 24
+
+    def create_personal_info_request_registry_email(self, *args: Any) -> int:
+        return 24
+
+    def create_block_unblock_request(self, *args: Any) -> int:
+        return 24
+
+    def create_public_request_pdf(self, *args: Any) -> bytes:
+        return b'%PDF-1.4'
+
+
+class FakeFileDownload:
+    """Fake of a file download of the FILE_MANAGER backend."""
+
+    def download(self, size: int) -> bytes:
+        return b'<html><body>Evaluation</body></html>'
+
+    def finalize_download(self) -> None:
+        pass
+
+
+class FakeFileManager:
+    """Fake of the FILE_MANAGER backend."""
+
+    def info(self, file_id: int) -> Any:
+        from fred_idl.ccReg import FileInfo
+        return FileInfo(id=file_id, name='evaluation.html', path='2015/12/9/1', mimetype='text/html', filetype=6,
+                        crdate='2015-12-09 16:16:28.598757', size=36)
+
+    def load(self, file_id: int) -> FakeFileDownload:
+        return FakeFileDownload()
+
+
+class FakeSecretary:
+    """Fake of the secretary."""
+
+    def render_pdf(self, template_name: str, context: Dict[str, Any]) -> bytes:
+        return b'%PDF-1.4'
+
+
+class FakeStatementor:
+    """Fake of the statementor."""
+
+    def _get_statement(self, handle: str) -> BytesIO:
+        return BytesIO(b'%PDF-1.4')
+
+    get_contact_statement = get_domain_statement = get_keyset_statement = get_nsset_statement = _get_statement
+
+
+class FakeCdnskeyClient:
+    """Fake of the cdnskey processor client streaming a day of scan results."""
+
+    def __init__(self, latency: float):
+        from webwhois.constants import CdnskeyStatus, DnskeyAlgorithm, DnskeyFlag
+        self.latency = latency
+        scan_at = datetime(2020, 3, 2, tzinfo=timezone.utc)
+        cdnskey = {'flags': DnskeyFlag.ZONE, 'alg': DnskeyAlgorithm.RSAMD5, 'proto': 3, 'public_key': 'Quagaars!',
+                   'status': CdnskeyStatus.INSECURE_KEY}
+        self.scan_results = [
+            {'worker_name': 'kryten', 'scan_at': scan_at + timedelta(hours=i), 'nameserver': 'a.ns.nic.cz',
+             'nameserver_ip': '194.0.12.1', 'cdnskey': cdnskey}
+            for i in range(24)]
+
+    def raw_scan_results(self, domain: str) -> Iterable[Dict[str, Any]]:
+        from webwhois.utils.instrumentation import SPAN_BACKEND, measure_iterable
+
+        def stream():
+            time.sleep(self.latency)
+            yield from self.scan_results
+        return measure_iterable(SPAN_BACKEND, 'CDNSKEY.raw_scan_results', stream(), (domain, ))
+
+
+def setup(stack: ExitStack, latency: float) -> None:
+    """Configure Django and replace the backends by the fakes."""
+    # Test settings provide settings required by webwhois, the registry isn't used.
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'webwhois.tests.settings')
+    django.setup()
+    from django.core.cache import cache
+    from django.test.utils import override_settings, setup_test_environment
+    from grill.utils import TestLoggerClient
+
+    from webwhois.constants import PublicRequestsLogEntryType
+    from webwhois.forms.public_request import ConfirmationMethod
+    from webwhois.tests.utils import TEMPLATES
+    from webwhois.utils import corba_wrapper
+    from webwhois.utils.public_response import SendPasswordResponse
+
+    class LoggerClient(TestLoggerClient):
+        def create_log_entry(self, *args: Any, **kwargs: Any) -> str:
+            super().create_log_entry(*args, **kwargs)
+            # Return logger-like identifier to pass the old ID backport hook.
+            return '42.log-entry-id'
+
+    setup_test_environment()
+    stack.enter_context(override_settings(
+        ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES, USE_TZ=True,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                            'OPTIONS': {'MAX_ENTRIES': 1000000}}},
+        MIDDLEWARE=['django.contrib.sessions.middleware.SessionMiddleware'],
+        SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies',
+        WEBWHOIS_METRICS=True))
+    # Notarized letter views are deprecated.
+    warnings.simplefilter('ignore', DeprecationWarning)
+
+    fakes = ((corba_wrapper.WHOIS, FakeWhois()),
+             (corba_wrapper.PUBLIC_REQUEST, FakePublicRequest()),
+             (corba_wrapper.FILE_MANAGER, FakeFileManager()),
+             (corba_wrapper.SECRETARY_CLIENT, FakeSecretary()),
+             (corba_wrapper.STATEMENTOR, FakeStatementor()))
+    for client, fake in fakes:
+        stack.enter_context(patch.object(client, 'client', DelayedClient(fake, latency)))
+    logger_client = LoggerClient()
+    stack.enter_context(patch.object(corba_wrapper.LOGGER, 'client', logger_client))
+    stack.enter_context(patch.object(corba_wrapper.PUBLIC_REQUESTS_LOGGER, 'client', logger_client))
+    stack.enter_context(patch('webwhois.views.scan_results.get_cdnskey_client',
+                              return_value=FakeCdnskeyClient(latency)))
+
+    public_response = SendPasswordResponse('contact', 42, PublicRequestsLogEntryType.AUTH_INFO, 'KONTAKT',
+                                           'rimmer@foo.foo', ConfirmationMethod.SIGNED_EMAIL)
+    cache.set(PUBLIC_KEY, public_response, None)
+
+
+def get_requests() -> Tuple[Request, ...]:
+    """Return benchmarked requests, fail if a view isn't benchmarked."""
+    from webwhois.urls import urlpatterns
+    missing = {p.name for p in urlpatterns} - {r.url_name for r in REQUESTS}
+    if missing:
+        raise SystemExit('Views without a benchmark: {}'.format(', '.join(sorted(missing))))
+    return REQUESTS
+
+
+def make_call(client: Any, request: Request) -> Callable[[], None]:
+    """Return function which sends the request and reads the whole response."""
+    from django.urls import reverse
+    path = reverse('webwhois:' + request.url_name, kwargs=request.kwargs)
+    extra = {'content_type': request.content_type} if request.content_type else {}
+
+    def call() -> None:
+        response = getattr(client, request.method)(path, request.data, **extra)
+        if response.status_code >= 400:
+            raise RuntimeError('{} responded {}.'.format(request.url_name, response.status_code))
+        if response.streaming:
+            b''.join(response.streaming_content)
+    return call
+
+
+def benchmark(call: Callable[[], None], count: int) -> Tuple[List[float], Dict[str, int]]:
+    """Return request durations in milliseconds and backend calls of a request."""
+    from webwhois.tests.utils import count_backend_calls
+
+    # Warm up, e.g. caches of status descriptions and templates.
+    call()
+    with count_backend_calls() as counter:
+        call()
+    durations = []
+    for _ in range(count):
+        start = time.perf_counter()
+        call()
+        durations.append((time.perf_counter() - start) * 1e3)
+    return durations, counter.get_counts()
+
+
+def percentile(durations: List[float], value: int) -> float:
+    """Return the percentile of durations."""
+    return statistics.quantiles(durations, n=100)[value - 1]
+
+
+def load_baseline(path: str, parameters: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Return views from the baseline or an empty dictionary, if it doesn't exist."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        baseline = json.load(file)
+    if baseline['parameters'] != parameters:
+        print('Baseline was measured with different parameters: {}'.format(baseline['parameters']))
+    return baseline['views']
+
+
+def compare(result: Dict[str, Any], baseline: Optional[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Return regressions of the view compared to the baseline."""
+    if baseline is None:
+        return []
+    regressions = []
+    for key in ('p50', 'p95'):
+        if result[key] > baseline[key] * (1 + tolerance):
+            regressions.append('{} {:+.0%}'.format(key, result[key] / baseline[key] - 1))
+    if result['calls'] != baseline['calls']:
+        regressions.append('calls {} -> {}'.format(sum(baseline['calls'].values()), sum(result['calls'].values())))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=100, help='Number of measured requests of each view')
+    parser.add_argument('--latency', type=float, default=1.0, help='Latency of each backend call in milliseconds')
+    parser.add_argument('--views', nargs='+', metavar='URL_NAME', help='Benchmark only the selected views')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results (default: %(default)s)')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Tolerated slowdown compared to the baseline')
+    parser.add_argument('--save', action='store_true', help='Save the results as the baseline')
+    args = parser.parse_args()
+    if args.requests < 2:
+        parser.error('At least 2 requests are required.')
+
+    parameters = {'requests': args.requests, 'latency': args.latency}
+    with ExitStack() as stack:
+        setup(stack, args.latency / 1e3)
+        from django.test import Client
+        client = Client()
+        baseline = load_baseline(args.baseline, parameters)
+
+        results = {}
+        failed = False
+        print('{:28} {:>10} {:>10} {:>6}  {}'.format('view', 'p50 [ms]', 'p95 [ms]', 'calls', 'regressions'))
+        for request in get_requests():
+            if args.views and request.url_name not in args.views:
+                continue
+            durations, calls = benchmark(make_call(client, request), args.requests)
+            result = {'p50': round(percentile(durations, 50), 3), 'p95': round(percentile(durations, 95), 3),
+                      'calls': calls}
+            results[request.url_name] = result
+            regressions = compare(result, baseline.get(request.url_name), args.tolerance)
+            failed = failed or bool(regressions)
+            print('{:28} {:10.2f} {:10.2f} {:6}  {}'.format(
+                request.url_name, result['p50'], result['p95'], sum(calls.values()), ', '.join(regressions)))
+
+    if args.save:
+        data = {'parameters': parameters, 'python': platform.python_version(), 'django': django.__version__,
+                'views': results}
+        with open(args.baseline, 'w') as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+            file.write('\n')
+        print('Baseline saved to {}'.format(args.baseline))
+    elif failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+"""Wrapper for ASGI application.
+
+Serve it by an ASGI server, e.g. `uvicorn asgi_app:application`, with `ROOT_URLCONF=webwhois_asgi_urls`.
+"""
+from django.core.asgi import get_asgi_application
+
+application = get_asgi_application()
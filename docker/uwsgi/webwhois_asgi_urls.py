@@ -0,0 +1,6 @@
+"""URLs definition for webwhois site with asynchronous views."""
+from django.urls import include, path
+
+urlpatterns = [
+    path('', include('webwhois.urls_async')),
+]
@@ -32,7 +32,12 @@ INSTALLED_APPS = [
     'webwhois.apps.WebwhoisAppConfig',
 ]
 
-CACHES = {"default": env.cache("CACHE_URL", default='locmemcache://')}
+# Cache is shared by all workers in the container, unless a cache URL is defined.
+if 'CACHE_URL' in env:
+    CACHES = {"default": env.cache("CACHE_URL")}
+else:
+    CACHES = {"default": {"BACKEND": "webwhois.cache.SQLiteCache",
+                          "LOCATION": env.str("CACHE_PATH", default="/tmp/webwhois/cache.sqlite3")}}
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -42,7 +47,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
 ]
 
-ROOT_URLCONF = 'webwhois_urls'
+ROOT_URLCONF = env.str('ROOT_URLCONF', default='webwhois_urls')
 
 TEMPLATES = [
     {
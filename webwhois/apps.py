@@ -19,7 +19,7 @@
 """AppConfig definition."""
 from django.apps import AppConfig
 
-from .settings import WebwhoisAppSettings
+from .settings import WEBWHOIS_SETTINGS, WebwhoisAppSettings
 
 
 class WebwhoisAppConfig(AppConfig):
@@ -27,12 +27,22 @@ class WebwhoisAppConfig(AppConfig):
 
     def ready(self) -> None:
         from webwhois.utils.corba_wrapper import LOGGER
+        from webwhois.utils.instrumentation import add_observer
+        from webwhois.utils.metrics import get_metrics_observer
+        from webwhois.utils.tracing import get_tracing_observer
 
         from .constants import (LOGGER_SERVICE, PUBLIC_REQUESTS_LOGGER_SERVICE, LogEntryType, LogResult,
                                 PublicRequestsLogEntryType, PublicRequestsLogResult)
 
         WebwhoisAppSettings.check()
 
+        if WEBWHOIS_SETTINGS.METRICS:
+            add_observer(get_metrics_observer())
+        if WEBWHOIS_SETTINGS.TRACING:
+            tracing_observer = get_tracing_observer()
+            if tracing_observer is not None:
+                add_observer(tracing_observer)
+
         LOGGER.client.register_service(LOGGER_SERVICE, handle='webwhois')
         LOGGER.client.register_log_entry_types(LOGGER_SERVICE, LogEntryType)
         LOGGER.client.register_results(LOGGER_SERVICE, LogResult)
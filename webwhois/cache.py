@@ -0,0 +1,180 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Cache backend shared by all processes on a host, stored in a SQLite database.
+
+Unlike the local memory cache, the cache survives restarts of workers and it's shared between them.
+Unlike the file based cache, all entries are stored in a single memory mapped file and culling is cheap.
+The cache is checked for culling only every `CULL_EVERY` writes of a thread, so it may temporarily exceed
+`MAX_ENTRIES` by a few entries.
+
+Example:
+    CACHES = {
+        'default': {
+            'BACKEND': 'webwhois.cache.SQLiteCache',
+            'LOCATION': '/var/cache/webwhois/cache.sqlite3',
+        },
+    }
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, cast
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+
+# Timeout of a locked database in seconds.
+BUSY_TIMEOUT = 5.0
+# Size of the memory map of the database in bytes.
+MMAP_SIZE = 256 * 1024 * 1024
+# Number of writes of a thread between checks whether the cache should be culled.
+CULL_EVERY = 100
+
+
+class SQLiteCache(BaseCache):
+    """Cache backend stored in a SQLite database.
+
+    Connections are opened per thread and reopened in forked processes.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location: str, params: Dict[str, Any]):
+        super().__init__(params)
+        self._path = os.path.abspath(location)
+        options = params.get('OPTIONS', {})
+        self._busy_timeout = options.get('BUSY_TIMEOUT', BUSY_TIMEOUT)
+        self._mmap_size = options.get('MMAP_SIZE', MMAP_SIZE)
+        self._cull_every = options.get('CULL_EVERY', CULL_EVERY)
+        if not isinstance(self._cull_every, int) or self._cull_every < 1:
+            raise ImproperlyConfigured('CULL_EVERY option of SQLiteCache must be a positive integer.')
+        self._local = threading.local()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Return connection to the database for the current thread and process."""
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            # Transactions are managed explicitly, see `_write`.
+            connection = sqlite3.connect(self._path, timeout=self._busy_timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = NORMAL')
+            connection.execute('PRAGMA mmap_size = {:d}'.format(self._mmap_size))
+            connection.execute('CREATE TABLE IF NOT EXISTS cache '
+                               '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL) WITHOUT ROWID')
+            connection.execute('CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)')
+            self._local.connection = connection
+            self._local.pid = pid
+            self._local.writes = 0
+        return cast(sqlite3.Connection, self._local.connection)
+
+    def _make_key(self, key: Any, version: Optional[int]) -> str:
+        cache_key = str(self.make_key(key, version=version))
+        self.validate_key(cache_key)
+        return cache_key
+
+    def _is_alive(self, expires: Optional[float]) -> bool:
+        return expires is None or expires > time.time()
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._make_key(key, version)
+        return self._write(key, value, timeout, replace=False)
+
+    def get(self, key, default=None, version=None):
+        key = self._make_key(key, version)
+        row = self._get_connection().execute('SELECT value, expires FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None or not self._is_alive(row[1]):
+            return default
+        return pickle.loads(row[0])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._make_key(key, version)
+        self._write(key, value, timeout)
+
+    def _write(self, key: str, value: Any, timeout: Any, replace: bool = True) -> bool:
+        """Store the value and return whether it was stored."""
+        expires = self.get_backend_timeout(timeout)
+        data = pickle.dumps(value, self.pickle_protocol)
+        connection = self._get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            stored = self._write_entry(connection, key, data, expires, replace)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return stored
+
+    def _write_entry(self, connection: sqlite3.Connection, key: str, data: bytes, expires: Optional[float],
+                     replace: bool) -> bool:
+        """Store the entry within a transaction and return whether it was stored."""
+        if not replace:
+            row = connection.execute('SELECT expires FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is not None and self._is_alive(row[0]):
+                return False
+        if expires is not None and expires <= time.time():
+            # Non-positive timeouts only delete the value.
+            connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+            return False
+        if self._local.writes % self._cull_every == 0:
+            self._cull(connection)
+        self._local.writes += 1
+        connection.execute('INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)', (key, data, expires))
+        return True
+
+    def _cull(self, connection: sqlite3.Connection) -> None:
+        """Remove expired entries and some other ones, if the cache is full."""
+        # Expired entries are removed using the index, even if the cache isn't full, so they don't pile up.
+        connection.execute('DELETE FROM cache WHERE expires <= ?', (time.time(), ))
+        count = connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count < self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            connection.execute('DELETE FROM cache')
+        else:
+            # Remove entries which expire first, entries without expiration are removed last.
+            connection.execute('DELETE FROM cache WHERE key IN '
+                               '(SELECT key FROM cache ORDER BY expires IS NULL, expires LIMIT ?)',
+                               (count // self._cull_frequency, ))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._make_key(key, version)
+        cursor = self._get_connection().execute(
+            'UPDATE cache SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), key, time.time()))
+        return bool(cursor.rowcount)
+
+    def delete(self, key, version=None):
+        key = self._make_key(key, version)
+        cursor = self._get_connection().execute('DELETE FROM cache WHERE key = ?', (key,))
+        return bool(cursor.rowcount)
+
+    def has_key(self, key, version=None):
+        key = self._make_key(key, version)
+        row = self._get_connection().execute('SELECT expires FROM cache WHERE key = ?', (key,)).fetchone()
+        return row is not None and self._is_alive(row[0])
+
+    def clear(self):
+        self._get_connection().execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Connections are kept open between requests.
+        pass
@@ -18,17 +18,17 @@
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
 from functools import lru_cache
-from typing import Any, Dict, List, Tuple, cast
+from typing import Any, Dict, Tuple
 
 from django.http import HttpRequest
 
-from .utils import WHOIS
+from .utils.backend import get_backend
 
 
 @lru_cache()
 def _get_managed_zones() -> Tuple[str, ...]:
     """Return managed zones."""
-    return tuple(cast(List[str], WHOIS.get_managed_zone_list()))
+    return tuple(get_backend().get_managed_zone_list())
 
 
 def managed_zones(request: HttpRequest) -> Dict[str, Any]:
@@ -16,6 +16,8 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 from .public_request import BlockObjectForm, PersonalInfoForm, SendPasswordForm, UnblockObjectForm
+from .scan_results import ScanResultsFilterForm
 from .whois import WhoisForm
 
-__all__ = ['WhoisForm', 'SendPasswordForm', 'PersonalInfoForm', 'BlockObjectForm', 'UnblockObjectForm']
+__all__ = ['ScanResultsFilterForm', 'WhoisForm', 'SendPasswordForm', 'PersonalInfoForm', 'BlockObjectForm',
+           'UnblockObjectForm']
@@ -0,0 +1,27 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+from django import forms
+from django.utils.translation import gettext_lazy as _
+
+
+class ScanResultsFilterForm(forms.Form):
+    """Form to select a date window of scan results."""
+
+    since = forms.DateField(label=_("Since"), required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    until = forms.DateField(label=_("Until"), required=False, widget=forms.DateInput(attrs={'type': 'date'}))
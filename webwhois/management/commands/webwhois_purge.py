@@ -0,0 +1,51 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Purge cached pages with registry objects from edge caches."""
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+from webwhois.utils.surrogate_keys import make_surrogate_key, purge_surrogate_keys
+
+OBJECT_TYPES = ('contact', 'domain', 'keyset', 'nsset', 'registrar')
+
+
+class Command(BaseCommand):
+    """Purge cached pages with registry objects from edge caches."""
+
+    help = 'Purge all pages, which display the registry objects, from edge caches by their surrogate keys.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('objects', nargs='+', metavar='TYPE:HANDLE',
+                            help='Registry object, e.g. contact:KONTAKT. Types: {}.'.format(', '.join(OBJECT_TYPES)))
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not WEBWHOIS_SETTINGS.PURGE_URLS:
+            raise CommandError('No edge caches are defined in WEBWHOIS_PURGE_URLS.')
+        keys = []
+        for obj in options['objects']:
+            object_type, _, handle = obj.partition(':')
+            if object_type not in OBJECT_TYPES or not handle:
+                raise CommandError('Invalid registry object {!r}.'.format(obj))
+            keys.append(make_surrogate_key(object_type, handle))
+        failed = purge_surrogate_keys(keys)
+        if failed:
+            raise CommandError('Purge failed in {}.'.format(', '.join(failed)))
+        self.stdout.write('Purged {}.'.format(' '.join(sorted(set(keys)))))
@@ -0,0 +1,158 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Webwhois middlewares."""
+import cProfile
+import random
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from django.http import HttpRequest, HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+from webwhois.utils.instrumentation import (SPAN_RENDER, SPAN_VIEW, add_context_observer, finish_span, measure,
+                                            remove_context_observer, start_span)
+from webwhois.utils.profiling import save_profile
+from webwhois.utils.server_timing import ServerTiming
+from webwhois.utils.slow_requests import SlowRequestRecorder, log_slow_request
+
+
+class InstrumentationMiddleware(MiddlewareMixin):
+    """Measure views and rendering of their templates as spans of the instrumentation.
+
+    Spans are named by the view names including the URL namespace, e.g. `webwhois:detail_domain`.
+    If `WEBWHOIS_SERVER_TIMING` is set, a breakdown of the request duration is added to the Server-Timing header.
+    If `WEBWHOIS_SLOW_REQUEST_THRESHOLD` is set, requests slower than the threshold are logged.
+    """
+
+    def process_request(self, request: HttpRequest) -> Optional[HttpResponse]:
+        if WEBWHOIS_SETTINGS.SERVER_TIMING:
+            server_timing = ServerTiming()
+            add_context_observer(server_timing)
+            request._webwhois_server_timing = server_timing
+        if WEBWHOIS_SETTINGS.SLOW_REQUEST_THRESHOLD:
+            recorder = SlowRequestRecorder()
+            add_context_observer(recorder)
+            request._webwhois_slow_request_recorder = recorder
+        return None
+
+    def process_view(self, request: HttpRequest, view_func: Callable, view_args: Sequence[Any],
+                     view_kwargs: Dict[str, Any]) -> Optional[HttpResponse]:
+        request._webwhois_span = start_span(
+            SPAN_VIEW, request.resolver_match.view_name, tuple(view_args) + tuple(view_kwargs.values()))
+        return None
+
+    def process_exception(self, request: HttpRequest, exception: Exception) -> Optional[HttpResponse]:
+        span = getattr(request, '_webwhois_span', None)
+        if span is not None:
+            span.error = exception
+        return None
+
+    def process_template_response(self, request: HttpRequest,
+                                  response: SimpleTemplateResponse) -> SimpleTemplateResponse:
+        view_span = getattr(request, '_webwhois_span', None)
+        name = view_span.name if view_span is not None else ''
+        render = response.render
+
+        def measured_render() -> SimpleTemplateResponse:
+            if response.is_rendered:
+                return render()
+            # The span is finished even if the rendering fails.
+            with measure(SPAN_RENDER, name):
+                return render()
+
+        # Rendering is deferred, so other middlewares may still change the response.
+        response.render = measured_render
+        return response
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        span = getattr(request, '_webwhois_span', None)
+        if span is not None:
+            del request._webwhois_span
+            finish_span(span)
+        server_timing = getattr(request, '_webwhois_server_timing', None)
+        if server_timing is not None:
+            del request._webwhois_server_timing
+            remove_context_observer(server_timing)
+            header = server_timing.get_header()
+            if header:
+                response['Server-Timing'] = header
+        recorder = getattr(request, '_webwhois_slow_request_recorder', None)
+        if recorder is not None:
+            del request._webwhois_slow_request_recorder
+            remove_context_observer(recorder)
+            if recorder.get_duration() >= WEBWHOIS_SETTINGS.SLOW_REQUEST_THRESHOLD:
+                log_slow_request(recorder.get_record(request, response))
+        return response
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    """Profile views by `cProfile` and save the profiles into `WEBWHOIS_PROFILING_DIR`.
+
+    Profiled are a `WEBWHOIS_PROFILING_RATE` fraction of requests and requests slower than
+    `WEBWHOIS_PROFILING_THRESHOLD`, optionally only views from `WEBWHOIS_PROFILING_URL_NAMES`.
+    Only one request at a time is profiled in each process to bound the overhead.
+    Only code run in the thread of the request is profiled.
+    """
+
+    sync_capable = True
+    async_capable = False
+
+    _lock = Lock()
+
+    def _is_profiled(self, request: HttpRequest) -> bool:
+        """Return whether the view may be profiled."""
+        if not WEBWHOIS_SETTINGS.PROFILING_DIR:
+            return False
+        url_names = WEBWHOIS_SETTINGS.PROFILING_URL_NAMES
+        resolver_match = request.resolver_match
+        return not url_names or resolver_match.url_name in url_names or resolver_match.view_name in url_names
+
+    def process_view(self, request: HttpRequest, view_func: Callable, view_args: Sequence[Any],
+                     view_kwargs: Dict[str, Any]) -> Optional[HttpResponse]:
+        if not self._is_profiled(request):
+            return None
+        sampled = random.random() < WEBWHOIS_SETTINGS.PROFILING_RATE
+        if not sampled and not WEBWHOIS_SETTINGS.PROFILING_THRESHOLD:
+            return None
+        if not self._lock.acquire(blocking=False):
+            # Other request is being profiled.
+            return None
+        profile = cProfile.Profile()
+        request._webwhois_profile = (profile, sampled, time.perf_counter())
+        profile.enable()
+        return None
+
+    def process_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        profile_info = getattr(request, '_webwhois_profile', None)
+        if profile_info is None:
+            return response
+        profile, sampled, start = profile_info
+        try:
+            profile.disable()
+            del request._webwhois_profile
+            duration = time.perf_counter() - start
+            if sampled or duration >= WEBWHOIS_SETTINGS.PROFILING_THRESHOLD:
+                save_profile(profile, WEBWHOIS_SETTINGS.PROFILING_DIR, request.resolver_match.view_name, duration,
+                             WEBWHOIS_SETTINGS.PROFILING_MAX_FILES)
+        finally:
+            self._lock.release()
+        return response
@@ -20,7 +20,8 @@ import os
 from functools import partial
 from typing import Any, Dict
 
-from appsettings import AppSettings, DictSetting, FileSetting, Setting, StringSetting
+from appsettings import (AppSettings, BooleanSetting, DictSetting, FileSetting, ListSetting, PositiveFloatSetting,
+                         PositiveIntegerSetting, Setting, StringSetting)
 from django.core.exceptions import ValidationError
 from frgal import make_credentials
 
@@ -49,17 +50,52 @@ class LoggerOptionsSetting(DictSetting):
 class WebwhoisAppSettings(AppSettings):
     """Web whois settings."""
 
+    BACKEND = StringSetting(default='webwhois.utils.backend.CorbaWhoisBackend')
+    BATCH_MAX_RUNNING = PositiveIntegerSetting(default=5)
+    BATCH_MAX_SIZE = PositiveIntegerSetting(default=100)
+    CACHE_CONTROL = StringSetting(default=None)
     CDNSKEY_NETLOC = StringSetting(default=None)
     CDNSKEY_SSL_CERT = FileSetting(default=None, mode=os.R_OK)
+    CDNSKEY_TIMEOUT = PositiveFloatSetting(default=60.0)
     CORBA_NETLOC = StringSetting(default=partial(os.environ.get, 'FRED_WEBWHOIS_NETLOC', 'localhost'))
     CORBA_CONTEXT = StringSetting(default='fred')
+    EXECUTOR_MAX_WORKERS = PositiveIntegerSetting(default=10)
     LOGGER = StringSetting(default='grill.DummyLoggerClient')
     LOGGER_OPTIONS = LoggerOptionsSetting(default={})
+    METRICS = BooleanSetting(default=False)
+    OBJECT_CACHE_L1_SIZE = PositiveIntegerSetting(default=1000)
+    OBJECT_CACHE_L1_TIMEOUT = PositiveIntegerSetting(default=10)
+    OBJECT_CACHE_TIMEOUT = PositiveIntegerSetting(default=0)
+    PAGE_CACHE_MAX_SIZE = PositiveIntegerSetting(default=1000000)
+    PAGE_CACHE_TIMEOUTS = DictSetting(default={}, key_type=str, value_type=int)
+    PROFILING_DIR = StringSetting(default=None)
+    PROFILING_MAX_FILES = PositiveIntegerSetting(default=100)
+    PROFILING_RATE = PositiveFloatSetting(default=0.0)
+    PROFILING_THRESHOLD = PositiveFloatSetting(default=0.0)
+    PROFILING_URL_NAMES = ListSetting(default=[], item_type=str)
+    PURGE_HEADER = StringSetting(default='Surrogate-Key')
+    PURGE_METHOD = StringSetting(default='PURGE')
+    PURGE_TIMEOUT = PositiveFloatSetting(default=5.0)
+    PURGE_URLS = ListSetting(default=[], item_type=str)
     REGISTRY_NETLOC = StringSetting(required=True)
     REGISTRY_SSL_CERT = FileSetting(default=None, mode=os.R_OK)
+    SCAN_RESULTS_CACHE_MAX_SIZE = PositiveIntegerSetting(default=1000)
+    SCAN_RESULTS_CACHE_TIMEOUT = PositiveIntegerSetting(default=0)
+    SCAN_RESULTS_MAX_PAGES = PositiveIntegerSetting(default=100)
+    SCAN_RESULTS_PAGE_SIZE = PositiveIntegerSetting(default=100)
     SECRETARY_URL = StringSetting(required=True)
     SECRETARY_AUTH = Setting()
     SECRETARY_TIMEOUT = Setting(default=3.05, validators=[timeout_validator])
+    SERVER_TIMING = BooleanSetting(default=False)
+    SINGLE_FLIGHT = BooleanSetting(default=False)
+    SINGLE_FLIGHT_LEASE_TIMEOUT = PositiveIntegerSetting(default=0)
+    SINGLE_FLIGHT_POLL_INTERVAL = PositiveFloatSetting(default=0.05)
+    SLOW_REQUEST_THRESHOLD = PositiveFloatSetting(default=0.0)
+    STALE_IF_ERROR_BACKOFF = PositiveIntegerSetting(default=10)
+    STALE_IF_ERROR_TIMEOUT = PositiveIntegerSetting(default=0)
+    SURROGATE_CONTROL = StringSetting(default=None)
+    SURROGATE_KEY_HEADER = StringSetting(default=None)
+    TRACING = BooleanSetting(default=False)
 
     class Meta:
         setting_prefix = 'WEBWHOIS_'
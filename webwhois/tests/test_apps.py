@@ -16,14 +16,18 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
+from typing import List
 from unittest.mock import call, patch
 
 from django.apps import apps
 from django.apps.registry import Apps
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, override_settings
 
 from webwhois.constants import (LOGGER_SERVICE, PUBLIC_REQUESTS_LOGGER_SERVICE, LogEntryType, LogResult,
                                 PublicRequestsLogEntryType, PublicRequestsLogResult)
+from webwhois.utils.instrumentation import Observer
+from webwhois.utils.metrics import get_metrics_observer
+from webwhois.utils.tracing import get_tracing_observer
 
 
 class WebwhoisAppConfigTest(SimpleTestCase):
@@ -42,3 +46,33 @@ class WebwhoisAppConfigTest(SimpleTestCase):
                 call.register_log_entry_types(PUBLIC_REQUESTS_LOGGER_SERVICE, PublicRequestsLogEntryType),
                 call.register_results(PUBLIC_REQUESTS_LOGGER_SERVICE, PublicRequestsLogResult),
             ])
+
+    @override_settings(WEBWHOIS_METRICS=True)
+    def test_ready_metrics(self):
+        observers: List[Observer] = []
+        with patch('webwhois.utils.corba_wrapper.LOGGER.client', autospec=True):
+            with patch('webwhois.utils.instrumentation._OBSERVERS', observers):
+                Apps(('webwhois.apps.WebwhoisAppConfig', ))  # Trigger `ready`.
+
+        self.assertEqual(observers, [get_metrics_observer()])
+
+    @override_settings(WEBWHOIS_TRACING=True)
+    def test_ready_tracing(self):
+        observers: List[Observer] = []
+        with patch('webwhois.utils.corba_wrapper.LOGGER.client', autospec=True):
+            with patch('webwhois.utils.instrumentation._OBSERVERS', observers):
+                Apps(('webwhois.apps.WebwhoisAppConfig', ))  # Trigger `ready`.
+
+        self.assertEqual(observers, [get_tracing_observer()])
+
+    @override_settings(WEBWHOIS_TRACING=True)
+    def test_ready_tracing_unavailable(self):
+        observers: List[Observer] = []
+        with patch('webwhois.utils.corba_wrapper.LOGGER.client', autospec=True):
+            with patch('webwhois.utils.instrumentation._OBSERVERS', observers):
+                with patch('webwhois.utils.tracing.trace', None):
+                    get_tracing_observer.cache_clear()
+                    self.addCleanup(get_tracing_observer.cache_clear)
+                    Apps(('webwhois.apps.WebwhoisAppConfig', ))  # Trigger `ready`.
+
+        self.assertEqual(observers, [])
@@ -0,0 +1,362 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Budgets of backend calls of the views in `webwhois.urls`.
+
+Each view has a test named after its URL, which fails if the view makes other or more backend calls,
+e.g. if a lookup of related objects turns into N+1 lookups.
+"""
+import json
+import warnings
+from datetime import date
+from io import BytesIO
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from fred_idl.ccReg import FileInfo
+from grill.utils import TestLoggerClient
+
+try:
+    from cdnskey_processor_api.service_report_grpc_pb2 import RawScanResultsReply
+except ImportError:
+    RawScanResultsReply = None
+
+from webwhois.constants import PublicRequestsLogEntryType
+from webwhois.context_processors import _get_managed_zones
+from webwhois.forms.public_request import ConfirmationMethod
+from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
+from webwhois.urls import urlpatterns
+from webwhois.utils import FILE_MANAGER, PUBLIC_REQUEST, STATEMENTOR, WHOIS
+from webwhois.utils.corba_wrapper import SECRETARY_CLIENT
+from webwhois.utils.public_response import SendPasswordResponse
+
+from .test_object_detail import ObjectDetailMixin
+from .test_public_request_views import SubmittedFormTestCase, TestLoggerClient as PublicRequestsLoggerClient
+from .test_views_scan_results import ScanResultsTestMixin
+from .utils import TEMPLATES, apply_patch, assert_backend_calls, make_registrar
+
+
+@override_settings(TEMPLATES=TEMPLATES)
+class RegistryObjectBudgetTest(ObjectDetailMixin):
+    domain_calls = {
+        'WHOIS.get_domain_by_handle': 1,
+        'WHOIS.get_domain_status_descriptions': 1,
+        'WHOIS.get_contact_by_handle': 4,
+        'WHOIS.get_registrar_by_handle': 3,
+        'WHOIS.get_nsset_by_handle': 1,
+        'WHOIS.get_nsset_status_descriptions': 1,
+        'WHOIS.get_keyset_by_handle': 1,
+        'WHOIS.get_keyset_status_descriptions': 1,
+    }
+    contact_calls = {
+        'WHOIS.get_contact_by_handle': 1,
+        'WHOIS.get_contact_status_descriptions': 1,
+        'WHOIS.get_registrar_by_handle': 2,
+    }
+    nsset_calls = {
+        'WHOIS.get_nsset_by_handle': 1,
+        'WHOIS.get_nsset_status_descriptions': 1,
+        'WHOIS.get_contact_by_handle': 1,
+        'WHOIS.get_registrar_by_handle': 1,
+    }
+    keyset_calls = {
+        'WHOIS.get_keyset_by_handle': 1,
+        'WHOIS.get_keyset_status_descriptions': 1,
+        'WHOIS.get_contact_by_handle': 1,
+        'WHOIS.get_registrar_by_handle': 1,
+    }
+    registrar_calls = {'WHOIS.get_registrar_by_handle': 1}
+
+    def setUp(self):
+        super().setUp()
+        WHOIS.get_managed_zone_list.return_value = ['cz']
+        _get_managed_zones.cache_clear()
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_nsset_status_descriptions.return_value = self._get_nsset_status()
+        WHOIS.get_nsset_by_handle.return_value = self._get_nsset()
+        WHOIS.get_keyset_status_descriptions.return_value = self._get_keyset_status()
+        WHOIS.get_keyset_by_handle.return_value = self._get_keyset()
+        WHOIS.get_domain_status_descriptions.return_value = self._get_domain_status()
+        WHOIS.get_domain_by_handle.return_value = self._get_domain()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+    def _get(self, url_name, handle):
+        response = self.client.get(reverse(url_name, kwargs={'handle': handle}))
+        self.assertEqual(response.status_code, 200)
+
+    def test_registry_object_type(self):
+        calls = {'WHOIS.get_contact_by_handle': 1, 'WHOIS.get_nsset_by_handle': 1, 'WHOIS.get_keyset_by_handle': 1,
+                 'WHOIS.get_registrar_by_handle': 1, 'WHOIS.get_domain_by_handle': 1}
+        with assert_backend_calls(self, calls):
+            self._get('webwhois:registry_object_type', 'testhandle.cz')
+
+    def test_detail_contact(self):
+        with assert_backend_calls(self, self.contact_calls):
+            self._get('webwhois:detail_contact', 'KONTAKT')
+
+    def test_detail_nsset(self):
+        with assert_backend_calls(self, self.nsset_calls):
+            self._get('webwhois:detail_nsset', 'NSSET-1')
+
+    def test_detail_keyset(self):
+        with assert_backend_calls(self, self.keyset_calls):
+            self._get('webwhois:detail_keyset', 'KEYSID-1')
+
+    def test_detail_domain(self):
+        with assert_backend_calls(self, self.domain_calls):
+            self._get('webwhois:detail_domain', 'fred.cz')
+
+    def test_detail_registrar(self):
+        with assert_backend_calls(self, self.registrar_calls):
+            self._get('webwhois:detail_registrar', 'REG-FRED_A')
+
+    def test_api_contact(self):
+        with assert_backend_calls(self, self.contact_calls):
+            self._get('webwhois:api_contact', 'KONTAKT')
+
+    def test_api_nsset(self):
+        with assert_backend_calls(self, self.nsset_calls):
+            self._get('webwhois:api_nsset', 'NSSET-1')
+
+    def test_api_keyset(self):
+        with assert_backend_calls(self, self.keyset_calls):
+            self._get('webwhois:api_keyset', 'KEYSID-1')
+
+    def test_api_domain(self):
+        with assert_backend_calls(self, self.domain_calls):
+            self._get('webwhois:api_domain', 'fred.cz')
+
+    def test_api_registrar(self):
+        with assert_backend_calls(self, self.registrar_calls):
+            self._get('webwhois:api_registrar', 'REG-FRED_A')
+
+    def test_api_batch(self):
+        # Each object is looked up only once.
+        data = {'type': 'registrar', 'handles': ['REG-A', 'REG-B', 'REG-C']}
+        with assert_backend_calls(self, {'WHOIS.get_registrar_by_handle': 3}):
+            response = self.client.post(reverse('webwhois:api_batch'), json.dumps(data),
+                                        content_type='application/json')
+            lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 3)
+
+
+@override_settings(ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES)
+class RegistrarBudgetTest(GetRegistryObjectMixin, SimpleTestCase):
+    def setUp(self):
+        spec = ('get_registrar_certification_list', 'get_registrar_groups', 'get_registrars')
+        apply_patch(self, patch.object(WHOIS, 'client', spec=spec))
+        apply_patch(self, patch.object(FILE_MANAGER, 'client', spec=('info', 'load')))
+
+    def test_registrars(self):
+        WHOIS.get_registrars.return_value = [make_registrar()]
+        WHOIS.get_registrar_groups.return_value = []
+        WHOIS.get_registrar_certification_list.return_value = []
+        calls = {'WHOIS.get_registrars': 1, 'WHOIS.get_registrar_certification_list': 1,
+                 'WHOIS.get_registrar_groups': 1}
+
+        with assert_backend_calls(self, calls):
+            response = self.client.get(reverse('webwhois:registrars'))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_download_evaluation_file(self):
+        WHOIS.get_registrar_certification_list.return_value = self._get_registrar_certs()
+        FILE_MANAGER.info.return_value = FileInfo(id=2, name='test.html', path='2015/12/9/1', mimetype='text/html',
+                                                  filetype=6, crdate='2015-12-09 16:16:28.598757', size=5)
+        FILE_MANAGER.load.return_value.download.return_value = "<html><body>The content.</body></html>"
+        calls = {'WHOIS.get_registrar_certification_list': 1, 'FILE_MANAGER.info': 1, 'FILE_MANAGER.load': 1}
+
+        with assert_backend_calls(self, calls):
+            response = self.client.get(reverse("webwhois:download_evaluation_file", kwargs={"handle": "REG-MOJEID"}))
+
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES)
+@skipIf(RawScanResultsReply is None, "Only available with cdnskey_processor_api installed.")
+class ScanResultsBudgetTest(ScanResultsTestMixin):
+    calls = {'CDNSKEY.raw_scan_results': 1, 'WHOIS.get_domain_by_handle': 1}
+
+    def setUp(self):
+        super().setUp()
+        reply = RawScanResultsReply()
+        reply.data.items.append(self._get_scan_result())
+        self.cdnskey_client.mock.return_value = [reply]
+
+    def test_scan_results(self):
+        with assert_backend_calls(self, self.calls):
+            response = self.client.get(reverse('webwhois:scan_results', kwargs={'handle': self.domain}))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_scan_results_raw(self):
+        with assert_backend_calls(self, self.calls):
+            response = self.client.get(reverse('webwhois:scan_results_raw', kwargs={'handle': self.domain}))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_scan_results_export(self):
+        url = reverse('webwhois:scan_results_export', kwargs={'handle': self.domain, 'format': 'ndjson'})
+        with assert_backend_calls(self, self.calls):
+            response = self.client.get(url)
+            lines = b''.join(response.streaming_content).splitlines()
+
+        self.assertEqual(len(lines), 1)
+
+
+@override_settings(TEMPLATES=TEMPLATES, USE_TZ=True)
+class PublicRequestBudgetTest(SubmittedFormTestCase):
+    def setUp(self):
+        super().setUp()
+        catcher = warnings.catch_warnings(record=True)
+        self.addCleanup(catcher.__exit__)
+        catcher.__enter__()
+
+    def _post(self, url_name, data, calls):
+        with assert_backend_calls(self, calls):
+            response = self.client.post(reverse(url_name), data)
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_form_send_password(self):
+        PUBLIC_REQUEST.create_authinfo_request_registry_email.return_value = 24
+        data = {'object_type': 'domain', 'handle': 'foo.cz', 'confirmation_method': 'signed_email',
+                'send_to_0': 'email_in_registry'}
+        self._post('webwhois:form_send_password', data,
+                   {'PUBLIC_REQUEST.create_authinfo_request_registry_email': 1})
+
+    def test_form_personal_info(self):
+        PUBLIC_REQUEST.create_personal_info_request_registry_email.return_value = 24
+        data = {'object_type': 'contact', 'handle': 'CONTACT', 'send_to_0': 'email_in_registry'}
+        self._post('webwhois:form_personal_info', data,
+                   {'PUBLIC_REQUEST.create_personal_info_request_registry_email': 1})
+
+    def test_form_block_object(self):
+        PUBLIC_REQUEST.create_block_unblock_request.return_value = 24
+        data = {'object_type': 'domain', 'handle': 'foo.cz', 'confirmation_method': 'signed_email',
+                'lock_type': 'transfer'}
+        self._post('webwhois:form_block_object', data, {'PUBLIC_REQUEST.create_block_unblock_request': 1})
+
+    def test_form_unblock_object(self):
+        PUBLIC_REQUEST.create_block_unblock_request.return_value = 24
+        data = {'object_type': 'domain', 'handle': 'foo.cz', 'confirmation_method': 'signed_email',
+                'lock_type': 'transfer'}
+        self._post('webwhois:form_unblock_object', data, {'PUBLIC_REQUEST.create_block_unblock_request': 1})
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES)
+class PublicResponseBudgetTest(SimpleTestCase):
+    public_key = "Gazpacho!"
+
+    def setUp(self):
+        apply_patch(self, patch.object(PUBLIC_REQUEST, 'client', spec=('create_public_request_pdf', )))
+        apply_patch(self, patch.object(SECRETARY_CLIENT, 'client', spec=('render_pdf', )))
+        apply_patch(self, patch('webwhois.utils.corba_wrapper.PUBLIC_REQUESTS_LOGGER.client',
+                                new=PublicRequestsLoggerClient()))
+        catcher = warnings.catch_warnings(record=True)
+        self.addCleanup(catcher.__exit__)
+        catcher.__enter__()
+
+        public_response = SendPasswordResponse('contact', 42, PublicRequestsLogEntryType.AUTH_INFO, 'KRYTEN',
+                                               'kryten@example.org', ConfirmationMethod.SIGNED_EMAIL)
+        public_response.create_date = date(1988, 9, 6)
+        cache.set(self.public_key, public_response)
+
+    def tearDown(self):
+        cache.clear()
+
+    def _get(self, url_name, calls):
+        with assert_backend_calls(self, calls):
+            response = self.client.get(reverse(url_name, kwargs={'public_key': self.public_key}))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_public_response(self):
+        self._get('webwhois:public_response', 0)
+
+    def test_public_response_pdf(self):
+        SECRETARY_CLIENT.render_pdf.return_value = b'Quagaars!'
+        self._get('webwhois:public_response_pdf', {'SECRETARY.render_pdf': 1})
+
+    def test_response_not_found(self):
+        self._get('webwhois:response_not_found', 0)
+
+    def test_email_in_registry_response(self):
+        self._get('webwhois:email_in_registry_response', 0)
+
+    def test_custom_email_response(self):
+        self._get('webwhois:custom_email_response', 0)
+
+    def test_notarized_letter_response(self):
+        self._get('webwhois:notarized_letter_response', 0)
+
+    def test_notarized_letter_serve_pdf(self):
+        PUBLIC_REQUEST.create_public_request_pdf.return_value = b'PDF content...'
+        self._get('webwhois:notarized_letter_serve_pdf', {'PUBLIC_REQUEST.create_public_request_pdf': 1})
+
+
+@override_settings(ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES)
+class OtherViewsBudgetTest(SimpleTestCase):
+    def setUp(self):
+        self.test_logger = TestLoggerClient()
+        apply_patch(self, patch('webwhois.utils.corba_wrapper.LOGGER.client', new=self.test_logger))
+
+    def test_form_whois(self):
+        with assert_backend_calls(self, 0):
+            response = self.client.get(reverse('webwhois:form_whois'))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_jsi18n(self):
+        with assert_backend_calls(self, 0):
+            response = self.client.get(reverse('webwhois:jsi18n', kwargs={'packages': 'webwhois'}))
+
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(WEBWHOIS_METRICS=True)
+    def test_metrics(self):
+        with patch('webwhois.views.metrics.generate_metrics', return_value=(b'metrics', 'text/plain')):
+            with assert_backend_calls(self, 0):
+                response = self.client.get(reverse('webwhois_metrics:metrics'))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_record_statement_pdf(self):
+        spec = ('get_contact_statement', 'get_domain_statement', 'get_keyset_statement', 'get_nsset_statement')
+        apply_patch(self, patch.object(STATEMENTOR, 'client', spec=spec))
+        STATEMENTOR.get_domain_statement.return_value = BytesIO(b"PDF content...")
+
+        with assert_backend_calls(self, {'STATEMENTOR.get_domain_statement': 1}):
+            response = self.client.get(
+                reverse("webwhois:record_statement_pdf", kwargs={"object_type": "domain", "handle": "fred.cz"}))
+
+        self.assertEqual(response.status_code, 200)
+
+
+class BudgetCoverageTest(SimpleTestCase):
+    def test_all_urls(self):
+        # Every view in webwhois.urls has its budget.
+        cases = (RegistryObjectBudgetTest, RegistrarBudgetTest, ScanResultsBudgetTest, PublicRequestBudgetTest,
+                 PublicResponseBudgetTest, OtherViewsBudgetTest)
+        tested = {name[len('test_'):] for case in cases for name in dir(case) if name.startswith('test_')}
+        self.assertEqual({pattern.name for pattern in urlpatterns} - tested, set())
@@ -0,0 +1,171 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from webwhois.cache import SQLiteCache
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'cache', 'cache.sqlite3')
+        self.cache = SQLiteCache(self.path, {'OPTIONS': {'MAX_ENTRIES': 10, 'CULL_EVERY': 1}})
+
+    def test_set_get(self):
+        self.cache.set('kryten', {'series': 4000})
+
+        self.assertEqual(self.cache.get('kryten'), {'series': 4000})
+        self.assertTrue(self.cache.has_key('kryten'))
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_get_default(self):
+        self.assertIsNone(self.cache.get('kryten'))
+        self.assertEqual(self.cache.get('kryten', 'default'), 'default')
+        self.assertFalse(self.cache.has_key('kryten'))
+
+    def test_shared(self):
+        self.cache.set('kryten', 'mechanoid')
+
+        other = SQLiteCache(self.path, {})
+        self.assertEqual(other.get('kryten'), 'mechanoid')
+
+    def test_expired(self):
+        with patch('webwhois.cache.time.time', return_value=1000):
+            self.cache.set('kryten', 'mechanoid', timeout=10)
+        with patch('webwhois.cache.time.time', return_value=1010):
+            self.assertIsNone(self.cache.get('kryten'))
+            self.assertFalse(self.cache.has_key('kryten'))
+            self.assertFalse(self.cache.touch('kryten'))
+
+    def test_forever(self):
+        self.cache.set('kryten', 'mechanoid', timeout=None)
+
+        with patch('webwhois.cache.time.time', return_value=2 ** 40):
+            self.assertEqual(self.cache.get('kryten'), 'mechanoid')
+
+    def test_non_positive_timeout(self):
+        self.cache.set('kryten', 'mechanoid')
+
+        self.cache.set('kryten', 'human', timeout=0)
+
+        self.assertIsNone(self.cache.get('kryten'))
+
+    def test_add(self):
+        self.assertTrue(self.cache.add('kryten', 'mechanoid'))
+        self.assertFalse(self.cache.add('kryten', 'human'))
+        self.assertEqual(self.cache.get('kryten'), 'mechanoid')
+
+    def test_add_expired(self):
+        with patch('webwhois.cache.time.time', return_value=1000):
+            self.cache.set('kryten', 'mechanoid', timeout=10)
+        with patch('webwhois.cache.time.time', return_value=1010):
+            self.assertTrue(self.cache.add('kryten', 'human'))
+            self.assertEqual(self.cache.get('kryten'), 'human')
+
+    def test_touch(self):
+        with patch('webwhois.cache.time.time', return_value=1000):
+            self.cache.set('kryten', 'mechanoid', timeout=10)
+            self.assertTrue(self.cache.touch('kryten', timeout=100))
+        with patch('webwhois.cache.time.time', return_value=1050):
+            self.assertEqual(self.cache.get('kryten'), 'mechanoid')
+
+    def test_delete(self):
+        self.cache.set('kryten', 'mechanoid')
+
+        self.assertTrue(self.cache.delete('kryten'))
+        self.assertFalse(self.cache.delete('kryten'))
+        self.assertIsNone(self.cache.get('kryten'))
+
+    def test_clear(self):
+        self.cache.set_many({'kryten': 'mechanoid', 'lister': 'human'})
+
+        self.cache.clear()
+
+        self.assertEqual(self.cache.get_many(['kryten', 'lister']), {})
+
+    def test_incr(self):
+        self.cache.set('counter', 1)
+
+        self.assertEqual(self.cache.incr('counter'), 2)
+        self.assertEqual(self.cache.get('counter'), 2)
+
+    def test_cull(self):
+        for i in range(20):
+            self.cache.set('key-{}'.format(i), i)
+
+        count = self.cache._get_connection().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        self.assertLessEqual(count, 10)
+        self.assertEqual(self.cache.get('key-19'), 19)
+
+    def test_cull_every(self):
+        cache = SQLiteCache(self.path, {'OPTIONS': {'MAX_ENTRIES': 10, 'CULL_EVERY': 3}})
+
+        with patch.object(cache, '_cull', wraps=cache._cull) as cull_mock:
+            for i in range(7):
+                cache.set('key-{}'.format(i), i)
+
+        # Cache is checked on the first, fourth and seventh write.
+        self.assertEqual(len(cull_mock.mock_calls), 3)
+
+    def test_cull_every_invalid(self):
+        for value in (0, -1, 1.5, None):
+            with self.subTest(value=value):
+                with self.assertRaises(ImproperlyConfigured):
+                    SQLiteCache(self.path, {'OPTIONS': {'CULL_EVERY': value}})
+
+    def test_cull_removes_expired(self):
+        with patch('webwhois.cache.time.time', return_value=1000):
+            self.cache.set('expired', 'value', timeout=10)
+
+        # Expired entries are removed even if the cache isn't full.
+        self.cache.set('kryten', 'mechanoid')
+
+        keys = [row[0] for row in self.cache._get_connection().execute('SELECT key FROM cache')]
+        self.assertEqual(keys, [self.cache.make_key('kryten')])
+
+    def test_cull_expired_first(self):
+        with patch('webwhois.cache.time.time', return_value=1000):
+            self.cache.set('expired', 'value', timeout=10)
+        for i in range(9):
+            self.cache.set('key-{}'.format(i), i, timeout=None)
+
+        self.cache.set('key-9', 9, timeout=None)
+
+        self.assertEqual(self.cache.get_many(['key-{}'.format(i) for i in range(10)]),
+                         {'key-{}'.format(i): i for i in range(10)})
+
+    def test_fork(self):
+        connection = self.cache._get_connection()
+
+        with patch('webwhois.cache.os.getpid', return_value=-1):
+            self.assertIsNot(self.cache._get_connection(), connection)
+
+    def test_settings(self):
+        with override_settings(CACHES={'default': {'BACKEND': 'webwhois.cache.SQLiteCache', 'LOCATION': self.path}}):
+            caches['default'].set('kryten', 'mechanoid')
+
+            self.assertEqual(caches['default'].get('kryten'), 'mechanoid')
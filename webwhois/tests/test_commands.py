@@ -0,0 +1,59 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+
+from .utils import apply_patch
+
+
+@override_settings(WEBWHOIS_PURGE_URLS=['http://varnish/'])
+class WebwhoisPurgeTest(SimpleTestCase):
+    def setUp(self):
+        self.purge_mock = apply_patch(self, patch('webwhois.management.commands.webwhois_purge.purge_surrogate_keys',
+                                                  return_value=[]))
+
+    def test_purge(self):
+        out = StringIO()
+
+        call_command('webwhois_purge', 'contact:KONTAKT', 'domain:fred.cz', stdout=out)
+
+        self.purge_mock.assert_called_once_with(['contact:kontakt', 'domain:fred.cz'])
+        self.assertEqual(out.getvalue(), 'Purged contact:kontakt domain:fred.cz.\n')
+
+    def test_invalid_object(self):
+        for obj in ('KONTAKT', 'unknown:KONTAKT', 'contact:'):
+            with self.subTest(obj=obj):
+                with self.assertRaisesMessage(CommandError, 'Invalid registry object'):
+                    call_command('webwhois_purge', obj)
+        self.purge_mock.assert_not_called()
+
+    def test_failed(self):
+        self.purge_mock.return_value = ['http://varnish/']
+
+        with self.assertRaisesMessage(CommandError, 'Purge failed in http://varnish/.'):
+            call_command('webwhois_purge', 'contact:KONTAKT')
+
+    @override_settings(WEBWHOIS_PURGE_URLS=[])
+    def test_no_urls(self):
+        with self.assertRaisesMessage(CommandError, 'No edge caches are defined'):
+            call_command('webwhois_purge', 'contact:KONTAKT')
@@ -17,7 +17,7 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 from datetime import datetime
-from unittest.mock import call, patch, sentinel
+from unittest.mock import Mock, call, patch, sentinel
 
 import omniORB
 from django.test import SimpleTestCase
@@ -25,8 +25,12 @@ from django.utils import timezone
 from fred_idl.ccReg import FileManager, _objref_FileDownload
 from fred_idl.Registry import Buffer, IsoDateTime
 from fred_idl.Registry.Whois import WhoisIntf
+from grill.utils import TestLogEntry, TestLoggerClient
 
-from webwhois.utils.corba_wrapper import WebwhoisCorbaRecoder, load_filemanager_from_idl, load_whois_from_idl
+from webwhois.constants import LOGGER_SERVICE, LogEntryType, LogResult
+from webwhois.utils.corba_wrapper import (InstrumentedLogger, WebwhoisCorbaRecoder, load_filemanager_from_idl,
+                                          load_whois_from_idl)
+from webwhois.utils.instrumentation import Observer, observe
 
 from .utils import apply_patch
 
@@ -85,3 +89,20 @@ class TestLoadIdl(SimpleTestCase):
 
         self.assertEqual(result, sentinel.corba_object)
         self.assertEqual(self.corba_mock.mock_calls, [call.get_object('FileManager', FileManager)])
+
+
+class InstrumentedLoggerTest(SimpleTestCase):
+    def test_create(self):
+        client = TestLoggerClient()
+        logger = InstrumentedLogger(client, LOGGER_SERVICE, LogResult.ERROR)
+
+        with observe(Mock(spec=Observer)) as observer:
+            with logger.create(LogEntryType.INFO, source_ip='127.0.0.1') as log_entry:
+                observer.span_finished.assert_not_called()
+                log_entry.result = LogResult.SUCCESS
+
+        span = observer.span_finished.call_args[0][0]
+        self.assertEqual((span.kind, span.name, span.args), ('log_entry', 'LOGGER.create', (LogEntryType.INFO, )))
+        self.assertIsNone(span.error)
+        log_entry = TestLogEntry(LOGGER_SERVICE, LogEntryType.INFO, LogResult.SUCCESS, source_ip='127.0.0.1')
+        self.assertEqual(client.mock.mock_calls, log_entry.get_calls())
@@ -0,0 +1,242 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+import json
+from unittest.mock import ANY, Mock, patch, sentinel
+
+from django.http import HttpResponse
+from django.template import TemplateDoesNotExist, engines
+from django.template.response import SimpleTemplateResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve
+from testfixtures import LogCapture
+
+from webwhois.middleware import InstrumentationMiddleware, ProfilingMiddleware
+from webwhois.utils.instrumentation import SPAN_BACKEND, Observer, add_observer, get_observers, measure, remove_observer
+
+
+class InstrumentationMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.observer = Mock(spec=Observer)
+        add_observer(self.observer)
+        self.addCleanup(remove_observer, self.observer)
+        self.middleware = InstrumentationMiddleware(Mock(return_value=HttpResponse()))
+        self.request = RequestFactory().get('/domain/example.org/')
+        self.request.resolver_match = resolve('/domain/example.org/')
+
+    def test_view(self):
+        self.middleware.process_view(self.request, sentinel.view, (), {'handle': 'example.org'})
+        response = HttpResponse()
+
+        self.assertEqual(self.middleware.process_response(self.request, response), response)
+
+        span = self.observer.span_started.call_args[0][0]
+        self.assertEqual((span.kind, span.name, span.args), ('view', 'webwhois:detail_domain', ('example.org', )))
+        self.observer.span_finished.assert_called_once_with(span)
+        self.assertIsNotNone(span.duration)
+        self.assertIsNone(span.error)
+        self.assertFalse(hasattr(self.request, '_webwhois_span'))
+
+    def test_exception(self):
+        error = ValueError('Smeg!')
+        self.middleware.process_view(self.request, sentinel.view, (), {'handle': 'example.org'})
+
+        self.assertIsNone(self.middleware.process_exception(self.request, error))
+        self.middleware.process_response(self.request, HttpResponse(status=500))
+
+        span = self.observer.span_finished.call_args[0][0]
+        self.assertEqual(span.error, error)
+
+    def test_not_resolved(self):
+        # Response for unresolved URLs, e.g. a 404, is not measured.
+        self.assertIsNone(self.middleware.process_exception(self.request, ValueError('Smeg!')))
+        self.middleware.process_response(self.request, HttpResponse(status=404))
+
+        self.observer.span_finished.assert_not_called()
+
+    def test_render(self):
+        self.middleware.process_view(self.request, sentinel.view, (), {'handle': 'example.org'})
+        response = SimpleTemplateResponse(engines['django'].from_string('Gazpacho!'))
+
+        self.assertEqual(self.middleware.process_template_response(self.request, response), response)
+        self.observer.span_finished.assert_not_called()
+        response.render()
+
+        span = self.observer.span_finished.call_args[0][0]
+        self.assertEqual((span.kind, span.name), ('render', 'webwhois:detail_domain'))
+        self.assertEqual(response.content, b'Gazpacho!')
+        # Already rendered response isn't measured again.
+        response.render()
+        self.observer.span_finished.assert_called_once_with(span)
+
+    def test_render_error(self):
+        self.middleware.process_view(self.request, sentinel.view, (), {'handle': 'example.org'})
+        response = SimpleTemplateResponse(engines['django'].from_string('{% include "unknown.html" %}'))
+        self.middleware.process_template_response(self.request, response)
+
+        with self.assertRaises(TemplateDoesNotExist):
+            response.render()
+
+        span = self.observer.span_finished.call_args[0][0]
+        self.assertEqual((span.kind, span.name), ('render', 'webwhois:detail_domain'))
+        self.assertIsInstance(span.error, TemplateDoesNotExist)
+
+    def test_server_timing_disabled(self):
+        self.middleware.process_request(self.request)
+        self.middleware.process_view(self.request, sentinel.view, (), {'handle': 'example.org'})
+        response = self.middleware.process_response(self.request, HttpResponse())
+
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(WEBWHOIS_SERVER_TIMING=True)
+    def test_server_timing(self):
+        self.middleware.process_request(self.request)
+        self.middleware.process_view(self.request, sentinel.view, (), {'handle': 'example.org'})
+        with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle'):
+            pass
+
+        response = self.middleware.process_response(self.request, HttpResponse())
+
+        self.assertRegex(response['Server-Timing'],
+                         r'^whois;dur=\d+\.\d;desc="1 call", view;dur=\d+\.\d;desc="1 call"$')
+        self.assertEqual(get_observers(), (self.observer, ))
+        self.assertFalse(hasattr(self.request, '_webwhois_server_timing'))
+
+    @override_settings(WEBWHOIS_SLOW_REQUEST_THRESHOLD=0.5)
+    def test_slow_request(self):
+        with patch('webwhois.utils.slow_requests.time.perf_counter', return_value=100):
+            self.middleware.process_request(self.request)
+        self.middleware.process_view(self.request, sentinel.view, (), {'handle': 'example.org'})
+        with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle', ('example.org', )):
+            pass
+
+        with LogCapture('webwhois.utils.slow_requests') as log_handler:
+            with patch('webwhois.utils.slow_requests.time.perf_counter', return_value=101):
+                self.middleware.process_response(self.request, HttpResponse())
+
+        self.assertEqual(len(log_handler.records), 1)
+        record = json.loads(log_handler.records[0].getMessage())
+        self.assertEqual((record['view'], record['args'], record['duration']),
+                         ('webwhois:detail_domain', ['example.org'], 1))
+        self.assertEqual([c['name'] for c in record['calls']], ['WHOIS.get_domain_by_handle'])
+        self.assertEqual(get_observers(), (self.observer, ))
+        self.assertFalse(hasattr(self.request, '_webwhois_slow_request_recorder'))
+
+    @override_settings(WEBWHOIS_SLOW_REQUEST_THRESHOLD=0.5)
+    def test_fast_request(self):
+        with patch('webwhois.utils.slow_requests.time.perf_counter', return_value=100):
+            self.middleware.process_request(self.request)
+        self.middleware.process_view(self.request, sentinel.view, (), {'handle': 'example.org'})
+
+        with LogCapture('webwhois.utils.slow_requests') as log_handler:
+            with patch('webwhois.utils.slow_requests.time.perf_counter', return_value=100.25):
+                self.middleware.process_response(self.request, HttpResponse())
+
+        log_handler.check()
+        self.assertEqual(get_observers(), (self.observer, ))
+
+    def test_slow_request_disabled(self):
+        self.middleware.process_request(self.request)
+
+        self.assertFalse(hasattr(self.request, '_webwhois_slow_request_recorder'))
+
+    @override_settings(WEBWHOIS_SERVER_TIMING=True)
+    def test_server_timing_not_resolved(self):
+        self.middleware.process_request(self.request)
+
+        response = self.middleware.process_response(self.request, HttpResponse(status=404))
+
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(get_observers(), (self.observer, ))
+
+
+@override_settings(WEBWHOIS_PROFILING_DIR='/profiles', WEBWHOIS_PROFILING_RATE=1.0)
+class ProfilingMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.middleware = ProfilingMiddleware(Mock(return_value=HttpResponse()))
+        self.request = RequestFactory().get('/domain/example.org/')
+        self.request.resolver_match = resolve('/domain/example.org/')
+        patcher = patch('webwhois.middleware.save_profile', autospec=True)
+        self.addCleanup(patcher.stop)
+        self.save_mock = patcher.start()
+
+    def _request(self):
+        self.assertIsNone(self.middleware.process_view(self.request, sentinel.view, (), {'handle': 'example.org'}))
+        response = HttpResponse()
+        self.assertEqual(self.middleware.process_response(self.request, response), response)
+        self.assertFalse(hasattr(self.request, '_webwhois_profile'))
+
+    def test_sampled(self):
+        self._request()
+
+        self.save_mock.assert_called_once_with(ANY, '/profiles', 'webwhois:detail_domain', ANY, 100)
+
+    @override_settings(WEBWHOIS_PROFILING_DIR=None)
+    def test_disabled(self):
+        self._request()
+
+        self.save_mock.assert_not_called()
+
+    @override_settings(WEBWHOIS_PROFILING_RATE=0.0)
+    def test_not_sampled(self):
+        self._request()
+
+        self.save_mock.assert_not_called()
+
+    @override_settings(WEBWHOIS_PROFILING_RATE=0.0, WEBWHOIS_PROFILING_THRESHOLD=0.1)
+    def test_threshold(self):
+        with patch('webwhois.middleware.time.perf_counter', side_effect=[10, 10.5]):
+            self._request()
+
+        self.save_mock.assert_called_once_with(ANY, '/profiles', 'webwhois:detail_domain', 0.5, 100)
+
+    @override_settings(WEBWHOIS_PROFILING_RATE=0.0, WEBWHOIS_PROFILING_THRESHOLD=0.1)
+    def test_threshold_fast(self):
+        with patch('webwhois.middleware.time.perf_counter', side_effect=[10, 10.05]):
+            self._request()
+
+        self.save_mock.assert_not_called()
+
+    def test_url_names(self):
+        for url_names in (['detail_domain'], ['webwhois:detail_domain'], ['detail_contact', 'detail_domain']):
+            with self.subTest(url_names=url_names):
+                self.save_mock.reset_mock()
+                with override_settings(WEBWHOIS_PROFILING_URL_NAMES=url_names):
+                    self._request()
+                self.save_mock.assert_called_once()
+
+    @override_settings(WEBWHOIS_PROFILING_URL_NAMES=['detail_contact'])
+    def test_url_names_other(self):
+        self._request()
+
+        self.save_mock.assert_not_called()
+
+    def test_concurrent(self):
+        other_request = RequestFactory().get('/domain/example.org/')
+        other_request.resolver_match = self.request.resolver_match
+        self.middleware.process_view(self.request, sentinel.view, (), {'handle': 'example.org'})
+
+        # Only one request is profiled at a time.
+        self.middleware.process_view(other_request, sentinel.view, (), {'handle': 'example.org'})
+        self.middleware.process_response(other_request, HttpResponse())
+        self.middleware.process_response(self.request, HttpResponse())
+
+        self.save_mock.assert_called_once()
+        # Lock is released.
+        self._request()
+        self.assertEqual(self.save_mock.call_count, 2)
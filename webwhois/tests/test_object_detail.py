@@ -21,15 +21,19 @@ import warnings
 from datetime import date
 from unittest.mock import call, patch, sentinel
 
+from django.conf import settings
+from django.core.cache import caches
 from django.test import RequestFactory, SimpleTestCase
 from django.test.utils import override_settings
 from django.urls import reverse
+from django.utils import translation
 from django.utils.formats import reset_format_cache
 from django.views import View
 from fred_idl.Registry.Whois import (INVALID_HANDLE, INVALID_LABEL, OBJECT_DELETE_CANDIDATE, OBJECT_NOT_FOUND,
                                      TOO_MANY_LABELS, UNMANAGED_ZONE, ContactIdentification,
-                                     DisclosableContactIdentification)
+                                     DisclosableContactIdentification, DisclosableString)
 from grill.utils import TestLogEntry, TestLoggerClient
+from omniORB import CORBA
 from testfixtures import Comparison, StringComparison
 
 from webwhois.constants import (LOGGER_SERVICE, STATUS_DELETE_CANDIDATE, STATUS_LINKED, STATUS_VALIDATED,
@@ -38,6 +42,7 @@ from webwhois.context_processors import _get_managed_zones
 from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
 from webwhois.utils import WHOIS
 from webwhois.views.base import RegistryObjectMixin
+from webwhois.views.detail_contact import ContactDetailView
 from webwhois.views.detail_keyset import KeysetDetailMixin
 from webwhois.views.detail_nsset import NssetDetailMixin
 
@@ -947,3 +952,411 @@ class TestRegistryObjectMixin(SimpleTestCase):
         view.request = RequestFactory().get('/dummy/')
         context = view.get_context_data(handle=sentinel.handle)
         self.assertTrue(context['object_delete_candidate'])
+
+
+class ConditionalGetTest(ObjectDetailMixin):
+    def setUp(self):
+        super().setUp()
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        self.url = reverse("webwhois:detail_contact", kwargs={"handle": "KONTAKT"})
+
+    def test_validators(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['ETag'], r'^W/"[0-9a-f]{40}"$')
+        self.assertNotIn('Last-Modified', response)
+
+    def test_if_none_match(self):
+        etag = self.client.get(self.url)['ETag']
+        WHOIS.reset_mock()
+
+        with patch('django.views.generic.base.TemplateResponseMixin.render_to_response') as render_mock:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        render_mock.assert_not_called()
+        # Objects are still loaded from the backend.
+        self.assertEqual(WHOIS.get_contact_by_handle.mock_calls, [call('KONTAKT')])
+
+    def test_if_none_match_changed(self):
+        etag = self.client.get(self.url)['ETag']
+        WHOIS.get_contact_by_handle.return_value = self._get_contact(statuses=[])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_none_match_changed_attribute(self):
+        etag = self.client.get(self.url)['ETag']
+        name = DisclosableString(value='Arthur Dent', disclose=True)
+        WHOIS.get_contact_by_handle.return_value = self._get_contact(name=name)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_none_match_changed_related(self):
+        etag = self.client.get(self.url)['ETag']
+        registrar = self._get_registrar()
+        registrar.name = 'Company B L.t.d.'
+        WHOIS.get_registrar_by_handle.return_value = registrar
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_none_match_language(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with translation.override('cs'):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_modified_since(self):
+        # Timestamps of the objects don't reflect changes of related objects, so they are not used as validators.
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE='Thu, 17 Dec 2015 09:48:25 GMT')
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_found(self):
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='*')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'page-cache'}},
+                   WEBWHOIS_PAGE_CACHE_TIMEOUTS={'contact': 60})
+class PageCacheTest(ObjectDetailMixin):
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        self.url = reverse("webwhois:detail_contact", kwargs={"handle": "KONTAKT"})
+
+    def test_cached(self):
+        response = self.client.get(self.url)
+        WHOIS.reset_mock()
+
+        cached_response = self.client.get(self.url)
+
+        self.assertEqual(cached_response.status_code, 200)
+        self.assertEqual(cached_response.content, response.content)
+        self.assertEqual(cached_response['ETag'], response['ETag'])
+        self.assertEqual(WHOIS.mock_calls, [])
+
+    def test_cached_log(self):
+        self.client.get(self.url)
+
+        with patch.object(ContactDetailView, '_create_log_entry', autospec=True) as log_mock:
+            self.client.get(self.url)
+
+        log_entry = log_mock.return_value.__enter__.return_value
+        self.assertEqual(log_entry.result, LogResult.SUCCESS)
+        self.assertEqual(log_entry.properties.__setitem__.mock_calls, [call('foundType', ['contact'])])
+
+    def test_cached_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        WHOIS.reset_mock()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(WHOIS.mock_calls, [])
+
+    def test_language(self):
+        self.client.get(self.url)
+        WHOIS.reset_mock()
+
+        with translation.override('cs'):
+            self.client.get(self.url)
+
+        self.assertEqual(WHOIS.get_contact_by_handle.mock_calls, [call('KONTAKT')])
+
+    def test_url(self):
+        self.client.get(self.url)
+        WHOIS.reset_mock()
+
+        self.client.get(reverse("webwhois:detail_contact", kwargs={"handle": "OTHER"}))
+
+        self.assertEqual(WHOIS.get_contact_by_handle.mock_calls, [call('OTHER')])
+
+    def test_query_ignored(self):
+        response = self.client.get(self.url)
+        WHOIS.reset_mock()
+
+        cached_response = self.client.get(self.url, {'junk': 'value'})
+
+        self.assertEqual(cached_response.content, response.content)
+        self.assertEqual(WHOIS.mock_calls, [])
+
+    def test_query_params(self):
+        with patch.object(ContactDetailView, 'page_cache_query_params', ('page', 'lang')):
+            self.client.get(self.url, {'page': '1'})
+            WHOIS.reset_mock()
+
+            # Parameters are normalized, other parameters are ignored.
+            self.client.get(self.url, {'junk': 'value', 'page': '1'})
+            self.assertEqual(WHOIS.mock_calls, [])
+            self.client.get(self.url, {'page': '2'})
+            self.assertEqual(WHOIS.get_contact_by_handle.mock_calls, [call('KONTAKT')])
+
+    def test_namespace(self):
+        self.client.get(self.url)
+        WHOIS.reset_mock()
+        async_url = reverse("webwhois_async:detail_contact", kwargs={"handle": "KONTAKT"})
+
+        response = self.client.get(async_url)
+        # Pages of other namespaces are cached separately.
+        self.assertEqual(WHOIS.get_contact_by_handle.mock_calls, [call('KONTAKT')])
+        WHOIS.reset_mock()
+        cached_response = self.client.get(async_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(cached_response.content, response.content)
+        self.assertEqual(WHOIS.mock_calls, [])
+
+    def test_server_exception(self):
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        self.client.get(self.url)
+
+        self.client.get(self.url)
+
+        self.assertEqual(WHOIS.get_contact_by_handle.mock_calls, [call('KONTAKT'), call('KONTAKT')])
+
+    @override_settings(WEBWHOIS_PAGE_CACHE_MAX_SIZE=10)
+    def test_too_large(self):
+        self.client.get(self.url)
+
+        self.client.get(self.url)
+
+        self.assertEqual(WHOIS.get_contact_by_handle.mock_calls, [call('KONTAKT'), call('KONTAKT')])
+
+    @override_settings(WEBWHOIS_PAGE_CACHE_TIMEOUTS={'domain': 60})
+    def test_disabled(self):
+        self.client.get(self.url)
+
+        self.client.get(self.url)
+
+        self.assertEqual(WHOIS.get_contact_by_handle.mock_calls, [call('KONTAKT'), call('KONTAKT')])
+
+
+@override_settings(WEBWHOIS_CACHE_CONTROL='public, max-age=60', WEBWHOIS_SURROGATE_CONTROL='max-age=3600',
+                   WEBWHOIS_SURROGATE_KEY_HEADER='Surrogate-Key')
+class SurrogateKeysTest(ObjectDetailMixin):
+    def setUp(self):
+        super().setUp()
+        WHOIS.get_managed_zone_list.return_value = ['cz']
+        WHOIS.get_domain_by_handle.return_value = self._get_domain()
+        WHOIS.get_domain_status_descriptions.return_value = self._get_domain_status()
+        WHOIS.get_nsset_by_handle.return_value = self._get_nsset()
+        WHOIS.get_nsset_status_descriptions.return_value = self._get_nsset_status()
+        WHOIS.get_keyset_by_handle.return_value = self._get_keyset()
+        WHOIS.get_keyset_status_descriptions.return_value = self._get_keyset_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        self.url = reverse("webwhois:detail_domain", kwargs={"handle": "fred.cz"})
+
+    def test_headers(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        self.assertEqual(response['Surrogate-Control'], 'max-age=3600')
+        self.assertEqual(response['Surrogate-Key'],
+                         'contact:kontakt domain:fred.cz keyset:keysid-1 nsset:nsset-1 registrar:reg-fred_a')
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        self.assertIn('Surrogate-Key', response)
+
+    def test_server_exception(self):
+        WHOIS.get_domain_by_handle.side_effect = OBJECT_NOT_FOUND
+
+        response = self.client.get(self.url)
+
+        self.assertNotIn('Cache-Control', response)
+        self.assertNotIn('Surrogate-Key', response)
+
+    def test_language_cookie(self):
+        self.client.cookies[settings.LANGUAGE_COOKIE_NAME] = 'en'
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private')
+        self.assertNotIn('Surrogate-Control', response)
+        self.assertIn('Surrogate-Key', response)
+
+    @override_settings(WEBWHOIS_CACHE_CONTROL=None, WEBWHOIS_SURROGATE_CONTROL=None, WEBWHOIS_SURROGATE_KEY_HEADER=None)
+    def test_disabled(self):
+        response = self.client.get(self.url)
+
+        self.assertNotIn('Cache-Control', response)
+        self.assertNotIn('Surrogate-Control', response)
+        self.assertNotIn('Surrogate-Key', response)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                           'LOCATION': 'surrogate-keys'}},
+                       WEBWHOIS_PAGE_CACHE_TIMEOUTS={'domain': 60})
+    def test_cached_page(self):
+        caches['default'].clear()
+        response = self.client.get(self.url)
+
+        cached_response = self.client.get(self.url)
+
+        self.assertEqual(cached_response['Surrogate-Key'], response['Surrogate-Key'])
+        self.assertEqual(cached_response['Cache-Control'], 'public, max-age=60')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'stale-if-error'}},
+                   WEBWHOIS_STALE_IF_ERROR_TIMEOUT=3600)
+class StaleIfErrorTest(ObjectDetailMixin):
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        self.url = reverse("webwhois:detail_contact", kwargs={"handle": "KONTAKT"})
+
+    def test_stale(self):
+        self.client.get(self.url)
+        WHOIS.get_contact_by_handle.side_effect = CORBA.TRANSIENT
+
+        response = self.client.get(self.url)
+
+        self.assertContains(response, "Contact details")
+        self.assertContains(response, "The registry is temporarily unavailable.")
+        self.assertEqual(response['Warning'], '110 - "Response is Stale"')
+        self.assertEqual(response['Age'], '0')
+        self.assertNotIn('ETag', response)
+
+    def test_stale_backoff(self):
+        self.client.get(self.url)
+        WHOIS.get_contact_by_handle.side_effect = CORBA.TRANSIENT
+        self.client.get(self.url)
+        WHOIS.reset_mock()
+
+        response = self.client.get(self.url)
+
+        self.assertContains(response, "The registry is temporarily unavailable.")
+        # Backend isn't called while it's considered unavailable.
+        self.assertEqual(WHOIS.mock_calls, [])
+
+    def test_stale_backoff_log(self):
+        self.client.get(self.url)
+        WHOIS.get_contact_by_handle.side_effect = CORBA.TRANSIENT
+        self.client.get(self.url)
+
+        with patch.object(ContactDetailView, '_create_log_entry', autospec=True) as log_mock:
+            self.client.get(self.url)
+
+        log_entry = log_mock.return_value.__enter__.return_value
+        self.assertEqual(log_entry.result, LogResult.SUCCESS)
+        self.assertEqual(log_entry.properties.__setitem__.mock_calls, [call('foundType', ['contact'])])
+
+    @override_settings(WEBWHOIS_STALE_IF_ERROR_BACKOFF=0)
+    def test_stale_no_backoff(self):
+        self.client.get(self.url)
+        WHOIS.get_contact_by_handle.side_effect = CORBA.TRANSIENT
+        self.client.get(self.url)
+        WHOIS.get_contact_by_handle.side_effect = None
+
+        response = self.client.get(self.url)
+
+        self.assertNotContains(response, "The registry is temporarily unavailable.")
+        self.assertNotIn('Warning', response)
+
+    def test_stale_api(self):
+        self.client.get(self.url)
+        WHOIS.get_contact_by_handle.side_effect = CORBA.TRANSIENT
+
+        response = self.client.get(reverse("webwhois:api_contact", kwargs={"handle": "KONTAKT"}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Warning'], '110 - "Response is Stale"')
+
+    def test_stale_async(self):
+        url = reverse("webwhois_async:detail_contact", kwargs={"handle": "KONTAKT"})
+        self.client.get(url)
+        WHOIS.get_contact_by_handle.side_effect = CORBA.TRANSIENT
+
+        response = self.client.get(url)
+
+        self.assertContains(response, "The registry is temporarily unavailable.")
+        self.assertEqual(response['Warning'], '110 - "Response is Stale"')
+
+    def test_no_stale_copy(self):
+        WHOIS.get_contact_by_handle.side_effect = CORBA.TRANSIENT
+
+        with self.assertRaises(CORBA.TRANSIENT):
+            self.client.get(self.url)
+
+    def test_not_found_not_stored(self):
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        self.client.get(self.url)
+        WHOIS.get_contact_by_handle.side_effect = CORBA.TRANSIENT
+
+        with self.assertRaises(CORBA.TRANSIENT):
+            self.client.get(self.url)
+
+    def test_other_error(self):
+        self.client.get(self.url)
+        WHOIS.get_contact_by_handle.side_effect = ValueError
+
+        with self.assertRaises(ValueError):
+            self.client.get(self.url)
+
+    @override_settings(WEBWHOIS_STALE_IF_ERROR_TIMEOUT=0)
+    def test_disabled(self):
+        self.client.get(self.url)
+        WHOIS.get_contact_by_handle.side_effect = CORBA.TRANSIENT
+
+        with self.assertRaises(CORBA.TRANSIENT):
+            self.client.get(self.url)
+
+
+@override_settings(MIDDLEWARE=['webwhois.middleware.InstrumentationMiddleware'], WEBWHOIS_SERVER_TIMING=True)
+class ServerTimingTest(ObjectDetailMixin):
+    def setUp(self):
+        super().setUp()
+        WHOIS.get_managed_zone_list.return_value = ['cz']
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        self.url = reverse("webwhois:detail_contact", kwargs={"handle": "mycontact"})
+
+    def test_header(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        metrics = dict(m.split(';', 1) for m in response['Server-Timing'].split(', '))
+        self.assertEqual(sorted(metrics), ['log-entry', 'render', 'status-descriptions', 'view', 'whois'])
+        self.assertEqual(metrics['view'], StringComparison(r'dur=\d+\.\d;desc="1 call"'))
+
+    @override_settings(WEBWHOIS_SERVER_TIMING=False)
+    def test_disabled(self):
+        response = self.client.get(self.url)
+
+        self.assertNotIn('Server-Timing', response)
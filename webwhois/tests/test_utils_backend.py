@@ -0,0 +1,345 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import Mock, call, patch, sentinel
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from fred_idl.Registry.Whois import OBJECT_DELETE_CANDIDATE, OBJECT_NOT_FOUND, PlaceAddress, Registrar
+from regal.exceptions import ObjectDoesNotExist
+
+from webwhois.constants import STATUS_DELETE_CANDIDATE, STATUS_LINKED
+from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
+from webwhois.utils import WHOIS
+from webwhois.utils.backend import (CachedWhoisBackend, CoalescingWhoisBackend, CorbaWhoisBackend, MemoryWhoisBackend,
+                                    RegalWhoisBackend, WhoisBackend, get_backend)
+from webwhois.utils.object_cache import TwoTierCache, get_object_cache
+from webwhois.utils.single_flight import SingleFlight
+
+from .utils import apply_patch
+
+
+class CorbaWhoisBackendTest(SimpleTestCase):
+    def setUp(self):
+        apply_patch(self, patch.object(WHOIS, 'client'))
+        self.backend = CorbaWhoisBackend()
+
+    def test_lookups(self):
+        for method in ('get_contact_by_handle', 'get_nsset_by_handle', 'get_keyset_by_handle',
+                       'get_registrar_by_handle', 'get_domain_by_handle'):
+            with self.subTest(method=method):
+                WHOIS.reset_mock()
+                getattr(WHOIS, method).return_value = sentinel.object
+
+                self.assertEqual(getattr(self.backend, method)('kryten'), sentinel.object)
+                self.assertEqual(WHOIS.mock_calls, [getattr(call, method)('kryten')])
+
+    def test_status_descriptions(self):
+        for method in ('get_contact_status_descriptions', 'get_nsset_status_descriptions',
+                       'get_keyset_status_descriptions', 'get_domain_status_descriptions'):
+            with self.subTest(method=method):
+                WHOIS.reset_mock()
+                getattr(WHOIS, method).return_value = sentinel.descriptions
+
+                self.assertEqual(getattr(self.backend, method)('en'), sentinel.descriptions)
+                self.assertEqual(WHOIS.mock_calls, [getattr(call, method)('en')])
+
+    def test_lists(self):
+        for method in ('get_registrars', 'get_registrar_groups', 'get_registrar_certification_list',
+                       'get_managed_zone_list'):
+            with self.subTest(method=method):
+                WHOIS.reset_mock()
+                getattr(WHOIS, method).return_value = sentinel.list
+
+                self.assertEqual(getattr(self.backend, method)(), sentinel.list)
+                self.assertEqual(WHOIS.mock_calls, [getattr(call, method)()])
+
+    def test_not_found(self):
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+
+        with self.assertRaises(OBJECT_NOT_FOUND):
+            self.backend.get_contact_by_handle('kryten')
+
+
+class RegalWhoisBackendTest(SimpleTestCase):
+    def setUp(self):
+        self.registrar_client = apply_patch(self, patch('webwhois.utils.backend.REGISTRAR_CLIENT'))
+        self.contact_client = apply_patch(self, patch('webwhois.utils.backend.CONTACT_CLIENT'))
+        self.domain_client = apply_patch(self, patch('webwhois.utils.backend.DOMAIN_CLIENT'))
+        self.backend = RegalWhoisBackend()
+
+    def _make_place(self):
+        return SimpleNamespace(street=['Street 1'], city='Prague', state_or_province=None, postal_code='12300',
+                               country_code='CZ')
+
+    def test_get_registrar_by_handle(self):
+        self.registrar_client.get_registrar_info.return_value = SimpleNamespace(
+            registrar_handle='REG-HOLLY', name='Holly', organization='Jupiter Mining Corporation', url='www.nic.cz',
+            telephone='+420.123456789', fax='', place=self._make_place())
+
+        registrar = self.backend.get_registrar_by_handle('REG-HOLLY')
+
+        address = PlaceAddress(street1='Street 1', street2='', street3='', city='Prague', stateorprovince='',
+                               postalcode='12300', country_code='CZ')
+        self.assertEqual(registrar.__dict__, Registrar(
+            handle='REG-HOLLY', name='Holly', organization='Jupiter Mining Corporation', url='www.nic.cz',
+            phone='+420.123456789', fax='', address=address).__dict__)
+        self.assertEqual(self.registrar_client.mock_calls, [call.get_registrar_info('REG-HOLLY')])
+
+    def test_get_registrar_by_handle_not_found(self):
+        self.registrar_client.get_registrar_info.side_effect = ObjectDoesNotExist
+
+        with self.assertRaises(OBJECT_NOT_FOUND):
+            self.backend.get_registrar_by_handle('REG-HOLLY')
+
+    def test_get_contact_by_handle(self):
+        events = SimpleNamespace(
+            registered=SimpleNamespace(registrar_handle='REG-HOLLY',
+                                       timestamp=datetime(2020, 1, 1, tzinfo=timezone.utc)),
+            updated=None, transferred=None)
+        self.contact_client.get_contact_id.return_value = sentinel.contact_id
+        self.contact_client.get_contact_info.return_value = SimpleNamespace(
+            contact_handle='KRYTEN', name='Kryten', organization='', place=None, telephone=None, fax=None,
+            emails=['kryten@example.org'], notify_emails=[], vat_identification_number='',
+            additional_identifier=SimpleNamespace(type='birthdate', value='2000-01-01'),
+            publish={'name': True}, sponsoring_registrar='REG-HOLLY', events=events)
+        self.contact_client.get_contact_state.return_value = {STATUS_LINKED: True, STATUS_DELETE_CANDIDATE: False}
+
+        with override_settings(USE_TZ=True):
+            contact = self.backend.get_contact_by_handle('KRYTEN')
+
+        self.assertEqual(contact.handle, 'KRYTEN')
+        self.assertEqual(contact.name.value, 'Kryten')
+        self.assertTrue(contact.name.disclose)
+        self.assertFalse(contact.email.disclose)
+        self.assertEqual(contact.identification.value.identification_type, 'BIRTHDAY')
+        self.assertEqual(contact.creating_registrar_handle, 'REG-HOLLY')
+        self.assertEqual(contact.created, datetime(2020, 1, 1, tzinfo=timezone.utc))
+        self.assertIsNone(contact.changed)
+        self.assertEqual(contact.statuses, [STATUS_LINKED])
+        self.assertEqual(self.contact_client.mock_calls, [
+            call.get_contact_id('KRYTEN'),
+            call.get_contact_info(sentinel.contact_id),
+            call.get_contact_state(sentinel.contact_id),
+        ])
+
+    def test_get_contact_by_handle_not_found(self):
+        self.contact_client.get_contact_id.side_effect = ObjectDoesNotExist
+
+        with self.assertRaises(OBJECT_NOT_FOUND):
+            self.backend.get_contact_by_handle('KRYTEN')
+
+    def test_get_domain_by_handle_delete_candidate(self):
+        self.domain_client.get_domain_id.return_value = sentinel.domain_id
+        self.domain_client.get_domain_state.return_value = {STATUS_DELETE_CANDIDATE: True}
+
+        with self.assertRaises(OBJECT_DELETE_CANDIDATE):
+            self.backend.get_domain_by_handle('example.org')
+
+
+class MemoryWhoisBackendTest(GetRegistryObjectMixin, SimpleTestCase):
+    def setUp(self):
+        self.backend = MemoryWhoisBackend(
+            contacts=[self._get_contact()], nssets=[self._get_nsset()], keysets=[self._get_keyset()],
+            domains=[self._get_domain(), self._get_domain(handle='deleted.cz', statuses=[STATUS_DELETE_CANDIDATE])],
+            registrars=[self._get_registrar()], status_descriptions={'domain': self._get_domain_status()},
+            registrar_certifications=self._get_registrar_certs(), managed_zones=['cz'])
+
+    def test_lookups(self):
+        self.assertEqual(self.backend.get_contact_by_handle('KONTAKT').handle, 'KONTAKT')
+        self.assertEqual(self.backend.get_nsset_by_handle('NSSET-1').handle, 'NSSET-1')
+        self.assertEqual(self.backend.get_keyset_by_handle('KEYSID-1').handle, 'KEYSID-1')
+        self.assertEqual(self.backend.get_registrar_by_handle('REG-FRED_A').handle, 'REG-FRED_A')
+        self.assertEqual(self.backend.get_domain_by_handle('fred.cz').handle, 'fred.cz')
+
+    def test_not_found(self):
+        for method in ('get_contact_by_handle', 'get_nsset_by_handle', 'get_keyset_by_handle',
+                       'get_registrar_by_handle', 'get_domain_by_handle'):
+            with self.subTest(method=method):
+                with self.assertRaises(OBJECT_NOT_FOUND):
+                    getattr(self.backend, method)('unknown')
+
+    def test_delete_candidate(self):
+        with self.assertRaises(OBJECT_DELETE_CANDIDATE):
+            self.backend.get_domain_by_handle('deleted.cz')
+
+    def test_status_descriptions(self):
+        self.assertEqual(self.backend.get_domain_status_descriptions('en'), self._get_domain_status())
+        self.assertEqual(self.backend.get_contact_status_descriptions('en'), [])
+
+    def test_lists(self):
+        self.assertEqual([r.handle for r in self.backend.get_registrars()], ['REG-FRED_A'])
+        self.assertEqual(self.backend.get_registrar_groups(), [])
+        self.assertEqual(self.backend.get_registrar_certification_list(), self._get_registrar_certs())
+        self.assertEqual(self.backend.get_managed_zone_list(), ['cz'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'cached-backend'}})
+class CachedWhoisBackendTest(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.backend_mock = Mock(spec=WhoisBackend)
+        self.cache = TwoTierCache(l1_size=10, l1_timeout=10, l2_timeout=60)
+        self.backend = CachedWhoisBackend(self.backend_mock, self.cache)
+
+    def test_lookups(self):
+        for method in ('get_contact_by_handle', 'get_nsset_by_handle', 'get_keyset_by_handle',
+                       'get_registrar_by_handle', 'get_domain_by_handle'):
+            with self.subTest(method=method):
+                getattr(self.backend_mock, method).return_value = 'object'
+
+                self.assertEqual(getattr(self.backend, method)('kryten'), 'object')
+                self.assertEqual(getattr(self.backend, method)('kryten'), 'object')
+                self.assertEqual(getattr(self.backend_mock, method).mock_calls, [call('kryten')])
+
+    def test_lookups_l2(self):
+        self.backend_mock.get_contact_by_handle.return_value = 'object'
+        self.backend.get_contact_by_handle('kryten')
+        # Another worker has only the shared tier.
+        other = CachedWhoisBackend(self.backend_mock, TwoTierCache(l1_size=10, l1_timeout=10, l2_timeout=60))
+
+        self.assertEqual(other.get_contact_by_handle('kryten'), 'object')
+        self.assertEqual(self.backend_mock.get_contact_by_handle.mock_calls, [call('kryten')])
+
+    def test_types_not_mixed(self):
+        self.backend_mock.get_contact_by_handle.return_value = 'contact'
+        self.backend_mock.get_nsset_by_handle.return_value = 'nsset'
+
+        self.assertEqual(self.backend.get_contact_by_handle('kryten'), 'contact')
+        self.assertEqual(self.backend.get_nsset_by_handle('kryten'), 'nsset')
+
+    def test_not_found(self):
+        self.backend_mock.get_contact_by_handle.side_effect = [OBJECT_NOT_FOUND, 'object']
+
+        with self.assertRaises(OBJECT_NOT_FOUND):
+            self.backend.get_contact_by_handle('kryten')
+        self.assertEqual(self.backend.get_contact_by_handle('kryten'), 'object')
+
+    def test_not_cached(self):
+        for method in ('get_contact_status_descriptions', 'get_nsset_status_descriptions',
+                       'get_keyset_status_descriptions', 'get_domain_status_descriptions'):
+            with self.subTest(method=method):
+                getattr(self.backend_mock, method).return_value = sentinel.descriptions
+
+                self.assertEqual(getattr(self.backend, method)('en'), sentinel.descriptions)
+                self.assertEqual(getattr(self.backend, method)('en'), sentinel.descriptions)
+                self.assertEqual(getattr(self.backend_mock, method).mock_calls, [call('en'), call('en')])
+        for method in ('get_registrars', 'get_registrar_groups', 'get_registrar_certification_list',
+                       'get_managed_zone_list'):
+            with self.subTest(method=method):
+                getattr(self.backend_mock, method).return_value = sentinel.list
+
+                self.assertEqual(getattr(self.backend, method)(), sentinel.list)
+                self.assertEqual(getattr(self.backend_mock, method).mock_calls, [call()])
+
+
+class CoalescingWhoisBackendTest(SimpleTestCase):
+    def setUp(self):
+        self.backend_mock = Mock(spec=WhoisBackend)
+        self.single_flight = SingleFlight()
+        self.backend = CoalescingWhoisBackend(self.backend_mock, self.single_flight)
+
+    def test_lookups(self):
+        for method in ('get_contact_by_handle', 'get_nsset_by_handle', 'get_keyset_by_handle',
+                       'get_registrar_by_handle', 'get_domain_by_handle'):
+            with self.subTest(method=method):
+                getattr(self.backend_mock, method).return_value = 'object'
+
+                with patch.object(self.single_flight, 'do', wraps=self.single_flight.do) as do_mock:
+                    self.assertEqual(getattr(self.backend, method)('kryten'), 'object')
+
+                self.assertEqual(getattr(self.backend_mock, method).mock_calls, [call('kryten')])
+                self.assertEqual(do_mock.call_args[0][0], '{}\nkryten'.format(method))
+
+    def test_not_found(self):
+        self.backend_mock.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+
+        with self.assertRaises(OBJECT_NOT_FOUND):
+            self.backend.get_contact_by_handle('kryten')
+
+    def test_not_coalesced(self):
+        for method in ('get_contact_status_descriptions', 'get_nsset_status_descriptions',
+                       'get_keyset_status_descriptions', 'get_domain_status_descriptions'):
+            with self.subTest(method=method):
+                getattr(self.backend_mock, method).return_value = sentinel.descriptions
+
+                self.assertEqual(getattr(self.backend, method)('en'), sentinel.descriptions)
+                self.assertEqual(getattr(self.backend_mock, method).mock_calls, [call('en')])
+        for method in ('get_registrars', 'get_registrar_groups', 'get_registrar_certification_list',
+                       'get_managed_zone_list'):
+            with self.subTest(method=method):
+                getattr(self.backend_mock, method).return_value = sentinel.list
+
+                self.assertEqual(getattr(self.backend, method)(), sentinel.list)
+                self.assertEqual(getattr(self.backend_mock, method).mock_calls, [call()])
+
+
+class WhoisBackendTest(SimpleTestCase):
+    def test_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            WhoisBackend().get_domain_by_handle('example.org')
+
+
+class GetBackendTest(SimpleTestCase):
+    def setUp(self):
+        get_backend.cache_clear()
+        self.addCleanup(get_backend.cache_clear)
+
+    def test_default(self):
+        self.assertIsInstance(get_backend(), CorbaWhoisBackend)
+
+    def test_custom(self):
+        with override_settings(WEBWHOIS_BACKEND='webwhois.utils.backend.MemoryWhoisBackend'):
+            self.assertIsInstance(get_backend(), MemoryWhoisBackend)
+
+    def test_cached(self):
+        self.assertIs(get_backend(), get_backend())
+
+    @override_settings(WEBWHOIS_OBJECT_CACHE_TIMEOUT=60)
+    def test_object_cache(self):
+        get_object_cache.cache_clear()
+        self.addCleanup(get_object_cache.cache_clear)
+
+        backend = get_backend()
+
+        self.assertIsInstance(backend, CachedWhoisBackend)
+        self.assertIsInstance(backend.backend, CorbaWhoisBackend)  # type: ignore[attr-defined]
+        self.assertIs(backend.cache, get_object_cache())  # type: ignore[attr-defined]
+
+    @override_settings(WEBWHOIS_SINGLE_FLIGHT=True, WEBWHOIS_SINGLE_FLIGHT_LEASE_TIMEOUT=5)
+    def test_single_flight(self):
+        backend = get_backend()
+
+        self.assertIsInstance(backend, CoalescingWhoisBackend)
+        self.assertIsInstance(backend.backend, CorbaWhoisBackend)  # type: ignore[attr-defined]
+        self.assertEqual(backend.single_flight.lease_timeout, 5)  # type: ignore[attr-defined]
+
+    @override_settings(WEBWHOIS_SINGLE_FLIGHT=True, WEBWHOIS_OBJECT_CACHE_TIMEOUT=60)
+    def test_single_flight_object_cache(self):
+        get_object_cache.cache_clear()
+        self.addCleanup(get_object_cache.cache_clear)
+
+        backend = get_backend()
+
+        # Cache is checked before lookups are coalesced.
+        self.assertIsInstance(backend, CachedWhoisBackend)
+        self.assertIsInstance(backend.backend, CoalescingWhoisBackend)  # type: ignore[attr-defined]
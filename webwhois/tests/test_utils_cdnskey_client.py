@@ -16,11 +16,12 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
+import asyncio
 from datetime import datetime
 from tempfile import NamedTemporaryFile
-from typing import Dict, List, Sequence, Type
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Type
 from unittest import skipIf
-from unittest.mock import call, patch, sentinel
+from unittest.mock import AsyncMock, Mock, call, patch, sentinel
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
@@ -28,7 +29,7 @@ from django.http import Http404
 from django.test import SimpleTestCase
 from django.test.utils import override_settings
 from django.utils import timezone
-from grpc import RpcError, StatusCode
+from grpc import RpcError, StatusCode, aio
 from grpc._channel import _RPCState, _SingleThreadedRendezvous as _Rendezvous
 
 try:
@@ -44,7 +45,8 @@ except ImportError:
         pass
 
 from webwhois.constants import CdnskeyStatus, DnskeyAlgorithm, DnskeyFlag
-from webwhois.utils.cdnskey_client import CdnskeyClient, CdnskeyDecoder, get_cdnskey_client
+from webwhois.utils.cdnskey_client import (AsyncCdnskeyClient, CdnskeyClient, CdnskeyDecoder, get_async_cdnskey_client,
+                                           get_cdnskey_client)
 
 
 @skipIf(Cdnskey is None, "Only available with cdnskey_processor_api installed.")
@@ -98,6 +100,23 @@ class TestCdnskeyClient(TestClientMixin, CdnskeyClient):
     """Testing version of an CdnskeyClient."""
 
 
+class TestAsyncCdnskeyClient(AsyncCdnskeyClient):
+    """Testing version of an AsyncCdnskeyClient."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.mock = Mock()
+
+    def _call_stream(self, method: str, request: Any, response_type: Type,
+                     timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        return self._iterate(self.mock(request, method=method, timeout=timeout))
+
+    @staticmethod
+    async def _iterate(replies: Iterable[Any]) -> AsyncIterator[Any]:
+        for reply in replies:
+            yield reply
+
+
 @skipIf(Cdnskey is None, "Only available with cdnskey_processor_api installed.")
 class CdnskeyClientTest(SimpleTestCase):
     scan_at = datetime(2020, 3, 2, 13, tzinfo=timezone.utc)
@@ -129,7 +148,7 @@ class CdnskeyClientTest(SimpleTestCase):
         request.domain_fqdn.value = domain
         self.assertEqual(
             self.client.mock.mock_calls,
-            [call(request, method='/CdnskeyProcessor.Api.Report.Report/raw_scan_results', timeout=None)])
+            [call(request, method='/CdnskeyProcessor.Api.Report.Report/raw_scan_results', timeout=60.0)])
 
     def test_raw_scan_results_empty(self):
         self._test_raw_scan_results([], [])
@@ -187,13 +206,13 @@ class CdnskeyClientTest(SimpleTestCase):
         self.client.mock.side_effect = error
 
         with self.assertRaisesRegex(error_cls, error_msg):
-            self.client.raw_scan_results(domain)
+            list(self.client.raw_scan_results(domain))
 
         request = RawScanResultsRequest()
         request.domain_fqdn.value = domain
         self.assertEqual(
             self.client.mock.mock_calls,
-            [call(request, method='/CdnskeyProcessor.Api.Report.Report/raw_scan_results', timeout=None)])
+            [call(request, method='/CdnskeyProcessor.Api.Report.Report/raw_scan_results', timeout=60.0)])
 
     def test_raw_scan_results_not_found(self):
         self._test_raw_scan_results_error(StatusCode.NOT_FOUND, Http404, "Domain 'example.org' not found.")
@@ -201,6 +220,151 @@ class CdnskeyClientTest(SimpleTestCase):
     def test_raw_scan_results_error(self):
         self._test_raw_scan_results_error(StatusCode.UNKNOWN, RpcError, 'StatusCode.UNKNOWN')
 
+    def test_raw_scan_results_stream_error(self):
+        # Errors raised by the stream are converted as well.
+        reply = RawScanResultsReply()
+        reply.data.items.append(self._get_scan_result('kryten', '256.0.0.1', DnskeyFlag.ZONE, DnskeyAlgorithm.DSA))
+
+        def stream():
+            yield reply
+            raise _Rendezvous(_RPCState((), '', '', StatusCode.NOT_FOUND, ""), None, None, None)
+
+        self.client.mock.return_value = stream()
+
+        results = iter(self.client.raw_scan_results('example.org'))
+        self.assertEqual(next(results)['alg'], DnskeyAlgorithm.DSA)
+        with self.assertRaisesRegex(Http404, "Domain 'example.org' not found."):
+            next(results)
+
+
+@skipIf(Cdnskey is None, "Only available with cdnskey_processor_api installed.")
+class AsyncCdnskeyClientTest(SimpleTestCase):
+    scan_at = datetime(2020, 3, 2, 13, tzinfo=timezone.utc)
+    public_key = 'Quagaars!'
+    nameserver = 'example.net'
+
+    def setUp(self):
+        self.client = TestAsyncCdnskeyClient(sentinel.netloc)
+
+    def _get_scan_result(self, alg: int) -> RawScanResult:
+        scan_result = RawScanResult()
+        scan_result.worker_name.value = 'kryten'
+        scan_result.scan_at.FromDatetime(self.scan_at)
+        scan_result.nameserver.value = self.nameserver
+        scan_result.nameserver_ip.value = '256.0.0.1'
+        scan_result.cdnskey.flags.value = DnskeyFlag.ZONE
+        scan_result.cdnskey.alg.value = alg
+        scan_result.cdnskey.public_key.value = self.public_key
+        return scan_result
+
+    def _get_result(self, alg: int) -> Dict[str, Any]:
+        cdnskey = {'flags': DnskeyFlag.ZONE, 'alg': alg, 'proto': 0, 'public_key': self.public_key,
+                   'status': CdnskeyStatus.INSECURE_KEY}
+        return {'worker_name': 'kryten', 'scan_at': self.scan_at, 'nameserver_ip': '256.0.0.1',
+                'nameserver': self.nameserver, 'cdnskey': cdnskey}
+
+    async def test_raw_scan_results(self):
+        reply_1 = RawScanResultsReply()
+        reply_1.data.items.append(self._get_scan_result(DnskeyAlgorithm.RSAMD5))
+        reply_1.data.items.append(self._get_scan_result(DnskeyAlgorithm.DSA))
+        reply_2 = RawScanResultsReply()
+        reply_2.data.items.append(self._get_scan_result(DnskeyAlgorithm.RSASHA512))
+        self.client.mock.return_value = [reply_1, reply_2]
+
+        results = [result async for result in self.client.raw_scan_results('example.org')]
+
+        self.assertEqual(results, [self._get_result(DnskeyAlgorithm.RSAMD5), self._get_result(DnskeyAlgorithm.DSA),
+                                   self._get_result(DnskeyAlgorithm.RSASHA512)])
+        request = RawScanResultsRequest()
+        request.domain_fqdn.value = 'example.org'
+        self.assertEqual(
+            self.client.mock.mock_calls,
+            [call(request, method='/CdnskeyProcessor.Api.Report.Report/raw_scan_results', timeout=60.0)])
+
+    async def test_raw_scan_results_empty(self):
+        self.client.mock.return_value = []
+
+        self.assertEqual([result async for result in self.client.raw_scan_results('example.org')], [])
+
+    async def _test_raw_scan_results_error(self, status: StatusCode, error_cls: Type[Exception],
+                                           error_msg: str) -> None:
+        self.client.mock.side_effect = _Rendezvous(_RPCState((), '', '', status, ""), None, None, None)
+
+        with self.assertRaisesRegex(error_cls, error_msg):
+            [result async for result in self.client.raw_scan_results('example.org')]
+
+    async def test_raw_scan_results_not_found(self):
+        await self._test_raw_scan_results_error(StatusCode.NOT_FOUND, Http404, "Domain 'example.org' not found.")
+
+    async def test_raw_scan_results_error(self):
+        await self._test_raw_scan_results_error(StatusCode.UNKNOWN, RpcError, 'StatusCode.UNKNOWN')
+
+    async def test_raw_scan_results_aio_not_found(self):
+        self.client.mock.side_effect = aio.AioRpcError(StatusCode.NOT_FOUND, aio.Metadata(), aio.Metadata())
+
+        with self.assertRaisesRegex(Http404, "Domain 'example.org' not found."):
+            [result async for result in self.client.raw_scan_results('example.org')]
+
+    @override_settings(WEBWHOIS_CDNSKEY_TIMEOUT=4.2)
+    async def test_raw_scan_results_timeout(self):
+        self.client.mock.return_value = []
+
+        [result async for result in self.client.raw_scan_results('example.org')]
+
+        request = RawScanResultsRequest()
+        request.domain_fqdn.value = 'example.org'
+        self.assertEqual(
+            self.client.mock.mock_calls,
+            [call(request, method='/CdnskeyProcessor.Api.Report.Report/raw_scan_results', timeout=4.2)])
+
+    async def test_channel(self):
+        client = AsyncCdnskeyClient(sentinel.netloc)
+        with patch('webwhois.utils.cdnskey_client.aio.insecure_channel', return_value=sentinel.channel) as mock:
+            self.assertEqual(client._get_channel(), sentinel.channel)
+            # Channel is reused in the same event loop.
+            self.assertEqual(client._get_channel(), sentinel.channel)
+
+        self.assertEqual(mock.mock_calls, [call(sentinel.netloc)])
+
+    async def test_channel_secure(self):
+        client = AsyncCdnskeyClient(sentinel.netloc, credentials=sentinel.credentials)
+        with patch('webwhois.utils.cdnskey_client.aio.secure_channel', return_value=sentinel.channel) as mock:
+            self.assertEqual(client._get_channel(), sentinel.channel)
+
+        self.assertEqual(mock.mock_calls, [call(sentinel.netloc, sentinel.credentials)])
+
+    def test_channel_loops(self):
+        # Each event loop has its own channel.
+        client = AsyncCdnskeyClient(sentinel.netloc)
+
+        async def get_channel():
+            return client._get_channel()
+
+        with patch('webwhois.utils.cdnskey_client.aio.insecure_channel',
+                   side_effect=[sentinel.channel_1, sentinel.channel_2]) as mock:
+            self.assertEqual(asyncio.run(get_channel()), sentinel.channel_1)
+            self.assertEqual(asyncio.run(get_channel()), sentinel.channel_2)
+
+        self.assertEqual(mock.mock_calls, [call(sentinel.netloc), call(sentinel.netloc)])
+        # Channel of the closed event loop is dropped.
+        self.assertEqual(list(client._channels.values()), [sentinel.channel_2])
+
+    def test_close(self):
+        client = AsyncCdnskeyClient(sentinel.netloc)
+        channel = AsyncMock(spec=aio.Channel)
+
+        async def close():
+            client._get_channel()
+            await client.close()
+            # Closing without a channel does nothing.
+            await client.close()
+
+        with patch('webwhois.utils.cdnskey_client.aio.insecure_channel', return_value=channel):
+            asyncio.run(close())
+
+        self.assertEqual(channel.mock_calls, [call.close()])
+        self.assertEqual(client._channels, {})
+
 
 class GetClientTest(SimpleTestCase):
     def setUp(self):
@@ -244,3 +408,25 @@ class GetClientTest(SimpleTestCase):
 
         self.assertEqual(client_mock.mock_calls, [call(sentinel.netloc, credentials=sentinel.credentials)])
         self.assertEqual(credentials_mock.mock_calls, [call('Gazpacho!')])
+
+
+class GetAsyncClientTest(SimpleTestCase):
+    def setUp(self):
+        get_async_cdnskey_client.cache_clear()
+
+    def tearDown(self):
+        get_async_cdnskey_client.cache_clear()
+
+    def test_disabled(self):
+        with override_settings(WEBWHOIS_CDNSKEY_NETLOC=None):
+            self.assertIsNone(get_async_cdnskey_client())
+
+    @skipIf(Cdnskey is None, "Only available with cdnskey_processor_api installed.")
+    def test_netloc(self):
+        with override_settings(WEBWHOIS_CDNSKEY_NETLOC=sentinel.netloc):
+            del settings.WEBWHOIS_CDNSKEY_SSL_CERT
+            with patch('webwhois.utils.cdnskey_client.AsyncCdnskeyClient',
+                       return_value=sentinel.client) as client_mock:
+                self.assertEqual(get_async_cdnskey_client(), sentinel.client)
+
+        self.assertEqual(client_mock.mock_calls, [call(sentinel.netloc, credentials=None)])
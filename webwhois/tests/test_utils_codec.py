@@ -0,0 +1,190 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+import pickle
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import call, patch
+
+import msgpack
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from django.utils.safestring import SafeString
+from fred_idl.Registry.Whois import IPv4, IPv6
+
+from webwhois.constants import CdnskeyStatus, DnskeyAlgorithm, DnskeyFlag
+from webwhois.utils.codec import (_HEADER, CODEC, CODEC_VERSION, ENUM_TYPES, ENUMS, FORMAT_MSGPACK, FORMAT_PICKLE,
+                                  STRUCTS, Codec, CodecError, cache_get, cache_set, dumps, loads)
+
+from .get_registry_objects import GetRegistryObjectMixin
+
+
+def as_python(value):
+    """Return structures as dictionaries, so they can be compared."""
+    if isinstance(value, list):
+        return [as_python(item) for item in value]
+    if type(value) in STRUCTS:
+        return {name: as_python(item) for name, item in vars(value).items()}
+    return value
+
+
+class CodecTest(GetRegistryObjectMixin, SimpleTestCase):
+    def test_registry_objects(self):
+        objects = {
+            'domain': self._get_domain(),
+            'contact': self._get_contact(),
+            'nsset': self._get_nsset(),
+            'keyset': self._get_keyset(),
+            'registrar': self._get_registrar(),
+            'statuses': self._get_contact_status(),
+        }
+        for name, value in objects.items():
+            with self.subTest(name=name):
+                self.assertEqual(as_python(loads(dumps(value))), as_python(value))
+
+    def test_compact(self):
+        domain = self._get_domain()
+        self.assertLess(len(dumps(domain)), len(pickle.dumps(domain, pickle.HIGHEST_PROTOCOL)))
+
+    def test_enums(self):
+        self.assertIs(loads(dumps(IPv4)), IPv4)
+        self.assertIs(loads(dumps(IPv6)), IPv6)
+
+    def test_enum_types(self):
+        # Enums based on builtin types aren't decoded as their base types.
+        values = (CdnskeyStatus.INSECURE_KEY, DnskeyAlgorithm.RSASHA256, DnskeyFlag.ZONE,
+                  DnskeyFlag.ZONE | DnskeyFlag.SECURE_ENTRY_POINT)
+        for value in values:
+            with self.subTest(value=value):
+                result = loads(dumps(value))
+                self.assertIs(type(result), type(value))
+                self.assertEqual(result, value)
+
+    def test_scan_results(self):
+        cdnskey = {'flags': DnskeyFlag.ZONE, 'alg': DnskeyAlgorithm.RSASHA256, 'proto': 3, 'public_key': 'Quagaars!',
+                   'status': CdnskeyStatus.INSECURE_KEY}
+        scan_results = [{'worker_name': 'kryten', 'scan_at': datetime(2020, 3, 2, 13, tzinfo=timezone.utc),
+                         'nameserver': 'example.net', 'nameserver_ip': '256.0.0.1', 'cdnskey': cdnskey}]
+
+        result = loads(dumps(scan_results))
+
+        self.assertEqual(result, scan_results)
+        self.assertEqual({name: type(value) for name, value in result[0]['cdnskey'].items()},
+                         {name: type(value) for name, value in cdnskey.items()})
+
+    def test_builtin_subclass(self):
+        value = SafeString('<b>kryten</b>')
+        self.assertIs(type(loads(dumps(value))), SafeString)
+
+    def test_dates(self):
+        values = (
+            date(2022, 2, 24),
+            datetime(2022, 2, 24, 10, 20, 30, 123456),
+            datetime(2022, 2, 24, 10, 20, 30, tzinfo=timezone.utc),
+            datetime(2022, 2, 24, 10, 20, 30, tzinfo=timezone(timedelta(hours=1))),
+        )
+        for value in values:
+            with self.subTest(value=value):
+                result = loads(dumps(value))
+                self.assertEqual(result, value)
+                self.assertEqual(type(result), type(value))
+                self.assertEqual(result.utcoffset() if isinstance(value, datetime) else None,
+                                 value.utcoffset() if isinstance(value, datetime) else None)
+
+    def test_builtins(self):
+        value = {'kryten': ['mechanoid', 4000, None, True, b'series'], 42: 0.5}
+        self.assertEqual(loads(dumps(value)), value)
+
+    def test_tuple(self):
+        self.assertEqual(loads(dumps(('kryten', 'mechanoid'))), ['kryten', 'mechanoid'])
+
+    def test_unsupported_type(self):
+        self.assertEqual(loads(dumps({Decimal('4.2')})), {Decimal('4.2')})
+
+    def test_header(self):
+        self.assertEqual(_HEADER.unpack_from(dumps(None)), (CODEC_VERSION, FORMAT_MSGPACK, CODEC.fingerprint))
+
+    def test_pickle_fallback(self):
+        domain = self._get_domain()
+        with patch('webwhois.utils.codec.msgpack', None):
+            data = dumps(domain)
+            self.assertEqual(_HEADER.unpack_from(data), (CODEC_VERSION, FORMAT_PICKLE, 0))
+            self.assertEqual(as_python(loads(data)), as_python(domain))
+        # Pickled data are decoded regardless of msgpack.
+        self.assertEqual(as_python(loads(data)), as_python(domain))
+
+    def test_fingerprint(self):
+        self.assertEqual(Codec(STRUCTS, ENUMS, ENUM_TYPES).fingerprint, CODEC.fingerprint)
+        self.assertNotEqual(Codec(STRUCTS[:-1], ENUMS, ENUM_TYPES).fingerprint, CODEC.fingerprint)
+        self.assertNotEqual(Codec(STRUCTS, ENUMS[:1], ENUM_TYPES).fingerprint, CODEC.fingerprint)
+        self.assertNotEqual(Codec(STRUCTS, ENUMS, ENUM_TYPES[:-1]).fingerprint, CODEC.fingerprint)
+
+    def test_loads_invalid(self):
+        data = {
+            'not bytes': 'mechanoid',
+            'short': b'\x01',
+            'version': _HEADER.pack(CODEC_VERSION + 1, FORMAT_MSGPACK, CODEC.fingerprint) + msgpack.packb(None),
+            'format': _HEADER.pack(CODEC_VERSION, 42, CODEC.fingerprint) + msgpack.packb(None),
+            'fingerprint': _HEADER.pack(CODEC_VERSION, FORMAT_MSGPACK, CODEC.fingerprint ^ 1) + msgpack.packb(None),
+            'corrupted': _HEADER.pack(CODEC_VERSION, FORMAT_MSGPACK, CODEC.fingerprint) + b'\xc1',
+            'corrupted pickle': _HEADER.pack(CODEC_VERSION, FORMAT_PICKLE, 0) + b'mechanoid',
+            'extension': (_HEADER.pack(CODEC_VERSION, FORMAT_MSGPACK, CODEC.fingerprint)
+                          + msgpack.packb(msgpack.ExtType(42, b''))),
+        }
+        for name, value in data.items():
+            with self.subTest(name=name):
+                with self.assertRaises(CodecError):
+                    loads(value)
+
+    def test_loads_no_msgpack(self):
+        data = dumps(None)
+        with patch('webwhois.utils.codec.msgpack', None):
+            with self.assertRaises(CodecError):
+                loads(data)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'codec'}})
+class CacheTest(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_set(self):
+        cache_set(caches['default'], 'kryten', {'series': 4000}, 10)
+        self.assertEqual(loads(caches['default'].get('kryten')), {'series': 4000})
+
+    def test_get(self):
+        caches['default'].set('kryten', dumps({'series': 4000}))
+        self.assertEqual(cache_get(caches['default'], 'kryten'), {'series': 4000})
+
+    def test_get_missing(self):
+        self.assertIsNone(cache_get(caches['default'], 'kryten'))
+        self.assertEqual(cache_get(caches['default'], 'kryten', 'default'), 'default')
+
+    def test_get_name(self):
+        caches['default'].set('kryten', dumps('mechanoid'))
+
+        with patch('webwhois.utils.codec.record_cache_access') as record_mock:
+            cache_get(caches['default'], 'kryten', name='crew')
+            cache_get(caches['default'], 'lister', name='crew')
+
+        self.assertEqual(record_mock.mock_calls, [call('crew', hit=True), call('crew', hit=False)])
+
+    def test_get_undecodable(self):
+        caches['default'].set('kryten', {'series': 4000})
+        self.assertEqual(cache_get(caches['default'], 'kryten', 'default'), 'default')
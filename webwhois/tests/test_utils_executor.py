@@ -0,0 +1,115 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+import asyncio
+import contextvars
+import threading
+from contextlib import contextmanager
+from unittest.mock import sentinel
+
+from django.test import SimpleTestCase, override_settings
+
+from webwhois.utils.executor import gather_mapping, get_executor, run_sync, submit, sync_context
+
+
+class GetExecutorTest(SimpleTestCase):
+    def setUp(self):
+        get_executor.cache_clear()
+        self.addCleanup(get_executor.cache_clear)
+
+    def test_max_workers(self):
+        with override_settings(WEBWHOIS_EXECUTOR_MAX_WORKERS=3):
+            self.assertEqual(get_executor()._max_workers, 3)
+
+    def test_cached(self):
+        self.assertIs(get_executor(), get_executor())
+
+
+class RunSyncTest(SimpleTestCase):
+    async def test_run_sync(self):
+        self.assertEqual(await run_sync(lambda value: (value, threading.current_thread().name))(sentinel.value),
+                         (sentinel.value, StringStartsWith('webwhois')))
+
+    async def test_error(self):
+        def fail():
+            raise ValueError('Gazpacho!')
+
+        with self.assertRaisesMessage(ValueError, 'Gazpacho!'):
+            await run_sync(fail)()
+
+
+class SubmitTest(SimpleTestCase):
+    def test_submit(self):
+        self.assertEqual(submit(lambda value: value, sentinel.value).result(), sentinel.value)
+
+    def test_context(self):
+        variable = contextvars.ContextVar('variable')  # type: contextvars.ContextVar
+        variable.set(sentinel.value)
+
+        self.assertEqual(submit(variable.get).result(), sentinel.value)
+
+
+class StringStartsWith(str):
+    """String which equals to all strings with the prefix."""
+
+    def __eq__(self, other):
+        return isinstance(other, str) and other.startswith(self)
+
+    __hash__ = str.__hash__
+
+
+class SyncContextTest(SimpleTestCase):
+    def setUp(self):
+        self.events = []
+
+    @contextmanager
+    def manager(self):
+        self.events.append('enter')
+        try:
+            yield sentinel.value
+        except ValueError:
+            self.events.append('error')
+            raise
+        self.events.append('exit')
+
+    async def test_context(self):
+        async with sync_context(self.manager()) as value:
+            self.assertEqual(value, sentinel.value)
+        self.assertEqual(self.events, ['enter', 'exit'])
+
+    async def test_error(self):
+        async def fail():
+            async with sync_context(self.manager()):
+                raise ValueError('Gazpacho!')
+
+        with self.assertRaises(ValueError):
+            await fail()
+        self.assertEqual(self.events, ['enter', 'error'])
+
+
+class GatherMappingTest(SimpleTestCase):
+    async def test_gather_mapping(self):
+        async def get(value):
+            await asyncio.sleep(0)
+            return value
+
+        self.assertEqual(await gather_mapping({'rimmer': get(sentinel.rimmer), 'lister': get(sentinel.lister)}),
+                         {'rimmer': sentinel.rimmer, 'lister': sentinel.lister})
+
+    async def test_empty(self):
+        self.assertEqual(await gather_mapping({}), {})
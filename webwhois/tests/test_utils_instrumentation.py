@@ -0,0 +1,291 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import cast
+from unittest.mock import MagicMock, call, create_autospec, patch, sentinel
+
+from django.test import SimpleTestCase
+
+from webwhois.utils.instrumentation import (SPAN_BACKEND, SPAN_LOG_ENTRY, InstrumentedClient, Observer, Span,
+                                            add_context_observer, add_observer, finish_span, get_observers,
+                                            instrument_client, measure, measure_context, measure_iterable, observe,
+                                            record_cache_access, remove_context_observer, remove_observer, start_span)
+
+
+class RecordingObserver(Observer):
+    """Observer which records the events."""
+
+    def __init__(self):
+        self.events = []
+
+    def span_started(self, span):
+        self.events.append(('started', span.kind, span.name, span.args))
+
+    def span_finished(self, span):
+        self.events.append(('finished', span.kind, span.name, span.args, span.error))
+
+    def cache_accessed(self, cache, hit):
+        self.events.append(('cache', cache, hit))
+
+
+class Client:
+    """Testing backend client."""
+
+    flag = 'Gazpacho!'
+
+    def get_object(self, handle, *, detail=False):
+        return (handle, detail)
+
+    def fail(self):
+        raise ValueError('Smeg!')
+
+    def _private(self):
+        return sentinel.private
+
+
+class ObserverTestCase(SimpleTestCase):
+    def setUp(self):
+        self.observer = RecordingObserver()
+        add_observer(self.observer)
+        self.addCleanup(remove_observer, self.observer)
+
+
+class MeasureTest(ObserverTestCase):
+    def test_measure(self):
+        with patch('webwhois.utils.instrumentation.time.perf_counter', side_effect=[10, 12.5]):
+            with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle', ('example.org', )) as span:
+                pass
+
+        span = cast(Span, span)
+        self.assertEqual(span.duration, 2.5)
+        self.assertIsNone(span.error)
+        self.assertEqual(self.observer.events, [
+            ('started', 'backend', 'WHOIS.get_domain_by_handle', ('example.org', )),
+            ('finished', 'backend', 'WHOIS.get_domain_by_handle', ('example.org', ), None),
+        ])
+
+    def test_measure_error(self):
+        with self.assertRaises(ValueError):
+            with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle'):
+                Client().fail()
+
+        self.assertEqual(self.observer.events[-1][:-1], ('finished', 'backend', 'WHOIS.get_domain_by_handle', ()))
+        self.assertIsInstance(self.observer.events[-1][-1], ValueError)
+
+    def test_measure_no_observers(self):
+        remove_observer(self.observer)
+        self.addCleanup(add_observer, self.observer)
+
+        with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle') as span:
+            pass
+
+        self.assertIsNone(span)
+        self.assertEqual(self.observer.events, [])
+
+    def test_observers_order(self):
+        other = RecordingObserver()
+        add_observer(other)
+        self.addCleanup(remove_observer, other)
+        order = []
+        with patch.object(self.observer, 'span_finished', side_effect=lambda span: order.append(self.observer)):
+            with patch.object(other, 'span_finished', side_effect=lambda span: order.append(other)):
+                with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle'):
+                    pass
+
+        # Observers are notified about finished spans in the reverse order.
+        self.assertEqual(order, [other, self.observer])
+
+    def test_start_finish_span(self):
+        span = start_span(SPAN_BACKEND, 'WHOIS.get_domain_by_handle')
+        # Observers added later aren't notified about the span.
+        other = RecordingObserver()
+        add_observer(other)
+        self.addCleanup(remove_observer, other)
+
+        finish_span(span, sentinel.error)
+
+        self.assertEqual(span.error, sentinel.error)
+        self.assertEqual(len(self.observer.events), 2)
+        self.assertEqual(other.events, [])
+
+    def test_span_repr(self):
+        self.assertEqual(repr(Span(SPAN_BACKEND, 'WHOIS.get_domain_by_handle')),
+                         '<Span backend WHOIS.get_domain_by_handle>')
+
+    def test_measure_iterable(self):
+        self.assertEqual(list(measure_iterable(SPAN_BACKEND, 'CDNSKEY.raw_scan_results', iter([1, 2]))), [1, 2])
+
+        self.assertEqual(self.observer.events, [
+            ('started', 'backend', 'CDNSKEY.raw_scan_results', ()),
+            ('finished', 'backend', 'CDNSKEY.raw_scan_results', (), None),
+        ])
+
+    def test_measure_iterable_closed(self):
+        iterator = measure_iterable(SPAN_BACKEND, 'CDNSKEY.raw_scan_results', iter([1, 2]))
+        next(iterator)
+
+        iterator.close()
+
+        self.assertEqual(self.observer.events[-1], ('finished', 'backend', 'CDNSKEY.raw_scan_results', (), None))
+
+    def test_measure_context(self):
+        manager = MagicMock()
+        manager.__enter__.return_value = sentinel.value
+
+        with measure_context(SPAN_LOG_ENTRY, 'LOGGER.create', manager, ('Info', )) as value:
+            self.assertEqual(value, sentinel.value)
+            self.assertEqual(len(self.observer.events), 1)
+
+        self.assertEqual(self.observer.events, [
+            ('started', 'log_entry', 'LOGGER.create', ('Info', )),
+            ('finished', 'log_entry', 'LOGGER.create', ('Info', ), None),
+        ])
+        manager.__exit__.assert_called_once_with(None, None, None)
+
+    def test_record_cache_access(self):
+        record_cache_access('page', hit=True)
+
+        self.assertEqual(self.observer.events, [('cache', 'page', True)])
+
+
+class ContextObserverTest(SimpleTestCase):
+    def test_observe(self):
+        with observe(RecordingObserver()) as observer:
+            self.assertEqual(get_observers(), (observer, ))
+            with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle'):
+                pass
+            record_cache_access('page', hit=False)
+
+        self.assertEqual(get_observers(), ())
+        self.assertEqual(observer.events, [
+            ('started', 'backend', 'WHOIS.get_domain_by_handle', ()),
+            ('finished', 'backend', 'WHOIS.get_domain_by_handle', (), None),
+            ('cache', 'page', False),
+        ])
+
+    def test_global_observers(self):
+        global_observer = RecordingObserver()
+        add_observer(global_observer)
+        self.addCleanup(remove_observer, global_observer)
+
+        with observe(RecordingObserver()) as observer:
+            self.assertEqual(get_observers(), (global_observer, observer))
+
+    def test_other_context(self):
+        observer = RecordingObserver()
+
+        def _other():
+            with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle'):
+                pass
+
+        # Observers are registered only in the current context.
+        contextvars.copy_context().run(add_context_observer, observer)
+        _other()
+
+        self.assertEqual(observer.events, [])
+
+    def test_copied_context(self):
+        observer = RecordingObserver()
+        add_context_observer(observer)
+        self.addCleanup(remove_context_observer, observer)
+
+        def _other():
+            with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle'):
+                pass
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(contextvars.copy_context().run, _other).result()
+
+        self.assertEqual(len(observer.events), 2)
+
+    def test_remove_context_observer(self):
+        observer = RecordingObserver()
+        other = RecordingObserver()
+        add_context_observer(observer)
+        add_context_observer(other)
+        self.addCleanup(remove_context_observer, other)
+
+        remove_context_observer(observer)
+
+        self.assertEqual(get_observers(), (other, ))
+
+
+class InstrumentedClientTest(ObserverTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = InstrumentedClient(Client(), 'REGISTRY')
+
+    def test_call(self):
+        self.assertEqual(self.client.get_object('kryten', detail=True), ('kryten', True))
+
+        self.assertEqual(self.observer.events, [
+            ('started', 'backend', 'REGISTRY.get_object', ('kryten', )),
+            ('finished', 'backend', 'REGISTRY.get_object', ('kryten', ), None),
+        ])
+
+    def test_call_error(self):
+        with self.assertRaisesRegex(ValueError, 'Smeg!'):
+            self.client.fail()
+
+        self.assertIsInstance(self.observer.events[-1][-1], ValueError)
+
+    def test_not_instrumented(self):
+        self.assertEqual(self.client.flag, 'Gazpacho!')
+        self.assertEqual(self.client._private(), sentinel.private)
+        self.assertEqual(self.observer.events, [])
+
+    def test_context_observer(self):
+        remove_observer(self.observer)
+        self.addCleanup(add_observer, self.observer)
+
+        with observe(RecordingObserver()) as observer:
+            self.client.get_object('kryten')
+
+        self.assertEqual(len(observer.events), 2)
+
+    def test_no_observers(self):
+        remove_observer(self.observer)
+        self.addCleanup(add_observer, self.observer)
+
+        self.assertEqual(self.client.get_object, self.client.client.get_object)
+
+    def test_patch_client(self):
+        with patch.object(self.client, 'client') as client_mock:
+            client_mock.get_object.return_value = sentinel.object
+
+            self.assertEqual(self.client.get_object('kryten'), sentinel.object)
+
+        self.assertEqual(client_mock.mock_calls, [call.get_object('kryten')])
+
+    def test_autospec(self):
+        client_mock = create_autospec(self.client)
+        client_mock.get_object('kryten')
+
+        with self.assertRaises(AttributeError):
+            client_mock.unknown_method
+
+    def test_dir(self):
+        self.assertIn('get_object', dir(self.client))
+        self.assertIn('service', dir(self.client))
+
+    def test_instrument_client(self):
+        client = instrument_client(Client(), 'REGISTRY')
+        self.assertIsInstance(client, InstrumentedClient)
+        self.assertEqual(client.get_object('kryten'), ('kryten', False))
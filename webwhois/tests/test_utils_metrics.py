@@ -0,0 +1,105 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+import os
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+from prometheus_client import CollectorRegistry
+
+from webwhois.utils.instrumentation import SPAN_BACKEND, SPAN_VIEW, Span
+from webwhois.utils.metrics import MetricsObserver, generate_metrics, get_metrics_observer
+
+
+class MetricsObserverTest(SimpleTestCase):
+    def setUp(self):
+        self.registry = CollectorRegistry()
+        self.observer = MetricsObserver(registry=self.registry)
+
+    def _finish_span(self, kind, name, error=None):
+        span = Span(kind, name)
+        span.duration = 0.2
+        span.error = error
+        self.observer.span_finished(span)
+
+    def test_backend(self):
+        self._finish_span(SPAN_BACKEND, 'WHOIS.get_domain_by_handle')
+
+        labels = {'operation': 'WHOIS.get_domain_by_handle'}
+        self.assertEqual(self.registry.get_sample_value('webwhois_backend_call_duration_seconds_count', labels), 1)
+        self.assertEqual(self.registry.get_sample_value('webwhois_backend_call_duration_seconds_sum', labels), 0.2)
+
+    def test_view(self):
+        self._finish_span(SPAN_VIEW, 'webwhois:detail_domain')
+
+        labels = {'view': 'webwhois:detail_domain'}
+        self.assertEqual(self.registry.get_sample_value('webwhois_view_duration_seconds_count', labels), 1)
+
+    def test_other(self):
+        self._finish_span('other', 'holly')
+
+        self.assertIsNone(self.registry.get_sample_value('webwhois_view_duration_seconds_count', {'view': 'holly'}))
+
+    def test_error(self):
+        self._finish_span(SPAN_BACKEND, 'WHOIS.get_domain_by_handle', ValueError('Smeg!'))
+
+        labels = {'kind': 'backend', 'name': 'WHOIS.get_domain_by_handle', 'exception': 'ValueError'}
+        self.assertEqual(self.registry.get_sample_value('webwhois_errors_total', labels), 1)
+
+    def test_cache(self):
+        self.observer.cache_accessed('page', hit=True)
+        self.observer.cache_accessed('page', hit=False)
+        self.observer.cache_accessed('page', hit=False)
+
+        self.assertEqual(self.registry.get_sample_value('webwhois_cache_requests_total',
+                                                        {'cache': 'page', 'result': 'hit'}), 1)
+        self.assertEqual(self.registry.get_sample_value('webwhois_cache_requests_total',
+                                                        {'cache': 'page', 'result': 'miss'}), 2)
+
+    def test_missing(self):
+        with patch('webwhois.utils.metrics.prometheus_client', None):
+            with self.assertRaisesRegex(ImproperlyConfigured, 'prometheus_client is not available'):
+                MetricsObserver(registry=self.registry)
+
+
+class GenerateMetricsTest(SimpleTestCase):
+    def test_generate(self):
+        get_metrics_observer().cache_accessed('page', hit=True)
+
+        content, content_type = generate_metrics()
+
+        self.assertIn(b'webwhois_cache_requests_total{cache="page",result="hit"}', content)
+        self.assertTrue(content_type.startswith('text/plain'))
+
+    def test_get_metrics_observer(self):
+        self.assertIs(get_metrics_observer(), get_metrics_observer())
+
+    def test_multiprocess(self):
+        with TemporaryDirectory() as directory:
+            with patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory}):
+                with patch('webwhois.utils.metrics.multiprocess.MultiProcessCollector') as collector_mock:
+                    generate_metrics()
+
+        self.assertEqual(collector_mock.call_count, 1)
+
+    def test_missing(self):
+        with patch('webwhois.utils.metrics.prometheus_client', None):
+            with self.assertRaisesRegex(ImproperlyConfigured, 'prometheus_client is not available'):
+                generate_metrics()
@@ -0,0 +1,188 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+from unittest.mock import Mock, call, patch, sentinel
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from webwhois.utils.codec import dumps, loads
+from webwhois.utils.object_cache import LRUCache, TwoTierCache, get_object_cache
+
+
+class LRUCacheTest(SimpleTestCase):
+    def test_get_set(self):
+        cache = LRUCache(max_size=2, timeout=10)
+
+        cache.set('kryten', sentinel.kryten)
+
+        self.assertEqual(cache.get('kryten'), sentinel.kryten)
+        self.assertIsNone(cache.get('lister'))
+        self.assertEqual(cache.stats.as_dict(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_evict_least_recently_used(self):
+        cache = LRUCache(max_size=2, timeout=10)
+        cache.set('kryten', sentinel.kryten)
+        cache.set('lister', sentinel.lister)
+        cache.get('kryten')
+
+        cache.set('rimmer', sentinel.rimmer)
+
+        self.assertEqual(cache.get('kryten'), sentinel.kryten)
+        self.assertIsNone(cache.get('lister'))
+        self.assertEqual(cache.get('rimmer'), sentinel.rimmer)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_expired(self):
+        cache = LRUCache(max_size=2, timeout=10)
+        with patch('webwhois.utils.object_cache.time.monotonic', return_value=1000):
+            cache.set('kryten', sentinel.kryten)
+        with patch('webwhois.utils.object_cache.time.monotonic', return_value=1010):
+            self.assertIsNone(cache.get('kryten'))
+        self.assertEqual(len(cache), 0)
+
+    def test_disabled(self):
+        cache = LRUCache(max_size=0, timeout=10)
+
+        cache.set('kryten', sentinel.kryten)
+
+        self.assertIsNone(cache.get('kryten'))
+
+    def test_delete_clear(self):
+        cache = LRUCache(max_size=2, timeout=10)
+        cache.set('kryten', sentinel.kryten)
+        cache.set('lister', sentinel.lister)
+
+        cache.delete('kryten')
+        self.assertIsNone(cache.get('kryten'))
+        cache.clear()
+        self.assertIsNone(cache.get('lister'))
+
+    def test_hit_ratio_empty(self):
+        self.assertEqual(LRUCache(max_size=2, timeout=10).stats.hit_ratio, 0.0)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'object-cache'}})
+class TwoTierCacheTest(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.cache = TwoTierCache(l1_size=2, l1_timeout=10, l2_timeout=60)
+
+    def test_set(self):
+        self.cache.set('kryten', 'mechanoid')
+
+        self.assertEqual(self.cache.l1.get('kryten'), 'mechanoid')
+        self.assertEqual(loads(caches['default'].get('kryten')), 'mechanoid')
+
+    def test_get_l1(self):
+        self.cache.set('kryten', 'mechanoid')
+        caches['default'].clear()
+
+        self.assertEqual(self.cache.get('kryten'), 'mechanoid')
+        self.assertEqual(self.cache.get_stats(), {
+            'l1': {'hits': 1, 'misses': 0, 'hit_ratio': 1.0, 'size': 1, 'max_size': 2, 'evictions': 0},
+            'l2': {'hits': 0, 'misses': 0, 'hit_ratio': 0.0},
+        })
+
+    def test_get_l2_promotes(self):
+        caches['default'].set('kryten', dumps('mechanoid'))
+
+        self.assertEqual(self.cache.get('kryten'), 'mechanoid')
+        self.assertEqual(self.cache.get('kryten'), 'mechanoid')
+
+        stats = self.cache.get_stats()
+        self.assertEqual((stats['l1']['hits'], stats['l1']['misses']), (1, 1))
+        self.assertEqual((stats['l2']['hits'], stats['l2']['misses']), (1, 0))
+
+    def test_demoted(self):
+        self.cache.set('kryten', 'mechanoid')
+        self.cache.set('lister', 'human')
+        self.cache.set('rimmer', 'hologram')
+
+        # Value evicted from the first tier is still available in the second one.
+        self.assertEqual(self.cache.get('kryten'), 'mechanoid')
+        self.assertEqual(self.cache.get_stats()['l2']['hits'], 1)
+
+    def test_get_l2_undecodable(self):
+        # Values stored before an upgrade of the codec are treated as missing.
+        caches['default'].set('kryten', 'mechanoid')
+
+        self.assertIsNone(self.cache.get('kryten'))
+        self.assertEqual(self.cache.get_stats()['l2']['misses'], 1)
+
+    def test_get_instrumented(self):
+        self.cache.set('kryten', 'mechanoid')
+        self.cache.l1.clear()
+
+        with patch('webwhois.utils.object_cache.record_cache_access') as l1_mock:
+            with patch('webwhois.utils.codec.record_cache_access') as l2_mock:
+                self.cache.get('kryten')
+                self.cache.get('kryten')
+
+        self.assertEqual(l1_mock.mock_calls, [call('object_l1', hit=False), call('object_l1', hit=True)])
+        self.assertEqual(l2_mock.mock_calls, [call('object_l2', hit=True)])
+
+    def test_get_missing(self):
+        self.assertEqual(self.cache.get('kryten', sentinel.default), sentinel.default)
+        self.assertEqual(self.cache.get_stats()['l2']['misses'], 1)
+
+    def test_delete(self):
+        self.cache.set('kryten', 'mechanoid')
+
+        self.cache.delete('kryten')
+
+        self.assertIsNone(self.cache.get('kryten'))
+
+    def test_get_or_load(self):
+        load = Mock(return_value='mechanoid')
+
+        self.assertEqual(self.cache.get_or_load('kryten', load), 'mechanoid')
+        self.assertEqual(self.cache.get_or_load('kryten', load), 'mechanoid')
+
+        load.assert_called_once_with()
+
+    def test_get_or_load_error(self):
+        load = Mock(side_effect=[ValueError, 'mechanoid'])
+
+        with self.assertRaises(ValueError):
+            self.cache.get_or_load('kryten', load)
+
+        self.assertEqual(self.cache.get_or_load('kryten', load), 'mechanoid')
+
+    def test_l1_timeout(self):
+        cache = TwoTierCache(l1_size=2, l1_timeout=10, l2_timeout=5)
+
+        self.assertEqual(cache.l1.timeout, 5)
+
+
+class GetObjectCacheTest(SimpleTestCase):
+    def setUp(self):
+        get_object_cache.cache_clear()
+        self.addCleanup(get_object_cache.cache_clear)
+
+    @override_settings(WEBWHOIS_OBJECT_CACHE_L1_SIZE=42, WEBWHOIS_OBJECT_CACHE_L1_TIMEOUT=5,
+                       WEBWHOIS_OBJECT_CACHE_TIMEOUT=60)
+    def test_get_object_cache(self):
+        cache = get_object_cache()
+
+        self.assertEqual(cache.l1.max_size, 42)
+        self.assertEqual(cache.l1.timeout, 5)
+        self.assertEqual(cache.l2_timeout, 60)
+        self.assertIs(get_object_cache(), cache)
@@ -0,0 +1,100 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+import cProfile
+import os
+import pstats
+from datetime import datetime
+from tempfile import TemporaryDirectory
+from typing import cast
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from testfixtures import LogCapture
+
+from webwhois.utils.profiling import rotate_profiles, save_profile
+
+
+class SaveProfileTest(SimpleTestCase):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.profile = cProfile.Profile()
+        self.profile.runcall(sorted, [3, 2, 1])
+
+    def test_save(self):
+        with patch('webwhois.utils.profiling.datetime') as datetime_mock:
+            datetime_mock.now.return_value = datetime(2022, 1, 2, 3, 4, 5, 678)
+            with patch('webwhois.utils.profiling.os.getpid', return_value=42):
+                path = save_profile(self.profile, self.directory, 'webwhois:detail_domain', 1.2345, 10)
+
+        self.assertEqual(path, os.path.join(self.directory, 'webwhois.detail_domain',
+                                            '20220102T030405000678-42-1234ms.prof'))
+        self.assertGreater(pstats.Stats(path).total_calls, 0)  # type: ignore[attr-defined]
+
+    def test_unsafe_name(self):
+        path = save_profile(self.profile, self.directory, '../evil/name', 1, 10)
+
+        self.assertEqual(os.path.dirname(cast(str, path)), os.path.join(self.directory, '.._evil_name'))
+
+    def test_rotate(self):
+        for _ in range(3):
+            save_profile(self.profile, self.directory, 'detail_domain', 1, 2)
+
+        self.assertEqual(len(os.listdir(os.path.join(self.directory, 'detail_domain'))), 2)
+
+    def test_error(self):
+        # Directory can't be created in a file.
+        path = os.path.join(self.directory, 'file')
+        open(path, 'w').close()
+        with LogCapture('webwhois.utils.profiling') as log_handler:
+            self.assertIsNone(save_profile(self.profile, path, 'detail_domain', 1, 2))
+
+        self.assertEqual(len(log_handler.records), 1)
+
+
+class RotateProfilesTest(SimpleTestCase):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def _touch(self, *filenames):
+        for filename in filenames:
+            open(os.path.join(self.directory, filename), 'w').close()
+
+    def test_rotate(self):
+        self._touch('1.prof', '3.prof', '2.prof', 'other.txt')
+
+        rotate_profiles(self.directory, 2)
+
+        self.assertEqual(sorted(os.listdir(self.directory)), ['2.prof', '3.prof', 'other.txt'])
+
+    def test_under_limit(self):
+        self._touch('1.prof')
+
+        rotate_profiles(self.directory, 2)
+
+        self.assertEqual(os.listdir(self.directory), ['1.prof'])
+
+    def test_missing_directory(self):
+        with LogCapture('webwhois.utils.profiling') as log_handler:
+            rotate_profiles(os.path.join(self.directory, 'missing'), 2)
+
+        self.assertEqual(len(log_handler.records), 1)
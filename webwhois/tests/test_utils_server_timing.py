@@ -0,0 +1,62 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+from django.test import SimpleTestCase
+
+from webwhois.utils.instrumentation import SPAN_BACKEND, SPAN_RENDER, SPAN_STATUS_DESCRIPTIONS, Span
+from webwhois.utils.server_timing import ServerTiming
+
+
+def _make_span(kind: str, name: str, duration: float) -> Span:
+    span = Span(kind, name)
+    span.duration = duration
+    return span
+
+
+class ServerTimingTest(SimpleTestCase):
+    def test_empty(self):
+        self.assertEqual(ServerTiming().get_header(), '')
+
+    def test_get_metric_name(self):
+        data = (
+            (SPAN_BACKEND, 'WHOIS.get_domain_by_handle', 'whois'),
+            (SPAN_BACKEND, 'PUBLIC_REQUEST.create_authinfo_request', 'public-request'),
+            (SPAN_BACKEND, 'REGAL.domain.get_domain_info', 'regal'),
+            (SPAN_BACKEND, 'LOGGER.create_log_entry', 'logger'),
+            (SPAN_RENDER, 'webwhois:detail_domain', 'render'),
+            (SPAN_STATUS_DESCRIPTIONS, 'domain', 'status-descriptions'),
+        )
+        for kind, name, metric in data:
+            with self.subTest(name=name):
+                self.assertEqual(ServerTiming.get_metric_name(Span(kind, name)), metric)
+
+    def test_header(self):
+        server_timing = ServerTiming()
+        server_timing.span_finished(_make_span(SPAN_BACKEND, 'WHOIS.get_domain_by_handle', 0.01))
+        server_timing.span_finished(_make_span(SPAN_BACKEND, 'LOGGER.create_log_entry', 0.002))
+        server_timing.span_finished(_make_span(SPAN_BACKEND, 'WHOIS.get_domain_status_descriptions', 0.0023))
+        server_timing.span_finished(_make_span(SPAN_RENDER, 'webwhois:detail_domain', 0.0045))
+
+        self.assertEqual(server_timing.get_header(),
+                         'whois;dur=12.3;desc="2 calls", logger;dur=2.0;desc="1 call", render;dur=4.5;desc="1 call"')
+
+    def test_unfinished(self):
+        server_timing = ServerTiming()
+        server_timing.span_finished(Span(SPAN_BACKEND, 'WHOIS.get_domain_by_handle'))
+
+        self.assertEqual(server_timing.get_header(), '')
@@ -0,0 +1,189 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+import hashlib
+import threading
+from unittest.mock import Mock, patch, sentinel
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from webwhois.utils.codec import cache_set
+from webwhois.utils.single_flight import SingleFlight
+
+CACHE_KEY = 'webwhois_flight_{}'.format(hashlib.sha1(b'kryten').hexdigest())
+LEASE_KEY = CACHE_KEY + '_lease'
+
+
+class SingleFlightTest(SimpleTestCase):
+    def test_do(self):
+        call = Mock(return_value=sentinel.result)
+
+        self.assertEqual(SingleFlight().do('kryten', call), sentinel.result)
+        self.assertEqual(SingleFlight().do('kryten', call), sentinel.result)
+
+        # Calls, which are not concurrent, are not coalesced.
+        self.assertEqual(call.call_count, 2)
+
+    def _do_concurrent(self, single_flight, call, count=4):
+        """Call `do` in threads and return their results or exceptions."""
+        results = []
+
+        def target():
+            try:
+                results.append(single_flight.do('kryten', call))
+            except Exception as error:
+                results.append(error)
+
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_concurrent(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def call():
+            started.set()
+            release.wait(5)
+            return sentinel.result
+
+        call_mock = Mock(side_effect=call)
+        single_flight = SingleFlight()
+        leader, leader_results = self._do_concurrent(single_flight, call_mock, count=1)
+        started.wait(5)
+        followers, results = self._do_concurrent(single_flight, call_mock)
+        release.set()
+        for thread in leader + followers:
+            thread.join(5)
+
+        self.assertEqual(leader_results + results, [sentinel.result] * 5)
+        self.assertEqual(call_mock.call_count, 1)
+
+    def test_concurrent_error(self):
+        started = threading.Event()
+        release = threading.Event()
+        error = ValueError('Gazpacho!')
+
+        def call():
+            started.set()
+            release.wait(5)
+            raise error
+
+        single_flight = SingleFlight()
+        leader, leader_results = self._do_concurrent(single_flight, call, count=1)
+        started.wait(5)
+        followers, results = self._do_concurrent(single_flight, call)
+        release.set()
+        for thread in leader + followers:
+            thread.join(5)
+
+        self.assertEqual(leader_results + results, [error] * 5)
+        self.assertEqual(single_flight._calls, {})
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'single-flight'}})
+class SingleFlightLeaseTest(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.single_flight = SingleFlight(lease_timeout=5, poll_interval=0.01)
+
+    def test_leader(self):
+        call = Mock(return_value='mechanoid')
+
+        self.assertEqual(self.single_flight.do('kryten', call), 'mechanoid')
+
+        call.assert_called_once_with()
+        self.assertIsNone(caches['default'].get(LEASE_KEY))
+        self.assertIsNotNone(caches['default'].get(CACHE_KEY))
+
+    def test_leader_error(self):
+        call = Mock(side_effect=ValueError('Gazpacho!'))
+
+        with self.assertRaises(ValueError):
+            self.single_flight.do('kryten', call)
+
+        self.assertIsNone(caches['default'].get(LEASE_KEY))
+        self.assertIsNone(caches['default'].get(CACHE_KEY))
+
+    def test_leader_lease_expired(self):
+        def call():
+            # Lease expired and another worker acquired it.
+            caches['default'].set(LEASE_KEY, 'other')
+            return 'mechanoid'
+
+        self.assertEqual(self.single_flight.do('kryten', call), 'mechanoid')
+
+        self.assertEqual(caches['default'].get(LEASE_KEY), 'other')
+
+    def test_follower(self):
+        caches['default'].set(LEASE_KEY, 'other')
+        call = Mock(return_value='human')
+
+        def sleep(interval):
+            # Another worker stores the result.
+            cache_set(caches['default'], CACHE_KEY, {'result': 'mechanoid', 'stored': 1010}, 5)
+
+        with patch('webwhois.utils.single_flight.time.time', return_value=1000):
+            with patch('webwhois.utils.single_flight.time.sleep', side_effect=sleep) as sleep_mock:
+                self.assertEqual(self.single_flight.do('kryten', call), 'mechanoid')
+
+        call.assert_not_called()
+        sleep_mock.assert_called_once_with(0.01)
+
+    def test_follower_old_result(self):
+        # Result of a call finished before we arrived is not used.
+        cache_set(caches['default'], CACHE_KEY, {'result': 'mechanoid', 'stored': 990}, 5)
+        caches['default'].set(LEASE_KEY, 'other')
+        call = Mock(return_value='human')
+
+        with patch('webwhois.utils.single_flight.time.time', return_value=1000):
+            with patch('webwhois.utils.single_flight.time.monotonic', side_effect=[0, 0, 5]):
+                with patch('webwhois.utils.single_flight.time.sleep'):
+                    self.assertEqual(self.single_flight.do('kryten', call), 'human')
+
+        call.assert_called_once_with()
+
+    def test_follower_timeout(self):
+        caches['default'].set(LEASE_KEY, 'other')
+        call = Mock(return_value='human')
+
+        with patch('webwhois.utils.single_flight.time.monotonic', side_effect=[0, 5]):
+            with patch('webwhois.utils.single_flight.time.sleep') as sleep_mock:
+                self.assertEqual(self.single_flight.do('kryten', call), 'human')
+
+        call.assert_called_once_with()
+        sleep_mock.assert_not_called()
+        # The lease of the other worker is kept.
+        self.assertEqual(caches['default'].get(LEASE_KEY), 'other')
+
+    def test_follower_lease_released(self):
+        caches['default'].set(LEASE_KEY, 'other')
+        call = Mock(return_value='human')
+
+        def sleep(interval):
+            # Another worker failed and released the lease.
+            caches['default'].delete(LEASE_KEY)
+
+        with patch('webwhois.utils.single_flight.time.sleep', side_effect=sleep):
+            self.assertEqual(self.single_flight.do('kryten', call), 'human')
+
+        call.assert_called_once_with()
+        self.assertIsNone(caches['default'].get(LEASE_KEY))
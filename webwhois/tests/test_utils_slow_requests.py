@@ -0,0 +1,108 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+import json
+from unittest.mock import patch
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from testfixtures import LogCapture
+
+from webwhois.utils.instrumentation import (SPAN_BACKEND, SPAN_RENDER, SPAN_STATUS_DESCRIPTIONS, SPAN_VIEW, Span,
+                                            finish_span)
+from webwhois.utils.slow_requests import SlowRequestRecorder, log_slow_request
+
+
+class SlowRequestRecorderTest(SimpleTestCase):
+    def setUp(self):
+        with patch('webwhois.utils.slow_requests.time.perf_counter', return_value=100):
+            self.recorder = SlowRequestRecorder()
+        self.request = RequestFactory().get('/domain/example.org/')
+
+    def _finish(self, kind, name, args, start, duration, error=None):
+        span = Span(kind, name, args)
+        span.start = start
+        with patch('webwhois.utils.instrumentation.time.perf_counter', return_value=start + duration):
+            finish_span(span, error)
+        self.recorder.span_finished(span)
+
+    def test_empty(self):
+        with patch('webwhois.utils.slow_requests.time.perf_counter', return_value=100.5):
+            record = self.recorder.get_record(self.request, HttpResponse(status=404))
+
+        self.assertEqual(record, {
+            'method': 'GET', 'path': '/domain/example.org/', 'status': 404, 'duration': 0.5, 'view': None, 'args': [],
+            'render': None, 'calls': [], 'caches': {}})
+
+    def test_record(self):
+        self._finish(SPAN_BACKEND, 'WHOIS.get_domain_by_handle', ('example.org', ), 100.1, 0.5)
+        # Spans are ordered by their starts.
+        self._finish(SPAN_BACKEND, 'LOGGER.create_log_entry', ('Info', ), 100.05, 0.025)
+        self._finish(SPAN_BACKEND, 'WHOIS.get_domain_status_descriptions', ('en', ), 100.6, 1.25, ValueError('Smeg!'))
+        self._finish(SPAN_STATUS_DESCRIPTIONS, 'domain', ('en', ), 100.6, 1.25)
+        self._finish(SPAN_RENDER, 'webwhois:detail_domain', (), 101.9, 0.125)
+        self._finish(SPAN_VIEW, 'webwhois:detail_domain', ('example.org', ), 100.01, 2.0)
+        self.recorder.cache_accessed('page', hit=False)
+        self.recorder.cache_accessed('object_l1', hit=True)
+        self.recorder.cache_accessed('object_l1', hit=False)
+        self.recorder.cache_accessed('object_l1', hit=True)
+
+        with patch('webwhois.utils.slow_requests.time.perf_counter', return_value=102.5):
+            record = self.recorder.get_record(self.request, HttpResponse())
+
+        self.assertEqual(record, {
+            'method': 'GET', 'path': '/domain/example.org/', 'status': 200, 'duration': 2.5,
+            'view': 'webwhois:detail_domain', 'args': ['example.org'], 'render': 0.125,
+            'calls': [
+                {'name': 'LOGGER.create_log_entry', 'args': ['Info'], 'start': 0.05, 'duration': 0.025,
+                 'error': None},
+                {'name': 'WHOIS.get_domain_by_handle', 'args': ['example.org'], 'start': 0.1, 'duration': 0.5,
+                 'error': None},
+                {'name': 'WHOIS.get_domain_status_descriptions', 'args': ['en'], 'start': 0.6, 'duration': 1.25,
+                 'error': "ValueError('Smeg!')"},
+            ],
+            'caches': {'page': {'hit': 0, 'miss': 1}, 'object_l1': {'hit': 2, 'miss': 1}}})
+
+    def test_args(self):
+        self._finish(SPAN_BACKEND, 'SECRETARY.render', (b'\x00', {'handle': 'x' * 500}, None, 4.2), 100, 1)
+
+        record = self.recorder.get_record(self.request, HttpResponse())
+
+        args = record['calls'][0]['args']
+        self.assertEqual(args[0], "b'\\x00'")
+        self.assertLess(len(args[1]), 150)
+        self.assertEqual(args[2:], [None, 4.2])
+
+    def test_get_duration(self):
+        with patch('webwhois.utils.slow_requests.time.perf_counter', return_value=103):
+            self.assertEqual(self.recorder.get_duration(), 3)
+
+
+class LogSlowRequestTest(SimpleTestCase):
+    def test_log(self):
+        record = {'view': 'webwhois:detail_domain', 'args': ['example.org'], 'other': {1, 2}}
+
+        with LogCapture('webwhois.utils.slow_requests') as log_handler:
+            log_slow_request(record)
+
+        self.assertEqual(len(log_handler.records), 1)
+        message = log_handler.records[0].getMessage()
+        self.assertNotIn('\n', message)
+        self.assertEqual(json.loads(message), {'view': 'webwhois:detail_domain', 'args': ['example.org'],
+                                               'other': '{1, 2}'})
+        self.assertEqual(log_handler.records[0].levelname, 'WARNING')
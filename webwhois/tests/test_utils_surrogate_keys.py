@@ -0,0 +1,77 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+from unittest.mock import patch, sentinel
+from urllib.error import URLError
+
+from django.test import SimpleTestCase, override_settings
+
+from webwhois.utils.surrogate_keys import make_surrogate_key, purge_surrogate_keys
+
+from .utils import apply_patch
+
+
+class MakeSurrogateKeyTest(SimpleTestCase):
+    def test_make_surrogate_key(self):
+        data = (
+            ('contact', 'KONTAKT', 'contact:kontakt'),
+            ('NSSet', 'NSSET-1', 'nsset:nsset-1'),
+            ('domain', 'fred.cz', 'domain:fred.cz'),
+            ('contact', 'HOLLY, KRYTEN', 'contact:holly_kryten'),
+        )
+        for object_type, handle, key in data:
+            with self.subTest(object_type=object_type, handle=handle):
+                self.assertEqual(make_surrogate_key(object_type, handle), key)
+
+
+@override_settings(WEBWHOIS_PURGE_URLS=['http://varnish-1/', 'http://varnish-2/'])
+class PurgeSurrogateKeysTest(SimpleTestCase):
+    def setUp(self):
+        self.urlopen_mock = apply_patch(self, patch('webwhois.utils.surrogate_keys.urlopen'))
+
+    def _get_requests(self):
+        return [(c.args[0].full_url, c.args[0].get_method(), c.args[0].headers)
+                for c in self.urlopen_mock.call_args_list]
+
+    def test_purge(self):
+        self.assertEqual(purge_surrogate_keys(['domain:fred.cz', 'contact:kontakt', 'domain:fred.cz']), [])
+
+        headers = {'Surrogate-key': 'contact:kontakt domain:fred.cz'}
+        self.assertEqual(self._get_requests(), [('http://varnish-1/', 'PURGE', headers),
+                                                ('http://varnish-2/', 'PURGE', headers)])
+        self.assertEqual(self.urlopen_mock.call_args_list[0].kwargs, {'timeout': 5.0})
+
+    @override_settings(WEBWHOIS_PURGE_HEADER='xkey-purge', WEBWHOIS_PURGE_METHOD='POST')
+    def test_purge_custom(self):
+        purge_surrogate_keys(['contact:kontakt'])
+
+        headers = {'Xkey-purge': 'contact:kontakt'}
+        self.assertEqual(self._get_requests(), [('http://varnish-1/', 'POST', headers),
+                                                ('http://varnish-2/', 'POST', headers)])
+
+    def test_purge_empty(self):
+        self.assertEqual(purge_surrogate_keys([]), [])
+        self.assertEqual(self.urlopen_mock.mock_calls, [])
+
+    def test_purge_failed(self):
+        self.urlopen_mock.side_effect = [URLError(sentinel.reason), self.urlopen_mock.return_value]
+
+        with self.assertLogs('webwhois.utils.surrogate_keys', 'WARNING'):
+            self.assertEqual(purge_surrogate_keys(['contact:kontakt']), ['http://varnish-1/'])
+
+        self.assertEqual(self.urlopen_mock.call_count, 2)
@@ -0,0 +1,146 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+from contextlib import nullcontext
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanKind, StatusCode
+from testfixtures import LogCapture
+
+from webwhois.utils.executor import submit
+from webwhois.utils.instrumentation import (SPAN_BACKEND, SPAN_LOG_ENTRY, SPAN_VIEW, Span, add_observer, finish_span,
+                                            measure, measure_context, record_cache_access, remove_observer, start_span)
+from webwhois.utils.tracing import TracingObserver, get_tracing_observer
+
+
+class TracingObserverTest(SimpleTestCase):
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        tracer_provider = TracerProvider()
+        tracer_provider.add_span_processor(SimpleSpanProcessor(self.exporter))
+        self.observer = TracingObserver(tracer_provider=tracer_provider)
+        add_observer(self.observer)
+        self.addCleanup(remove_observer, self.observer)
+
+    def test_span(self):
+        with measure(SPAN_BACKEND, 'REGAL.domain.get_domain_info', ('example.org', {'internal': True})):
+            pass
+
+        span, = self.exporter.get_finished_spans()
+        self.assertEqual(span.name, 'REGAL.domain.get_domain_info')
+        self.assertEqual(span.kind, SpanKind.CLIENT)
+        self.assertEqual(span.attributes, {
+            'webwhois.kind': 'backend', 'webwhois.args': ('example.org', "{'internal': True}"),
+            'rpc.service': 'REGAL.domain', 'rpc.method': 'get_domain_info'})
+        self.assertEqual(span.status.status_code, StatusCode.UNSET)
+        self.assertIsNone(span.parent)
+
+    def test_internal_span(self):
+        with measure(SPAN_VIEW, 'webwhois:detail_domain', ('example.org', )):
+            pass
+
+        span, = self.exporter.get_finished_spans()
+        self.assertEqual(span.kind, SpanKind.INTERNAL)
+        self.assertEqual(span.attributes, {'webwhois.kind': 'view', 'webwhois.args': ('example.org', )})
+
+    def test_error(self):
+        with self.assertRaises(ValueError):
+            with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle'):
+                int('Smeg!')
+
+        span, = self.exporter.get_finished_spans()
+        self.assertEqual(span.status.status_code, StatusCode.ERROR)
+        self.assertEqual(span.status.description, "ValueError: invalid literal for int() with base 10: 'Smeg!'")
+        self.assertEqual([e.name for e in span.events], ['exception'])
+
+    def test_children(self):
+        with measure(SPAN_VIEW, 'webwhois:detail_domain'):
+            with measure_context(SPAN_LOG_ENTRY, 'LOGGER.create', nullcontext()):
+                with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle'):
+                    pass
+                with measure(SPAN_BACKEND, 'WHOIS.get_contact_by_handle'):
+                    pass
+
+        log_entry, contact, domain, view = sorted(self.exporter.get_finished_spans(), key=lambda s: s.name)
+        self.assertIsNone(view.parent)
+        self.assertEqual(log_entry.parent, view.context)
+        self.assertEqual(domain.parent, log_entry.context)
+        self.assertEqual(contact.parent, log_entry.context)
+        self.assertEqual(len({s.context.trace_id for s in (contact, domain, log_entry, view)}), 1)
+
+    def test_executor(self):
+        def _call():
+            with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle'):
+                pass
+
+        with measure(SPAN_VIEW, 'webwhois:detail_domain'):
+            submit(_call).result()
+            submit(_call).result()
+
+        first, second, view = self.exporter.get_finished_spans()
+        self.assertEqual(first.parent, view.context)
+        self.assertEqual(second.parent, view.context)
+
+    def test_start_finish_span(self):
+        # Span may be finished in other context, e.g. in a middleware.
+        view = start_span(SPAN_VIEW, 'webwhois:detail_domain')
+        with measure(SPAN_BACKEND, 'WHOIS.get_domain_by_handle'):
+            pass
+        finish_span(view)
+        with measure(SPAN_BACKEND, 'WHOIS.get_contact_by_handle'):
+            pass
+
+        domain, view_span, contact = self.exporter.get_finished_spans()
+        self.assertEqual(domain.parent, view_span.context)
+        self.assertIsNone(contact.parent)
+
+    def test_unknown_span(self):
+        self.observer.span_finished(Span(SPAN_BACKEND, 'WHOIS.get_domain_by_handle'))
+
+        self.assertEqual(self.exporter.get_finished_spans(), ())
+
+    def test_cache(self):
+        record_cache_access('page', hit=False)
+        with measure(SPAN_VIEW, 'webwhois:detail_domain'):
+            record_cache_access('page', hit=True)
+
+        span, = self.exporter.get_finished_spans()
+        event, = span.events
+        self.assertEqual(event.name, 'cache')
+        self.assertEqual(event.attributes, {'webwhois.cache': 'page', 'webwhois.cache.hit': True})
+
+
+class GetTracingObserverTest(SimpleTestCase):
+    def setUp(self):
+        get_tracing_observer.cache_clear()
+        self.addCleanup(get_tracing_observer.cache_clear)
+
+    def test_observer(self):
+        self.assertIsInstance(get_tracing_observer(), TracingObserver)
+        self.assertIs(get_tracing_observer(), get_tracing_observer())
+
+    def test_not_available(self):
+        with patch('webwhois.utils.tracing.trace', None):
+            with LogCapture('webwhois.utils.tracing') as log_handler:
+                self.assertIsNone(get_tracing_observer())
+
+        self.assertEqual(len(log_handler.records), 1)
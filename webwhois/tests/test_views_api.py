@@ -0,0 +1,345 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+import json
+from datetime import date, datetime
+from unittest.mock import call, patch
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from fred_idl.Registry.Whois import INVALID_HANDLE, OBJECT_DELETE_CANDIDATE, OBJECT_NOT_FOUND
+from grill.utils import TestLogEntry
+
+from webwhois.constants import LOGGER_SERVICE, STATUS_DELETE_CANDIDATE, LogEntryType, LogResult
+from webwhois.utils import WHOIS
+from webwhois.views.api import _json_dumps, _orjson_dumps, dumps
+
+from .test_object_detail import ObjectDetailMixin
+
+
+class ApiTestMixin(ObjectDetailMixin):
+    def _get_json(self, url_name, handle):
+        response = self.client.get(reverse(url_name, kwargs={'handle': handle}))
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return response, json.loads(response.content)
+
+
+class ContactApiViewTest(ApiTestMixin):
+    def setUp(self):
+        super().setUp()
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+    def test_contact(self):
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+
+        response, data = self._get_json('webwhois:api_contact', 'KONTAKT')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['handle'], 'KONTAKT')
+        self.assertEqual(data['name'], 'Arnold Rimmer')
+        self.assertEqual(data['email'], 'rimmer@foo.foo')
+        self.assertEqual(data['identification'], {'type': 'OP', 'value': '333777000'})
+        self.assertEqual(data['address'], {'street': ['Street 756/48'], 'city': 'Prague', 'state_or_province': None,
+                                           'postal_code': '12300', 'country_code': 'CZ'})
+        self.assertEqual(data['not_disclosed'], [])
+        self.assertEqual(data['sponsoring_registrar'], {'handle': 'REG-FRED_A', 'name': 'Company A L.t.d.'})
+        self.assertEqual(data['statuses'], ['linked'])
+        self.assertEqual(WHOIS.mock_calls, [
+            call.get_contact_by_handle('KONTAKT'),
+            call.get_contact_status_descriptions('en'),
+            call.get_registrar_by_handle('REG-FRED_A'),
+            call.get_registrar_by_handle('REG-FRED_A'),
+        ])
+        log_entry = TestLogEntry(LOGGER_SERVICE, LogEntryType.INFO, LogResult.SUCCESS, source_ip='127.0.0.1',
+                                 input_properties={'handle': 'KONTAKT', 'handleType': 'contact'},
+                                 properties={'foundType': ['contact']})
+        self.assertEqual(self.test_logger.mock.mock_calls, log_entry.get_calls())
+
+    def test_contact_not_disclosed(self):
+        WHOIS.get_contact_by_handle.return_value = self._get_contact(disclose=False)
+
+        response, data = self._get_json('webwhois:api_contact', 'KONTAKT')
+
+        self.assertEqual(data['not_disclosed'], ['organization', 'name', 'vat_number', 'email', 'notify_email',
+                                                 'phone', 'fax', 'identification', 'address'])
+        for field in data['not_disclosed']:
+            self.assertNotIn(field, data)
+        self.assertNotIn('Arnold Rimmer', response.content.decode())
+
+    def test_contact_not_linked(self):
+        WHOIS.get_contact_by_handle.return_value = self._get_contact(statuses=[])
+
+        response, data = self._get_json('webwhois:api_contact', 'KONTAKT')
+
+        self.assertEqual(data, {'handle': 'KONTAKT', 'is_linked': False, 'statuses': [],
+                                'sponsoring_registrar': {'handle': 'REG-FRED_A', 'name': 'Company A L.t.d.'}})
+
+    def test_contact_not_found(self):
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+
+        response, data = self._get_json('webwhois:api_contact', 'KONTAKT')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(data, {'error': {'code': 'OBJECT_NOT_FOUND', 'title': 'Contact not found',
+                                          'message': 'No contact matches KONTAKT handle.'}})
+
+    def test_contact_invalid_handle(self):
+        WHOIS.get_contact_by_handle.side_effect = INVALID_HANDLE
+
+        response, data = self._get_json('webwhois:api_contact', 'KONTAKT')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(data['error']['code'], 'INVALID_HANDLE')
+
+
+class NssetApiViewTest(ApiTestMixin):
+    def test_nsset(self):
+        WHOIS.get_nsset_by_handle.return_value = self._get_nsset()
+        WHOIS.get_nsset_status_descriptions.return_value = self._get_nsset_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact(disclose=False)
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+        response, data = self._get_json('webwhois:api_nsset', 'NSSET-1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['handle'], 'NSSET-1')
+        self.assertEqual(data['nameservers'], [{'fqdn': 'a.ns.nic.cz', 'ip_addresses': ['194.0.12.1']},
+                                               {'fqdn': 'b.ns.nic.cz', 'ip_addresses': ['194.0.13.1']}])
+        # Names of contacts are not disclosed.
+        self.assertEqual(data['tech_contacts'], [{'handle': 'KONTAKT'}])
+        self.assertEqual(data['registrar'], {'handle': 'REG-FRED_A', 'name': 'Company A L.t.d.'})
+
+
+class KeysetApiViewTest(ApiTestMixin):
+    def test_keyset(self):
+        WHOIS.get_keyset_by_handle.return_value = self._get_keyset()
+        WHOIS.get_keyset_status_descriptions.return_value = self._get_keyset_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+        response, data = self._get_json('webwhois:api_keyset', 'KEYSID-1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['dns_keys'], [{'flags': 257, 'protocol': 3, 'alg': 5,
+                                             'public_key': 'AwEAAddt2AkLfYGKgiEZB5SmIF8EvrjxNMH6HtxWEA4RJ9Ao6LCWheg8'}])
+        self.assertEqual(data['tech_contacts'], [{'handle': 'KONTAKT', 'organization': 'Company L.t.d.'}])
+
+
+class DomainApiViewTest(ApiTestMixin):
+    def setUp(self):
+        super().setUp()
+        WHOIS.get_managed_zone_list.return_value = ['cz']
+
+    def test_domain(self):
+        WHOIS.get_domain_by_handle.return_value = self._get_domain()
+        WHOIS.get_domain_status_descriptions.return_value = self._get_domain_status()
+        WHOIS.get_nsset_by_handle.return_value = self._get_nsset()
+        WHOIS.get_nsset_status_descriptions.return_value = self._get_nsset_status()
+        WHOIS.get_keyset_by_handle.return_value = self._get_keyset()
+        WHOIS.get_keyset_status_descriptions.return_value = self._get_keyset_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+        response, data = self._get_json('webwhois:api_domain', 'fred.cz')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['handle'], 'fred.cz')
+        self.assertEqual(data['expire'], '2018-12-09')
+        self.assertEqual(data['registrant'], {'handle': 'KONTAKT', 'organization': 'Company L.t.d.'})
+        self.assertEqual(data['admins'], [{'handle': 'KONTAKT', 'organization': 'Company L.t.d.'}])
+        self.assertTrue(data['dnssec'])
+        self.assertEqual(data['nsset']['handle'], 'NSSET-1')
+        self.assertEqual(data['keyset']['handle'], 'KEYSID-1')
+
+    def test_domain_delete_candidate(self):
+        WHOIS.get_domain_by_handle.side_effect = OBJECT_DELETE_CANDIDATE
+        WHOIS.get_domain_status_descriptions.return_value = self._get_domain_status()
+
+        response, data = self._get_json('webwhois:api_domain', 'fred.cz')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data, {'handle': 'fred.cz', 'statuses': [STATUS_DELETE_CANDIDATE]})
+
+    def test_domain_not_found(self):
+        WHOIS.get_domain_by_handle.side_effect = OBJECT_NOT_FOUND
+
+        response, data = self._get_json('webwhois:api_domain', 'fred.cz')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(data['error']['code'], 'OBJECT_NOT_FOUND')
+
+
+class RegistrarApiViewTest(ApiTestMixin):
+    def test_registrar(self):
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+        response, data = self._get_json('webwhois:api_registrar', 'REG-FRED_A')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data, {
+            'handle': 'REG-FRED_A', 'name': 'Company A L.t.d.', 'phone': '+420.72645123', 'fax': '+420.72645124',
+            'url': 'www.nic.cz',
+            'address': {'street': ['The street 123'], 'city': 'Prague', 'state_or_province': None,
+                        'postal_code': '12300', 'country_code': 'CZ'}})
+
+
+class BatchApiViewTest(ApiTestMixin):
+    def setUp(self):
+        super().setUp()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+
+    def _post(self, data):
+        return self.client.post(reverse('webwhois:api_batch'), json.dumps(data), content_type='application/json')
+
+    def _get_lines(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        # Lines are sent in the order of completion.
+        return sorted(lines, key=lambda line: line['handle'])
+
+    def test_batch(self):
+        def get_contact(handle):
+            if handle == 'UNKNOWN':
+                raise OBJECT_NOT_FOUND
+            return self._get_contact(handle=handle)
+        WHOIS.get_contact_by_handle.side_effect = get_contact
+
+        response = self._post({'type': 'contact', 'handles': ['KRYTEN', 'UNKNOWN', 'KRYTEN', 'LISTER']})
+
+        lines = self._get_lines(response)
+        self.assertEqual([(line['handle'], line['status']) for line in lines],
+                         [('KRYTEN', 200), ('LISTER', 200), ('UNKNOWN', 404)])
+        self.assertEqual(lines[0]['object']['handle'], 'KRYTEN')
+        self.assertEqual(lines[2]['error']['code'], 'OBJECT_NOT_FOUND')
+        self.assertEqual(WHOIS.get_contact_by_handle.call_count, 3)
+
+    def test_batch_default_type(self):
+        WHOIS.get_managed_zone_list.return_value = ['cz']
+        WHOIS.get_domain_by_handle.side_effect = OBJECT_DELETE_CANDIDATE
+        WHOIS.get_domain_status_descriptions.return_value = self._get_domain_status()
+
+        response = self._post({'handles': ['fred.cz']})
+
+        self.assertEqual(self._get_lines(response), [
+            {'handle': 'fred.cz', 'status': 200,
+             'object': {'handle': 'fred.cz', 'statuses': [STATUS_DELETE_CANDIDATE]}}])
+
+    def test_batch_server_error(self):
+        WHOIS.get_registrar_by_handle.side_effect = RuntimeError
+
+        response = self._post({'type': 'registrar', 'handles': ['REG-FRED_A']})
+
+        self.assertEqual(self._get_lines(response), [
+            {'handle': 'REG-FRED_A', 'status': 500,
+             'error': {'code': 'SERVER_ERROR', 'title': 'Server error', 'message': 'RuntimeError'}}])
+
+    @override_settings(WEBWHOIS_BATCH_MAX_RUNNING=1)
+    def test_batch_max_running(self):
+        response = self._post({'type': 'registrar', 'handles': ['REG-A', 'REG-B', 'REG-C']})
+
+        self.assertEqual([line['status'] for line in self._get_lines(response)], [200, 200, 200])
+        self.assertEqual(WHOIS.get_registrar_by_handle.call_count, 3)
+
+    def test_batch_invalid(self):
+        data = (
+            ['fred.cz'],
+            {'handles': 'fred.cz'},
+            {'handles': [42]},
+            {'type': 'unknown', 'handles': ['fred.cz']},
+        )
+        for item in data:
+            with self.subTest(data=item):
+                response = self._post(item)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(json.loads(response.content)['error']['code'], 'INVALID_REQUEST')
+        self.assertEqual(WHOIS.mock_calls, [])
+
+    def test_batch_invalid_json(self):
+        response = self.client.post(reverse('webwhois:api_batch'), 'invalid', content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content)['error']['code'], 'INVALID_REQUEST')
+
+    @override_settings(WEBWHOIS_BATCH_MAX_SIZE=2)
+    def test_batch_too_large(self):
+        response = self._post({'handles': ['a.cz', 'b.cz', 'c.cz']})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content)['error']['message'], 'At most 2 handles are allowed.')
+        self.assertEqual(WHOIS.mock_calls, [])
+
+    def test_get_not_allowed(self):
+        self.assertEqual(self.client.get(reverse('webwhois:api_batch')).status_code, 405)
+
+
+class DumpsTest(SimpleTestCase):
+    def test_dumps(self):
+        data = {'date': date(2020, 1, 1), 'datetime': datetime(2020, 1, 1, 12, tzinfo=timezone.utc), 'list': [1]}
+        self.assertEqual(json.loads(dumps(data)),
+                         {'date': '2020-01-01', 'datetime': '2020-01-01T12:00:00Z', 'list': [1]})
+
+    def test_json_dumps(self):
+        data = {'datetime': datetime(2020, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc), 'name': 'Kryten Ž'}
+        self.assertEqual(_json_dumps(data), '{"datetime":"2020-01-01T12:00:00.123Z","name":"Kryten Ž"}'.encode())
+
+    def test_orjson_dumps(self):
+        data = {'date': date(2020, 1, 1), 'datetime': datetime(2020, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc),
+                'naive': datetime(2020, 1, 1, 12), 'name': 'Kryten Ž', 'label': gettext_lazy('Contact'),
+                'list': [1, 2.5, None, True]}
+        self.assertEqual(_orjson_dumps(data), _json_dumps(data))
+
+
+class EncodersTest(ApiTestMixin):
+    """Test both JSON encoders produce the same output for the API responses."""
+
+    def setUp(self):
+        super().setUp()
+        WHOIS.get_managed_zone_list.return_value = ['cz']
+        WHOIS.get_domain_by_handle.return_value = self._get_domain()
+        WHOIS.get_domain_status_descriptions.return_value = self._get_domain_status()
+        WHOIS.get_nsset_by_handle.return_value = self._get_nsset()
+        WHOIS.get_nsset_status_descriptions.return_value = self._get_nsset_status()
+        WHOIS.get_keyset_by_handle.return_value = self._get_keyset()
+        WHOIS.get_keyset_status_descriptions.return_value = self._get_keyset_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+    def _test_encoders(self, url_name: str, handle: str) -> None:
+        with patch('webwhois.views.api.dumps', side_effect=_json_dumps) as dumps_mock:
+            response = self.client.get(reverse(url_name, kwargs={'handle': handle}))
+
+        self.assertEqual(response.status_code, 200)
+        data = dumps_mock.call_args[0][0]
+        self.assertEqual(_orjson_dumps(data), _json_dumps(data))
+        self.assertEqual(_orjson_dumps(data), response.content)
+
+    def test_domain(self):
+        self._test_encoders('webwhois:api_domain', 'fred.cz')
+
+    def test_contact(self):
+        self._test_encoders('webwhois:api_contact', 'KONTAKT')
+
+    def test_registrar(self):
+        self._test_encoders('webwhois:api_registrar', 'REG-FRED_A')
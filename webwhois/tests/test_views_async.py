@@ -0,0 +1,219 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+import threading
+from unittest.mock import call, patch
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import NoReverseMatch, reverse
+from fred_idl.Registry.Whois import OBJECT_NOT_FOUND, UNMANAGED_ZONE
+from grill.utils import TestLogEntry, TestLoggerClient
+
+from webwhois.constants import LOGGER_SERVICE, LogEntryType, LogResult
+from webwhois.context_processors import _get_managed_zones
+from webwhois.tests.get_registry_objects import GetRegistryObjectMixin
+from webwhois.utils import WHOIS
+
+from .utils import TEMPLATES, apply_patch, make_registrar
+
+
+@override_settings(ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES, LANGUAGE_CODE='en',
+                   CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class AsyncDetailViewTest(GetRegistryObjectMixin, SimpleTestCase):
+    def setUp(self):
+        spec = ('get_contact_by_handle', 'get_contact_status_descriptions',
+                'get_domain_by_handle', 'get_domain_status_descriptions',
+                'get_keyset_by_handle', 'get_keyset_status_descriptions', 'get_managed_zone_list',
+                'get_nsset_by_handle', 'get_nsset_status_descriptions', 'get_registrar_by_handle')
+        apply_patch(self, patch.object(WHOIS, 'client', spec=spec))
+        WHOIS.get_managed_zone_list.return_value = []
+        _get_managed_zones.cache_clear()
+
+        self.test_logger = TestLoggerClient()
+        apply_patch(self, patch('webwhois.utils.corba_wrapper.LOGGER.client', new=self.test_logger))
+
+    async def test_contact(self):
+        WHOIS.get_contact_status_descriptions.return_value = self._get_contact_status()
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+        response = await self.async_client.get(reverse('webwhois_async:detail_contact', kwargs={'handle': 'KONTAKT'}))
+
+        self.assertContains(response, "Contact details")
+        self.assertEqual(response.context['registry_objects']['contact']['creating_registrar'],
+                         self._get_registrar())
+        self.assertEqual(WHOIS.mock_calls[0], call.get_contact_by_handle('KONTAKT'))
+        self.assertCountEqual(WHOIS.mock_calls[1:], [
+            call.get_contact_status_descriptions('en'),
+            call.get_registrar_by_handle('REG-FRED_A'),
+            call.get_registrar_by_handle('REG-FRED_A'),
+        ])
+        log_entry = TestLogEntry(LOGGER_SERVICE, LogEntryType.INFO, LogResult.SUCCESS, source_ip='127.0.0.1',
+                                 input_properties={'handle': 'KONTAKT', 'handleType': 'contact'},
+                                 properties={'foundType': ['contact']})
+        self.assertEqual(self.test_logger.mock.mock_calls, log_entry.get_calls())
+
+    async def test_contact_not_found(self):
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+
+        response = await self.async_client.get(reverse('webwhois_async:detail_contact', kwargs={'handle': 'KONTAKT'}))
+
+        self.assertContains(response, "Contact not found")
+        self.assertEqual(WHOIS.mock_calls, [call.get_contact_by_handle('KONTAKT')])
+        log_entry = TestLogEntry(LOGGER_SERVICE, LogEntryType.INFO, LogResult.NOT_FOUND, source_ip='127.0.0.1',
+                                 input_properties={'handle': 'KONTAKT', 'handleType': 'contact'})
+        self.assertEqual(self.test_logger.mock.mock_calls, log_entry.get_calls())
+
+    async def test_domain(self):
+        WHOIS.get_contact_by_handle.return_value = self._get_contact()
+        WHOIS.get_nsset_status_descriptions.return_value = self._get_nsset_status()
+        WHOIS.get_nsset_by_handle.return_value = self._get_nsset()
+        WHOIS.get_keyset_status_descriptions.return_value = self._get_keyset_status()
+        WHOIS.get_keyset_by_handle.return_value = self._get_keyset()
+        WHOIS.get_domain_status_descriptions.return_value = self._get_domain_status()
+        WHOIS.get_domain_by_handle.return_value = self._get_domain()
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+        response = await self.async_client.get(reverse('webwhois_async:detail_domain', kwargs={'handle': 'fred.cz'}))
+
+        self.assertContains(response, "Domain name details")
+        data = response.context['registry_objects']['domain']
+        self.assertEqual(data['registrant'], self._get_contact())
+        self.assertEqual(data['admins'], [self._get_contact()])
+        self.assertEqual(data['nsset']['detail'], self._get_nsset())
+        self.assertEqual(data['nsset']['admins'], [self._get_contact()])
+        self.assertEqual(data['keyset']['registrar'], self._get_registrar())
+        self.assertEqual(WHOIS.mock_calls[0], call.get_domain_by_handle('fred.cz'))
+        self.assertCountEqual(WHOIS.mock_calls[1:], [
+            call.get_domain_status_descriptions('en'),
+            call.get_contact_by_handle('KONTAKT'),
+            call.get_registrar_by_handle('REG-FRED_A'),
+            call.get_contact_by_handle('KONTAKT'),
+            call.get_nsset_by_handle('NSSET-1'),
+            call.get_nsset_status_descriptions('en'),
+            call.get_contact_by_handle('KONTAKT'),
+            call.get_registrar_by_handle('REG-FRED_A'),
+            call.get_keyset_by_handle('KEYSID-1'),
+            call.get_keyset_status_descriptions('en'),
+            call.get_contact_by_handle('KONTAKT'),
+            call.get_registrar_by_handle('REG-FRED_A'),
+        ])
+
+    def _record_managed_zones_thread(self):
+        """Record threads in which managed zones are loaded."""
+        threads = []
+
+        def get_managed_zone_list():
+            threads.append(threading.current_thread())
+            return []
+        WHOIS.get_managed_zone_list.side_effect = get_managed_zone_list
+        return threads
+
+    async def test_domain_unmanaged_zone(self):
+        threads = self._record_managed_zones_thread()
+        WHOIS.get_domain_by_handle.side_effect = UNMANAGED_ZONE
+
+        response = await self.async_client.get(reverse('webwhois_async:detail_domain', kwargs={'handle': 'fred.com'}))
+
+        self.assertContains(response, 'Unmanaged zone')
+        self.assertEqual(WHOIS.mock_calls, [call.get_domain_by_handle('fred.com'), call.get_managed_zone_list()])
+        # Backend isn't called in the thread of the event loop.
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    async def test_resolve_not_found(self):
+        threads = self._record_managed_zones_thread()
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_nsset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_keyset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_registrar_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_domain_by_handle.side_effect = OBJECT_NOT_FOUND
+
+        response = await self.async_client.get(
+            reverse('webwhois_async:registry_object_type', kwargs={'handle': 'testhandle'}))
+
+        self.assertContains(response, "Record not found")
+        self.assertCountEqual(WHOIS.mock_calls, [
+            call.get_contact_by_handle('testhandle'),
+            call.get_nsset_by_handle('testhandle'),
+            call.get_keyset_by_handle('testhandle'),
+            call.get_registrar_by_handle('testhandle'),
+            call.get_domain_by_handle('testhandle'),
+            call.get_managed_zone_list(),
+        ])
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    async def test_resolve_redirect(self):
+        WHOIS.get_contact_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_nsset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_keyset_by_handle.side_effect = OBJECT_NOT_FOUND
+        WHOIS.get_registrar_by_handle.return_value = self._get_registrar()
+
+        response = await self.async_client.get(
+            reverse('webwhois_async:registry_object_type', kwargs={'handle': '.REG-FRED_A'}))
+
+        self.assertRedirects(response, reverse('webwhois_async:detail_registrar', kwargs={'handle': '.REG-FRED_A'}),
+                             fetch_redirect_response=False)
+        # Domain isn't looked up for handles starting with a dot.
+        self.assertCountEqual(WHOIS.mock_calls, [
+            call.get_contact_by_handle('.REG-FRED_A'),
+            call.get_nsset_by_handle('.REG-FRED_A'),
+            call.get_keyset_by_handle('.REG-FRED_A'),
+            call.get_registrar_by_handle('.REG-FRED_A'),
+        ])
+
+    async def test_options(self):
+        response = await self.async_client.options(
+            reverse('webwhois_async:detail_contact', kwargs={'handle': 'KONTAKT'}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(WHOIS.mock_calls, [])
+
+
+@override_settings(ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES)
+class AsyncRegistrarListViewTest(SimpleTestCase):
+    def setUp(self):
+        spec = ('get_registrar_certification_list', 'get_registrar_groups', 'get_registrars')
+        apply_patch(self, patch.object(WHOIS, 'client', spec=spec))
+
+    async def test_registrars(self):
+        registrar = make_registrar()
+        WHOIS.get_registrars.return_value = [registrar]
+        WHOIS.get_registrar_groups.return_value = []
+        WHOIS.get_registrar_certification_list.return_value = []
+
+        response = await self.async_client.get(reverse('webwhois_async:registrars'))
+
+        self.assertContains(response, "List of registrars")
+        self.assertEqual(len(response.context['registrars']), 1)
+        self.assertEqual(response.context['registrars'][0]['registrar'], registrar)
+        self.assertCountEqual(WHOIS.mock_calls,
+                              [call.get_registrars(), call.get_registrar_certification_list(),
+                               call.get_registrar_groups()])
+
+
+@override_settings(ROOT_URLCONF='webwhois.tests.urls')
+class AsyncUrlsTest(SimpleTestCase):
+    def test_batch_excluded(self):
+        with self.assertRaises(NoReverseMatch):
+            reverse('webwhois_async:api_batch')
+
+    def test_scan_results_export_excluded(self):
+        with self.assertRaises(NoReverseMatch):
+            reverse('webwhois_async:scan_results_export', kwargs={'handle': 'example.org', 'format': 'csv'})
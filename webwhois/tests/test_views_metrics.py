@@ -0,0 +1,45 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+
+class MetricsViewTest(SimpleTestCase):
+    @override_settings(WEBWHOIS_METRICS=True)
+    def test_metrics(self):
+        with patch('webwhois.views.metrics.generate_metrics', return_value=(b'metrics', 'text/plain')):
+            response = self.client.get(reverse('webwhois_metrics:metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'metrics')
+        self.assertEqual(response['Content-Type'], 'text/plain')
+
+    def test_disabled(self):
+        response = self.client.get(reverse('webwhois_metrics:metrics'))
+
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(WEBWHOIS_METRICS=True)
+    def test_not_public(self):
+        # Metrics aren't available in webwhois URLs.
+        response = self.client.get('/whois/metrics/')
+
+        self.assertEqual(response.status_code, 404)
@@ -16,10 +16,15 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
+import asyncio
+import json
+from concurrent.futures import Future
 from datetime import datetime
+from typing import Any, Dict, List, Optional
 from unittest import skipIf
-from unittest.mock import call, patch, sentinel
+from unittest.mock import Mock, call, patch, sentinel
 
+from django.core.cache import cache
 from django.test import SimpleTestCase
 from django.test.utils import override_settings
 from django.urls import reverse
@@ -37,8 +42,10 @@ except ImportError:
 
 from webwhois.constants import LOGGER_SERVICE, CdnskeyStatus, DnskeyAlgorithm, DnskeyFlag, LogEntryType, LogResult
 from webwhois.utils import WHOIS
+from webwhois.views.scan_results import (AsyncScanResultsView, CacheableScanResults, NewestScanResults,
+                                         ScanResultsSummary, ScanResultsView)
 
-from .test_utils_cdnskey_client import TestCdnskeyClient
+from .test_utils_cdnskey_client import TestAsyncCdnskeyClient, TestCdnskeyClient
 from .utils import TEMPLATES
 
 
@@ -46,17 +53,16 @@ from .utils import TEMPLATES
 class ScanResultsViewNoBackendTest(SimpleTestCase):
     """Test scan results view without a backend."""
     domain = 'example.org'
+    url_name = 'webwhois:scan_results'
 
     def test_no_backend(self):
         with override_settings(WEBWHOIS_CDNSKEY_NETLOC=None):
-            response = self.client.get(reverse('webwhois:scan_results', kwargs={'handle': self.domain}))
+            response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
 
         self.assertContains(response, 'not found', status_code=404)
 
 
-@override_settings(ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES)
-@skipIf(RawScanResult is None, "Only available with cdnskey_processor_api installed.")
-class ScanResultsViewTest(SimpleTestCase):
+class ScanResultsTestMixin(SimpleTestCase):
     domain = 'example.org'
     worker = 'kryten'
     scan_at = datetime(2020, 3, 2, 13, tzinfo=timezone.utc)
@@ -96,12 +102,18 @@ class ScanResultsViewTest(SimpleTestCase):
         scan_result.cdnskey.public_key.value = self.public_key
         return scan_result
 
+
+@override_settings(ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES)
+@skipIf(RawScanResult is None, "Only available with cdnskey_processor_api installed.")
+class ScanResultsViewTest(ScanResultsTestMixin):
+    url_name = 'webwhois:scan_results_raw'
+
     def test_results(self):
         reply = RawScanResultsReply()
         reply.data.items.append(self._get_scan_result())
         self.cdnskey_client.mock.return_value = [reply]
 
-        response = self.client.get(reverse('webwhois:scan_results', kwargs={'handle': self.domain}))
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
 
         self.assertContains(response, 'Scan results')
         cdnskey = {'flags': self.flags, 'alg': self.alg, 'proto': 0, 'public_key': self.public_key,
@@ -125,7 +137,7 @@ class ScanResultsViewTest(SimpleTestCase):
         reply.data.items.append(self._get_scan_result(scan_at=scan_at_before))
         self.cdnskey_client.mock.return_value = [reply]
 
-        response = self.client.get(reverse('webwhois:scan_results', kwargs={'handle': self.domain}))
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
 
         self.assertContains(response, 'Scan results')
         self.assertEqual(response.context['scan_results'][0]['scan_at'], scan_at_before)
@@ -140,19 +152,88 @@ class ScanResultsViewTest(SimpleTestCase):
         reply.data.items.append(self._get_scan_result())
         self.cdnskey_client.mock.return_value = [reply]
 
-        response = self.client.get(reverse('webwhois:scan_results', kwargs={'handle': self.domain}))
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
 
         self.assertContains(response, 'Scan results')
         self.assertEqual(len(response.context['scan_results']), 1)
         self.assertEqual(response.context['scan_results'][0]['scan_at'], self.scan_at)
 
+    def _test_pages(self, page: str) -> List[datetime]:
+        reply = RawScanResultsReply()
+        for day in (1, 2, 3):
+            reply.data.items.append(self._get_scan_result(scan_at=datetime(2020, 3, day, 13, tzinfo=timezone.utc)))
+        self.cdnskey_client.mock.return_value = [reply]
+
+        with override_settings(WEBWHOIS_SCAN_RESULTS_PAGE_SIZE=2):
+            response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}), {'page': page})
+
+        self.assertContains(response, 'Scan results')
+        self.assertTrue(response.context['is_paginated'])
+        self.assertEqual(response.context['paginator'].count, 3)
+        return [r['scan_at'] for r in response.context['scan_results']]
+
+    def test_results_first_page(self):
+        # The first page contains the newest results.
+        self.assertEqual(self._test_pages('1'), [datetime(2020, 3, 2, 13, tzinfo=timezone.utc),
+                                                 datetime(2020, 3, 3, 13, tzinfo=timezone.utc)])
+
+    def test_results_last_page(self):
+        self.assertEqual(self._test_pages('2'), [datetime(2020, 3, 1, 13, tzinfo=timezone.utc)])
+
+    def test_results_page_out_of_range(self):
+        self.assertEqual(self._test_pages('42'), [datetime(2020, 3, 1, 13, tzinfo=timezone.utc)])
+
+    @override_settings(WEBWHOIS_SCAN_RESULTS_PAGE_SIZE=2, WEBWHOIS_SCAN_RESULTS_MAX_PAGES=1)
+    def test_results_page_over_max(self):
+        reply = RawScanResultsReply()
+        for day in (1, 2, 3):
+            reply.data.items.append(self._get_scan_result(scan_at=datetime(2020, 3, day, 13, tzinfo=timezone.utc)))
+        self.cdnskey_client.mock.return_value = [reply]
+
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}), {'page': '2'})
+
+        self.assertContains(response, 'Scan results')
+        self.assertFalse(response.context['is_paginated'])
+        self.assertEqual(response.context['page_obj'].number, 1)
+        self.assertEqual([r['scan_at'] for r in response.context['scan_results']],
+                         [datetime(2020, 3, 2, 13, tzinfo=timezone.utc), datetime(2020, 3, 3, 13, tzinfo=timezone.utc)])
+
+    def test_results_page_invalid(self):
+        self.assertEqual(self._test_pages('Gazpacho!'), [datetime(2020, 3, 2, 13, tzinfo=timezone.utc),
+                                                         datetime(2020, 3, 3, 13, tzinfo=timezone.utc)])
+
+    def test_results_window(self):
+        reply = RawScanResultsReply()
+        for day in (1, 2, 3, 4):
+            reply.data.items.append(self._get_scan_result(scan_at=datetime(2020, 3, day, 13, tzinfo=timezone.utc)))
+        self.cdnskey_client.mock.return_value = [reply]
+
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}),
+                                   {'since': '2020-03-02', 'until': '2020-03-03'})
+
+        self.assertContains(response, 'Scan results')
+        self.assertEqual([r['scan_at'] for r in response.context['scan_results']],
+                         [datetime(2020, 3, 2, 13, tzinfo=timezone.utc), datetime(2020, 3, 3, 13, tzinfo=timezone.utc)])
+        self.assertFalse(response.context['is_paginated'])
+
+    def test_results_window_invalid(self):
+        reply = RawScanResultsReply()
+        reply.data.items.append(self._get_scan_result())
+        self.cdnskey_client.mock.return_value = [reply]
+
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}), {'since': 'Gazpacho!'})
+
+        self.assertContains(response, 'Scan results')
+        self.assertEqual(len(response.context['scan_results']), 1)
+        self.assertTrue(response.context['form'].errors)
+
     def _test_ignore_whois_error(self, error: CORBA.Exception) -> None:
         WHOIS.get_domain_by_handle.side_effect = error
         reply = RawScanResultsReply()
         reply.data.items.append(self._get_scan_result())
         self.cdnskey_client.mock.return_value = [reply]
 
-        response = self.client.get(reverse('webwhois:scan_results', kwargs={'handle': self.domain}))
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
 
         self.assertContains(response, 'Scan results')
         self.assertTrue(response.context['scan_results'])
@@ -171,7 +252,7 @@ class ScanResultsViewTest(SimpleTestCase):
         reply.data.items.append(self._get_scan_result())
         self.cdnskey_client.mock.return_value = [reply]
 
-        response = self.client.get(reverse('webwhois:scan_results', kwargs={'handle': '...example.org'}))
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': '...example.org'}))
 
         self.assertContains(response, 'Scan results')
         self.assertTrue(response.context['scan_results'])
@@ -181,7 +262,7 @@ class ScanResultsViewTest(SimpleTestCase):
         reply.data.items.extend([])
         self.cdnskey_client.mock.return_value = [reply]
 
-        response = self.client.get(reverse('webwhois:scan_results', kwargs={'handle': self.domain}))
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
 
         self.assertContains(response, 'Scan results')
         self.assertEqual(response.context['scan_results'], [])
@@ -190,7 +271,7 @@ class ScanResultsViewTest(SimpleTestCase):
         error = _Rendezvous(_RPCState((), '', '', StatusCode.NOT_FOUND, ""), None, None, None)
         self.cdnskey_client.mock.side_effect = error
 
-        response = self.client.get(reverse('webwhois:scan_results', kwargs={'handle': self.domain}))
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
 
         self.assertContains(response, 'not found', status_code=404)
 
@@ -198,3 +279,428 @@ class ScanResultsViewTest(SimpleTestCase):
         log_entry = TestLogEntry(LOGGER_SERVICE, LogEntryType.SCAN_RESULTS, LogResult.NOT_FOUND, source_ip='127.0.0.1',
                                  input_properties={'domain': self.domain})
         self.assertEqual(self.test_logger.mock.mock_calls, log_entry.get_calls())
+
+    @override_settings(WEBWHOIS_SCAN_RESULTS_CACHE_TIMEOUT=3600)
+    def test_cache(self):
+        old_scan_at = datetime(2019, 3, 1, 13, tzinfo=timezone.utc)
+        reply = RawScanResultsReply()
+        reply.data.items.append(self._get_scan_result())
+        reply.data.items.append(self._get_scan_result(scan_at=old_scan_at))
+        self.cdnskey_client.mock.return_value = [reply]
+        cache.clear()
+        self.addCleanup(cache.clear)
+        uncached = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
+        self.cdnskey_client.mock.reset_mock()
+        WHOIS.client.reset_mock()
+
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
+
+        self.assertContains(response, 'Scan results')
+        # Cached results are already filtered by the domain registration.
+        self.assertEqual([r['scan_at'] for r in response.context['scan_results']], [self.scan_at])
+        self.assertEqual(response.context['scan_results'], uncached.context['scan_results'])
+        # Enums are restored, so their labels are rendered.
+        cdnskey = response.context['scan_results'][0]['cdnskey']
+        self.assertIs(cdnskey['flags'], self.flags)
+        self.assertIs(cdnskey['alg'], self.alg)
+        self.assertIsInstance(cdnskey['status'], CdnskeyStatus)
+        self.assertContains(response, self.alg.label)
+        self.assertEqual(self.cdnskey_client.mock.mock_calls, [])
+        self.assertEqual(WHOIS.mock_calls, [])
+
+    @override_settings(WEBWHOIS_SCAN_RESULTS_CACHE_TIMEOUT=3600)
+    def test_cache_window(self):
+        # Cached results can be filtered by other windows.
+        reply = RawScanResultsReply()
+        for day in (1, 2, 3):
+            reply.data.items.append(self._get_scan_result(scan_at=datetime(2020, 3, day, 13, tzinfo=timezone.utc)))
+        self.cdnskey_client.mock.return_value = [reply]
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}), {'until': '2020-03-01'})
+        self.cdnskey_client.mock.reset_mock()
+
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}), {'since': '2020-03-02'})
+
+        self.assertEqual([r['scan_at'].day for r in response.context['scan_results']], [2, 3])
+        self.assertEqual(self.cdnskey_client.mock.mock_calls, [])
+
+    @override_settings(WEBWHOIS_SCAN_RESULTS_CACHE_TIMEOUT=3600, WEBWHOIS_SCAN_RESULTS_CACHE_MAX_SIZE=1)
+    def test_cache_too_large(self):
+        reply = RawScanResultsReply()
+        reply.data.items.append(self._get_scan_result())
+        reply.data.items.append(self._get_scan_result())
+        self.cdnskey_client.mock.return_value = [reply]
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
+
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
+
+        self.assertEqual(len(response.context['scan_results']), 2)
+        self.assertEqual(len(self.cdnskey_client.mock.mock_calls), 2)
+
+    @override_settings(WEBWHOIS_SCAN_RESULTS_CACHE_TIMEOUT=3600)
+    def test_cache_not_found(self):
+        error = _Rendezvous(_RPCState((), '', '', StatusCode.NOT_FOUND, ""), None, None, None)
+        self.cdnskey_client.mock.side_effect = error
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
+
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
+
+        self.assertContains(response, 'not found', status_code=404)
+        self.assertEqual(len(self.cdnskey_client.mock.mock_calls), 1)
+
+    def test_cache_disabled(self):
+        reply = RawScanResultsReply()
+        reply.data.items.append(self._get_scan_result())
+        self.cdnskey_client.mock.return_value = [reply]
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
+
+        self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
+
+        self.assertEqual(len(self.cdnskey_client.mock.mock_calls), 2)
+
+
+class AsyncScanResultsViewNoBackendTest(ScanResultsViewNoBackendTest):
+    """Test asynchronous scan results view without a backend."""
+    url_name = 'webwhois_async:scan_results'
+
+
+class AsyncScanResultsTestMixin(ScanResultsTestMixin):
+    def setUp(self):
+        super().setUp()
+        client = TestAsyncCdnskeyClient(sentinel.netloc)
+        # Share the mock with the synchronous client, so the tests can set it up.
+        client.mock = self.cdnskey_client.mock
+        patcher = patch('webwhois.views.scan_results.get_async_cdnskey_client', return_value=client, autospec=True)
+        self.addCleanup(patcher.stop)
+        self.get_cdnskey_client_mock = patcher.start()
+
+
+class AsyncScanResultsViewTest(AsyncScanResultsTestMixin, ScanResultsViewTest):
+    url_name = 'webwhois_async:scan_results_raw'
+
+
+@override_settings(ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES)
+@skipIf(RawScanResult is None, "Only available with cdnskey_processor_api installed.")
+class ScanResultsSummaryViewTest(ScanResultsTestMixin):
+    url_name = 'webwhois:scan_results'
+
+    def test_summary(self):
+        scan_at_after = datetime(2020, 3, 3, 13, tzinfo=timezone.utc)
+        other = self._get_scan_result()
+        other.nameserver.value = 'example.com'
+        reply = RawScanResultsReply()
+        reply.data.items.append(self._get_scan_result(scan_at=scan_at_after))
+        reply.data.items.append(self._get_scan_result())
+        reply.data.items.append(other)
+        self.cdnskey_client.mock.return_value = [reply]
+
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
+
+        self.assertContains(response, 'Scan results')
+        self.assertContains(response, reverse(self.url_name + '_raw', kwargs={'handle': self.domain}))
+        self.assertEqual([(r['nameserver'], r['scan_at']) for r in response.context['scan_results']],
+                         [('example.com', self.scan_at), (self.nameserver, scan_at_after)])
+        self.assertEqual(response.context['status_counts'], [(CdnskeyStatus.INSECURE_KEY, 3)])
+        self.assertEqual(response.context['scan_results_count'], 3)
+        log_entry = TestLogEntry(LOGGER_SERVICE, LogEntryType.SCAN_RESULTS, LogResult.SUCCESS, source_ip='127.0.0.1',
+                                 input_properties={'domain': self.domain})
+        self.assertEqual(self.test_logger.mock.mock_calls, log_entry.get_calls())
+
+    def test_summary_truncated(self):
+        # Test results are truncated to a time of the domain registration.
+        reply = RawScanResultsReply()
+        reply.data.items.append(self._get_scan_result(scan_at=datetime(2019, 3, 1, 13, tzinfo=timezone.utc)))
+        self.cdnskey_client.mock.return_value = [reply]
+
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
+
+        self.assertEqual(response.context['scan_results'], [])
+        self.assertEqual(response.context['status_counts'], [])
+
+    def test_not_found(self):
+        error = _Rendezvous(_RPCState((), '', '', StatusCode.NOT_FOUND, ""), None, None, None)
+        self.cdnskey_client.mock.side_effect = error
+
+        response = self.client.get(reverse(self.url_name, kwargs={'handle': self.domain}))
+
+        self.assertContains(response, 'not found', status_code=404)
+
+
+@override_settings(ROOT_URLCONF='webwhois.tests.urls', TEMPLATES=TEMPLATES)
+@skipIf(RawScanResult is None, "Only available with cdnskey_processor_api installed.")
+class ScanResultsExportViewTest(ScanResultsTestMixin):
+    url_name = 'webwhois:scan_results_export'
+
+    def _get(self, export_format: str):
+        return self.client.get(reverse(self.url_name, kwargs={'handle': self.domain, 'format': export_format}))
+
+    def test_ndjson(self):
+        reply = RawScanResultsReply()
+        reply.data.items.append(self._get_scan_result())
+        self.cdnskey_client.mock.return_value = [reply]
+
+        response = self._get('ndjson')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertTrue(response.streaming)
+        lines = response.getvalue().decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [{
+            'scan_at': '2020-03-02T13:00:00Z', 'worker_name': self.worker, 'nameserver': self.nameserver,
+            'nameserver_ip': self.ip_address, 'status': 'INSECURE_KEY', 'flags': 256, 'alg': 1, 'proto': 0,
+            'public_key': self.public_key}])
+        log_entry = TestLogEntry(LOGGER_SERVICE, LogEntryType.SCAN_RESULTS, LogResult.SUCCESS, source_ip='127.0.0.1',
+                                 input_properties={'domain': self.domain})
+        self.assertEqual(self.test_logger.mock.mock_calls, log_entry.get_calls())
+
+    def test_csv(self):
+        reply = RawScanResultsReply()
+        reply.data.items.append(self._get_scan_result())
+        self.cdnskey_client.mock.return_value = [reply]
+
+        response = self._get('csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response.getvalue().decode(), (
+            'scan_at,worker_name,nameserver,nameserver_ip,status,flags,alg,proto,public_key\r\n'
+            '2020-03-02T13:00:00+00:00,kryten,example.net,256.0.0.1,INSECURE_KEY,256,1,0,Quagaars!\r\n'))
+
+    def test_truncated(self):
+        # Test results are truncated to a time of the domain registration.
+        reply = RawScanResultsReply()
+        reply.data.items.append(self._get_scan_result(scan_at=datetime(2019, 3, 1, 13, tzinfo=timezone.utc)))
+        self.cdnskey_client.mock.return_value = [reply]
+
+        response = self._get('ndjson')
+
+        self.assertEqual(response.getvalue(), b'')
+
+    def test_not_found(self):
+        error = _Rendezvous(_RPCState((), '', '', StatusCode.NOT_FOUND, ""), None, None, None)
+        self.cdnskey_client.mock.side_effect = error
+
+        response = self._get('csv')
+
+        self.assertContains(response, 'not found', status_code=404)
+        log_entry = TestLogEntry(LOGGER_SERVICE, LogEntryType.SCAN_RESULTS, LogResult.NOT_FOUND, source_ip='127.0.0.1',
+                                 input_properties={'domain': self.domain})
+        self.assertEqual(self.test_logger.mock.mock_calls, log_entry.get_calls())
+
+    def test_unknown_format(self):
+        response = self._get('xml')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.cdnskey_client.mock.mock_calls, [])
+
+
+class AsyncScanResultsSummaryViewTest(AsyncScanResultsTestMixin, ScanResultsSummaryViewTest):
+    url_name = 'webwhois_async:scan_results'
+
+
+class FilterRegisteredTest(SimpleTestCase):
+    registered = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    old = {'scan_at': datetime(2019, 1, 1, tzinfo=timezone.utc)}
+    new = {'scan_at': datetime(2021, 1, 1, tzinfo=timezone.utc)}
+
+    def test_registered_known(self):
+        future = Future()  # type: Future
+        future.set_result(self.registered)
+        self.assertEqual(list(ScanResultsView.filter_registered([self.old, self.new], future)), [self.new])
+
+    def test_registered_unknown(self):
+        future = Future()  # type: Future
+        future.set_result(None)
+        self.assertEqual(list(ScanResultsView.filter_registered([self.old, self.new], future)), [self.old, self.new])
+
+    def test_registered_later(self):
+        # Results are buffered until the registration is known.
+        future = Future()  # type: Future
+
+        def stream():
+            yield self.old
+            yield self.new
+            future.set_result(self.registered)
+            yield self.old
+            yield self.new
+
+        self.assertEqual(list(ScanResultsView.filter_registered(stream(), future)), [self.new, self.new])
+
+    def test_buffer_full(self):
+        # Registration is awaited, if the buffer is full.
+        future = Mock(spec=Future)
+        future.done.return_value = False
+        future.result.return_value = self.registered
+        consumed = []
+
+        def stream():
+            for scan_result in (self.old, self.new, self.old, self.new):
+                consumed.append(scan_result)
+                yield scan_result
+
+        with patch.object(ScanResultsView, 'registered_buffer_size', 2):
+            results = ScanResultsView.filter_registered(stream(), future)
+            self.assertEqual(next(results), self.new)
+
+        self.assertEqual(consumed, [self.old, self.new])
+        self.assertEqual(list(results), [self.new])
+
+
+class AsyncFilterRegisteredTest(SimpleTestCase):
+    registered = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    old = {'scan_at': datetime(2019, 1, 1, tzinfo=timezone.utc)}
+    new = {'scan_at': datetime(2021, 1, 1, tzinfo=timezone.utc)}
+
+    async def _stream(self, future):
+        yield self.old
+        yield self.new
+        future.set_result(self.registered)
+        yield self.old
+        yield self.new
+
+    async def test_registered_later(self):
+        future = asyncio.get_running_loop().create_future()
+
+        results = [r async for r in AsyncScanResultsView.afilter_registered(self._stream(future), future)]
+
+        self.assertEqual(results, [self.new, self.new])
+
+    async def test_buffer_full(self):
+        # Registration is awaited, if the buffer is full.
+        future = asyncio.get_running_loop().create_future()
+        asyncio.get_running_loop().call_soon(future.set_result, self.registered)
+        done = []
+
+        async def stream():
+            for scan_result in (self.old, self.new, self.old, self.new):
+                done.append(future.done())
+                yield scan_result
+
+        with patch.object(AsyncScanResultsView, 'registered_buffer_size', 2):
+            results = [r async for r in AsyncScanResultsView.afilter_registered(stream(), future)]
+
+        self.assertEqual(results, [self.new, self.new])
+        self.assertEqual(done, [False, False, True, True])
+
+    async def test_registered_unknown(self):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+
+        async def stream():
+            yield self.old
+
+        self.assertEqual([r async for r in AsyncScanResultsView.afilter_registered(stream(), future)], [self.old])
+
+    async def test_stream_error(self):
+        # Lookup is cancelled if the stream fails.
+        future = asyncio.get_running_loop().create_future()
+
+        async def stream():
+            yield self.old
+            raise ValueError('Gazpacho!')
+
+        with self.assertRaises(ValueError):
+            [r async for r in AsyncScanResultsView.afilter_registered(stream(), future)]
+        self.assertTrue(future.cancelled())
+
+
+class CacheTimeoutTest(SimpleTestCase):
+    @override_settings(WEBWHOIS_SCAN_RESULTS_CACHE_TIMEOUT=3600)
+    def test_aligned(self):
+        now = datetime(2020, 3, 1, 13, 45, tzinfo=timezone.utc)
+        with patch('webwhois.views.scan_results.timezone.now', return_value=now):
+            self.assertEqual(ScanResultsView.get_cache_timeout(), 15 * 60)
+
+    @override_settings(WEBWHOIS_SCAN_RESULTS_CACHE_TIMEOUT=3600)
+    def test_period_start(self):
+        now = datetime(2020, 3, 1, 13, tzinfo=timezone.utc)
+        with patch('webwhois.views.scan_results.timezone.now', return_value=now):
+            self.assertEqual(ScanResultsView.get_cache_timeout(), 3600)
+
+
+class CacheableScanResultsTest(SimpleTestCase):
+    def test_results(self):
+        cacheable = CacheableScanResults(2)
+        cacheable.add(sentinel.first)
+        cacheable.add(sentinel.second)
+        self.assertEqual(cacheable.results, [sentinel.first, sentinel.second])
+
+    def test_too_large(self):
+        cacheable = CacheableScanResults(1)
+        cacheable.add(sentinel.first)
+        cacheable.add(sentinel.second)
+        cacheable.add(sentinel.third)
+        self.assertIsNone(cacheable.results)
+
+
+class ScanResultsSummaryTest(SimpleTestCase):
+    def _make_result(self, day: int, nameserver: Optional[str] = 'example.net',
+                     status: CdnskeyStatus = CdnskeyStatus.UNKNOWN) -> Dict[str, Any]:
+        return {'scan_at': datetime(2020, 3, day, tzinfo=timezone.utc), 'nameserver': nameserver,
+                'nameserver_ip': '256.0.0.1', 'cdnskey': {'status': status}}
+
+    def test_empty(self):
+        summary = ScanResultsSummary()
+        self.assertEqual(summary.count, 0)
+        self.assertEqual(summary.get_latest(), [])
+        self.assertEqual(summary.get_status_counts(), [])
+
+    def test_latest(self):
+        summary = ScanResultsSummary()
+        results = [self._make_result(2), self._make_result(3, status=CdnskeyStatus.SECURE_KEY), self._make_result(1),
+                   self._make_result(1, nameserver='example.com')]
+        for result in results:
+            summary.add(result)
+
+        self.assertEqual(summary.count, 4)
+        self.assertEqual(summary.get_latest(), [results[3], results[1]])
+        self.assertEqual(summary.get_status_counts(), [(CdnskeyStatus.UNKNOWN, 3), (CdnskeyStatus.SECURE_KEY, 1)])
+
+    def test_same_scan_at(self):
+        # The later result of the same scan time wins.
+        summary = ScanResultsSummary()
+        results = [self._make_result(1), self._make_result(1)]
+        for result in results:
+            summary.add(result)
+
+        self.assertIs(summary.get_latest()[0], results[1])
+
+    def test_no_nameserver(self):
+        summary = ScanResultsSummary()
+        results = [self._make_result(1, nameserver=None), self._make_result(1)]
+        for result in results:
+            summary.add(result)
+
+        self.assertEqual(summary.get_latest(), results)
+
+
+class NewestScanResultsTest(SimpleTestCase):
+    def test_empty(self):
+        newest = NewestScanResults(2)
+        self.assertEqual(newest.count, 0)
+        self.assertEqual(newest.get_results(), [])
+
+    def test_newest(self):
+        newest = NewestScanResults(2)
+        results = [{'scan_at': datetime(2020, 3, day, tzinfo=timezone.utc)} for day in (3, 1, 4, 2)]
+        for result in results:
+            newest.add(result)
+
+        self.assertEqual(newest.count, 4)
+        self.assertEqual(newest.get_results(), [results[0], results[2]])
+
+    def test_same_scan_at(self):
+        # Results scanned at the same time keep their order.
+        newest = NewestScanResults(3)
+        results = [{'scan_at': datetime(2020, 3, 1, tzinfo=timezone.utc), 'index': index} for index in range(3)]
+        for result in results:
+            newest.add(result)
+
+        self.assertEqual(newest.get_results(), results)
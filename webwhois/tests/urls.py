@@ -25,6 +25,8 @@ from .views import CustomRegistrarListView, GetObjectRegistryView, LoadObjectReg
 
 urlpatterns = [
     path('whois/', include('webwhois.urls', namespace='webwhois')),
+    path('async/whois/', include('webwhois.urls_async', namespace='webwhois_async')),
+    path('internal/', include('webwhois.urls_metrics')),
     # urls required by 404:
     path('', WhoisFormView.as_view(), name='home_page'),
     path('i18n/', include('django.conf.urls.i18n')),
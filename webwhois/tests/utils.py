@@ -17,11 +17,18 @@
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
 import os
+from collections import Counter
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterator, List, Mapping, Union
+from unittest import TestCase
 from unittest.mock import sentinel
 
 from fred_idl.Registry import IsoDateTime
 from fred_idl.Registry.Whois import KeySet, PlaceAddress, Registrar
 
+from webwhois.utils.instrumentation import SPAN_BACKEND, Observer, Span, observe
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -58,6 +65,62 @@ def apply_patch(case, patcher):
     return start()
 
 
+class BackendCallCounter(Observer):
+    """Observer, which records calls of the backends, e.g. `WHOIS.get_domain_by_handle`.
+
+    Calls of the logger aren't recorded, log entries are checked by the tests separately.
+    """
+
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+        self._lock = Lock()
+
+    def span_started(self, span: Span) -> None:
+        if span.kind == SPAN_BACKEND and not span.name.startswith('LOGGER.'):
+            # Backend calls may run in parallel in the threads of the executor.
+            with self._lock:
+                self.calls.append(span.name)
+
+    def get_counts(self) -> Dict[str, int]:
+        """Return numbers of calls by the backend operation."""
+        return dict(Counter(self.calls))
+
+
+@contextmanager
+def count_backend_calls() -> Iterator[BackendCallCounter]:
+    """Count calls of the backends within the block, including calls made by the executor.
+
+    Examples:
+        with count_backend_calls() as counter:
+            self.client.get(url)
+        self.assertEqual(counter.get_counts(), {'WHOIS.get_domain_by_handle': 1})
+
+    """
+    with observe(BackendCallCounter()) as counter:
+        yield counter
+
+
+@contextmanager
+def assert_backend_calls(case: TestCase, expected: Union[int, Mapping[str, int]]) -> Iterator[BackendCallCounter]:
+    """Assert the number of backend calls within the block, similar to `assertNumQueries`.
+
+    Expected is either the total number of calls or the numbers of calls by the backend operation.
+    Streaming responses have to be consumed within the block.
+
+    Examples:
+        with assert_backend_calls(self, {'WHOIS.get_domain_by_handle': 1, 'WHOIS.get_registrar_by_handle': 1}):
+            self.client.get(url)
+
+    """
+    with count_backend_calls() as counter:
+        yield counter
+    msg = 'Backend calls:\n{}'.format('\n'.join(counter.calls) or '(none)')
+    if isinstance(expected, int):
+        case.assertEqual(len(counter.calls), expected, msg=msg)
+    else:
+        case.assertEqual(counter.get_counts(), dict(expected), msg=msg)
+
+
 def make_keyset(statuses=None):
     """Return a key set object."""
     return KeySet(handle=sentinel.handle, dns_keys=[], tech_contact_handles=[], registrar_handle=sentinel.registrar,
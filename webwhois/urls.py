@@ -19,12 +19,13 @@
 from django.urls import path, re_path
 from django.views.i18n import JavaScriptCatalog
 
-from webwhois.views import (BlockObjectFormView, ContactDetailView, CustomEmailView, DomainDetailView,
-                            DownloadEvalFileView, EmailInRegistryView, KeysetDetailView, NotarizedLetterView,
-                            NssetDetailView, PersonalInfoFormView, PublicResponseNotFoundView, PublicResponsePdfView,
-                            PublicResponseView, RegistrarDetailView, RegistrarListView, ResolveHandleTypeView,
-                            ScanResultsView, SendPasswordFormView, ServeNotarizedLetterView, ServeRecordStatementView,
-                            UnblockObjectFormView, WhoisFormView)
+from webwhois.views import (BatchApiView, BlockObjectFormView, ContactApiView, ContactDetailView, CustomEmailView,
+                            DomainApiView, DomainDetailView, DownloadEvalFileView, EmailInRegistryView, KeysetApiView,
+                            KeysetDetailView, NotarizedLetterView, NssetApiView, NssetDetailView, PersonalInfoFormView,
+                            PublicResponseNotFoundView, PublicResponsePdfView, PublicResponseView, RegistrarApiView,
+                            RegistrarDetailView, RegistrarListView, ResolveHandleTypeView, ScanResultsExportView,
+                            ScanResultsSummaryView, ScanResultsView, SendPasswordFormView, ServeNotarizedLetterView,
+                            ServeRecordStatementView, UnblockObjectFormView, WhoisFormView)
 
 app_name = 'webwhois'
 urlpatterns = [
@@ -35,9 +36,17 @@ urlpatterns = [
     path('nsset/<handle>/', NssetDetailView.as_view(), name='detail_nsset'),
     path('keyset/<handle>/', KeysetDetailView.as_view(), name='detail_keyset'),
     path('domain/<handle>/', DomainDetailView.as_view(), name='detail_domain'),
-    path('domain/<handle>/scan-results/', ScanResultsView.as_view(), name='scan_results'),
+    path('domain/<handle>/scan-results/', ScanResultsSummaryView.as_view(), name='scan_results'),
+    path('domain/<handle>/scan-results/raw/', ScanResultsView.as_view(), name='scan_results_raw'),
+    path('domain/<handle>/scan-results/export/<format>/', ScanResultsExportView.as_view(), name='scan_results_export'),
     path('registrar/<handle>/', RegistrarDetailView.as_view(), name='detail_registrar'),
     path('registrars/', RegistrarListView.as_view(), name='registrars'),
+    path('api/contact/<handle>/', ContactApiView.as_view(), name='api_contact'),
+    path('api/nsset/<handle>/', NssetApiView.as_view(), name='api_nsset'),
+    path('api/keyset/<handle>/', KeysetApiView.as_view(), name='api_keyset'),
+    path('api/domain/<handle>/', DomainApiView.as_view(), name='api_domain'),
+    path('api/registrar/<handle>/', RegistrarApiView.as_view(), name='api_registrar'),
+    path('api/batch/', BatchApiView.as_view(), name='api_batch'),
     path('registrar-download-evaluation-file/<handle>/', DownloadEvalFileView.as_view(),
          name='download_evaluation_file'),
     path('send-password/', SendPasswordFormView.as_view(), name='form_send_password'),
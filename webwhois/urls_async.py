@@ -0,0 +1,50 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""URLs of webwhois with asynchronous views, intended for ASGI deployments."""
+from django.urls import path
+
+from webwhois.urls import app_name, urlpatterns as sync_urlpatterns
+from webwhois.views import (AsyncContactDetailView, AsyncDomainDetailView, AsyncKeysetDetailView, AsyncNssetDetailView,
+                            AsyncRegistrarDetailView, AsyncRegistrarListView, AsyncResolveHandleTypeView,
+                            AsyncScanResultsSummaryView, AsyncScanResultsView)
+
+__all__ = ['app_name', 'urlpatterns']
+
+ASYNC_VIEWS = {
+    'registry_object_type': AsyncResolveHandleTypeView,
+    'detail_contact': AsyncContactDetailView,
+    'detail_nsset': AsyncNssetDetailView,
+    'detail_keyset': AsyncKeysetDetailView,
+    'detail_domain': AsyncDomainDetailView,
+    'scan_results': AsyncScanResultsSummaryView,
+    'scan_results_raw': AsyncScanResultsView,
+    'detail_registrar': AsyncRegistrarDetailView,
+    'registrars': AsyncRegistrarListView,
+}
+
+# Views with synchronous streaming responses, which would block the event loop.
+# Django older than 4.2 doesn't support asynchronous iterators in streaming responses.
+EXCLUDED_VIEWS = frozenset({'api_batch', 'scan_results_export'})
+
+# Same URLs as in `webwhois.urls`, only the views are replaced by their asynchronous variants.
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name].as_view(), name=pattern.name)
+    if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns if pattern.name not in EXCLUDED_VIEWS
+]
@@ -0,0 +1,33 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""URLs of webwhois metrics.
+
+Metrics aren't a part of `webwhois.urls`, because they shouldn't be public.
+Include them only into URLs accessible from the monitoring, e.g. on a separate host or port.
+"""
+from django.urls import path
+
+from webwhois.views import MetricsView
+
+__all__ = ['app_name', 'urlpatterns']
+
+app_name = 'webwhois_metrics'
+urlpatterns = [
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+]
@@ -0,0 +1,534 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Whois backends.
+
+Backends provide registry objects to the views.
+All backends return `Registry.Whois` structures and raise `Registry.Whois` exceptions,
+so the views don't depend on the transport used to reach the registry.
+"""
+import hashlib
+from datetime import date, datetime
+from functools import lru_cache, partial
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, cast
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from fred_idl.Registry.Whois import (OBJECT_DELETE_CANDIDATE, OBJECT_NOT_FOUND, Contact, ContactIdentification,
+                                     DisclosableContactIdentification, DisclosablePlaceAddress, DisclosableString,
+                                     DNSKey, Domain, IPAddress, IPv4, IPv6, KeySet, NameServer, NSSet, ObjectStatusDesc,
+                                     PlaceAddress, Registrar, RegistrarCertification, RegistrarGroup)
+from regal.exceptions import ObjectDoesNotExist
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+from ..constants import STATUS_DELETE_CANDIDATE
+from .corba_wrapper import CONTACT_CLIENT, DOMAIN_CLIENT, KEYSET_CLIENT, NSSET_CLIENT, REGISTRAR_CLIENT, WHOIS
+from .object_cache import TwoTierCache, get_object_cache
+from .single_flight import SingleFlight
+
+
+class WhoisBackend:
+    """Base class for whois backends.
+
+    Defines the interface used by the views.
+    Methods return `Registry.Whois` structures decoded by `WebwhoisCorbaRecoder`.
+
+    Raises:
+        OBJECT_NOT_FOUND: If a requested object doesn't exist.
+    """
+
+    def get_contact_by_handle(self, handle: str) -> Contact:
+        """Return a contact."""
+        raise NotImplementedError
+
+    def get_nsset_by_handle(self, handle: str) -> NSSet:
+        """Return a nsset."""
+        raise NotImplementedError
+
+    def get_keyset_by_handle(self, handle: str) -> KeySet:
+        """Return a keyset."""
+        raise NotImplementedError
+
+    def get_registrar_by_handle(self, handle: str) -> Registrar:
+        """Return a registrar."""
+        raise NotImplementedError
+
+    def get_domain_by_handle(self, handle: str) -> Domain:
+        """Return a domain.
+
+        Raises:
+            OBJECT_DELETE_CANDIDATE: If the domain is a delete candidate.
+        """
+        raise NotImplementedError
+
+    def get_contact_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        """Return descriptions of contact statuses."""
+        raise NotImplementedError
+
+    def get_nsset_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        """Return descriptions of nsset statuses."""
+        raise NotImplementedError
+
+    def get_keyset_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        """Return descriptions of keyset statuses."""
+        raise NotImplementedError
+
+    def get_domain_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        """Return descriptions of domain statuses."""
+        raise NotImplementedError
+
+    def get_registrars(self) -> List[Registrar]:
+        """Return all registrars."""
+        raise NotImplementedError
+
+    def get_registrar_groups(self) -> List[RegistrarGroup]:
+        """Return registrar groups."""
+        raise NotImplementedError
+
+    def get_registrar_certification_list(self) -> List[RegistrarCertification]:
+        """Return registrar certifications."""
+        raise NotImplementedError
+
+    def get_managed_zone_list(self) -> List[str]:
+        """Return managed zones."""
+        raise NotImplementedError
+
+
+class CorbaWhoisBackend(WhoisBackend):
+    """Whois backend using the CORBA `Whois` interface."""
+
+    def get_contact_by_handle(self, handle: str) -> Contact:
+        return WHOIS.get_contact_by_handle(handle)
+
+    def get_nsset_by_handle(self, handle: str) -> NSSet:
+        return WHOIS.get_nsset_by_handle(handle)
+
+    def get_keyset_by_handle(self, handle: str) -> KeySet:
+        return WHOIS.get_keyset_by_handle(handle)
+
+    def get_registrar_by_handle(self, handle: str) -> Registrar:
+        return WHOIS.get_registrar_by_handle(handle)
+
+    def get_domain_by_handle(self, handle: str) -> Domain:
+        return WHOIS.get_domain_by_handle(handle)
+
+    def get_contact_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return cast(List[ObjectStatusDesc], WHOIS.get_contact_status_descriptions(lang))
+
+    def get_nsset_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return cast(List[ObjectStatusDesc], WHOIS.get_nsset_status_descriptions(lang))
+
+    def get_keyset_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return cast(List[ObjectStatusDesc], WHOIS.get_keyset_status_descriptions(lang))
+
+    def get_domain_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return cast(List[ObjectStatusDesc], WHOIS.get_domain_status_descriptions(lang))
+
+    def get_registrars(self) -> List[Registrar]:
+        return cast(List[Registrar], WHOIS.get_registrars())
+
+    def get_registrar_groups(self) -> List[RegistrarGroup]:
+        return cast(List[RegistrarGroup], WHOIS.get_registrar_groups())
+
+    def get_registrar_certification_list(self) -> List[RegistrarCertification]:
+        return cast(List[RegistrarCertification], WHOIS.get_registrar_certification_list())
+
+    def get_managed_zone_list(self) -> List[str]:
+        return cast(List[str], WHOIS.get_managed_zone_list())
+
+
+def _decode_datetime(value: Optional[datetime]) -> Optional[datetime]:
+    """Adjust datetime from regal with respect to the timezone settings, same as `WebwhoisCorbaRecoder`."""
+    if value is not None and not settings.USE_TZ:
+        value = timezone.make_naive(value, timezone.get_default_timezone())
+    return value
+
+
+def _decode_date(value: Optional[datetime]) -> Optional[date]:
+    """Return a local date of a datetime from regal."""
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date()
+
+
+def _get_statuses(state: Mapping[str, bool]) -> List[str]:
+    """Return a list of active state flags."""
+    return [flag for flag, active in state.items() if active]
+
+
+def _make_place_address(place: Any) -> PlaceAddress:
+    """Convert regal address into a `PlaceAddress`."""
+    streets = list(place.street) + ['', '', '']
+    return PlaceAddress(street1=streets[0], street2=streets[1], street3=streets[2], city=place.city,
+                        stateorprovince=place.state_or_province or '', postalcode=place.postal_code,
+                        country_code=place.country_code)
+
+
+# Regal identifier types mapped on identification types used by `Registry.Whois`.
+_IDENTIFICATION_TYPES = {
+    'national_identity_number': 'OP',
+    'national_identity_card': 'OP',
+    'passport_number': 'PASS',
+    'company_registration_number': 'ICO',
+    'social_security_number': 'MPSV',
+    'birthdate': 'BIRTHDAY',
+}
+
+
+class RegalWhoisBackend(CorbaWhoisBackend):
+    """Whois backend which looks up registry objects using regal gRPC clients.
+
+    Operations not provided by regal, e.g. status descriptions or registrar groups, are delegated to CORBA.
+    """
+
+    def _make_contact(self, contact: Any, state: Mapping[str, bool]) -> Contact:
+        publish = contact.publish
+
+        def disclosable(key: str, value: Any) -> DisclosableString:
+            return DisclosableString(value=value, disclose=publish.get(key, False))
+
+        identifier = contact.additional_identifier
+        if identifier is None:
+            identification = ContactIdentification(identification_type='', identification_data='')
+        else:
+            identification = ContactIdentification(
+                identification_type=_IDENTIFICATION_TYPES.get(identifier.type, identifier.type),
+                identification_data=identifier.value)
+        if contact.place is None:
+            address = PlaceAddress(street1='', street2='', street3='', city='', stateorprovince='', postalcode='',
+                                   country_code='')
+        else:
+            address = _make_place_address(contact.place)
+        events = contact.events
+        return Contact(
+            handle=contact.contact_handle,
+            organization=disclosable('organization', contact.organization),
+            name=disclosable('name', contact.name),
+            address=DisclosablePlaceAddress(value=address, disclose=publish.get('place', False)),
+            phone=disclosable('telephone', contact.telephone),
+            fax=disclosable('fax', contact.fax),
+            email=disclosable('emails', ', '.join(contact.emails)),
+            notify_email=disclosable('notify_emails', ', '.join(contact.notify_emails)),
+            vat_number=disclosable('vat_identification_number', contact.vat_identification_number),
+            identification=DisclosableContactIdentification(value=identification,
+                                                            disclose=publish.get('additional_identifier', False)),
+            creating_registrar_handle=events.registered.registrar_handle if events.registered else None,
+            sponsoring_registrar_handle=contact.sponsoring_registrar,
+            created=_decode_datetime(events.registered.timestamp if events.registered else None),
+            changed=_decode_datetime(events.updated.timestamp if events.updated else None),
+            last_transfer=_decode_datetime(events.transferred.timestamp if events.transferred else None),
+            statuses=_get_statuses(state),
+        )
+
+    def _get_handles(self, object_ids: Iterable[str]) -> List[str]:
+        return [CONTACT_CLIENT.get_contact_info(i).contact_handle for i in object_ids]
+
+    def get_contact_by_handle(self, handle: str) -> Contact:
+        try:
+            contact_id = CONTACT_CLIENT.get_contact_id(handle)
+            return self._make_contact(CONTACT_CLIENT.get_contact_info(contact_id),
+                                      CONTACT_CLIENT.get_contact_state(contact_id))
+        except ObjectDoesNotExist as error:
+            raise OBJECT_NOT_FOUND() from error
+
+    def _make_ip_address(self, address: str) -> IPAddress:
+        return IPAddress(address=address, version=IPv6 if ':' in address else IPv4)
+
+    def get_nsset_by_handle(self, handle: str) -> NSSet:
+        try:
+            nsset_id = NSSET_CLIENT.get_nsset_id(handle)
+            nsset = NSSET_CLIENT.get_nsset_info(nsset_id)
+            state = NSSET_CLIENT.get_nsset_state(nsset_id)
+            tech_contact_handles = self._get_handles(nsset.technical_contacts)
+        except ObjectDoesNotExist as error:
+            raise OBJECT_NOT_FOUND() from error
+        events = nsset.events
+        return NSSet(
+            handle=nsset.nsset_handle,
+            nservers=[NameServer(fqdn=host.fqdn, ip_addresses=[self._make_ip_address(i) for i in host.ip_addresses])
+                      for host in nsset.dns_hosts],
+            tech_contact_handles=tech_contact_handles,
+            registrar_handle=nsset.sponsoring_registrar,
+            created=_decode_datetime(events.registered.timestamp if events.registered else None),
+            changed=_decode_datetime(events.updated.timestamp if events.updated else None),
+            last_transfer=_decode_datetime(events.transferred.timestamp if events.transferred else None),
+            statuses=_get_statuses(state),
+        )
+
+    def get_keyset_by_handle(self, handle: str) -> KeySet:
+        try:
+            keyset_id = KEYSET_CLIENT.get_keyset_id(handle)
+            keyset = KEYSET_CLIENT.get_keyset_info(keyset_id)
+            state = KEYSET_CLIENT.get_keyset_state(keyset_id)
+            tech_contact_handles = self._get_handles(keyset.technical_contacts)
+        except ObjectDoesNotExist as error:
+            raise OBJECT_NOT_FOUND() from error
+        events = keyset.events
+        return KeySet(
+            handle=keyset.keyset_handle,
+            dns_keys=[DNSKey(flags=k.flags, protocol=k.protocol, alg=k.alg, public_key=k.key)
+                      for k in keyset.dns_keys],
+            tech_contact_handles=tech_contact_handles,
+            registrar_handle=keyset.sponsoring_registrar,
+            created=_decode_datetime(events.registered.timestamp if events.registered else None),
+            changed=_decode_datetime(events.updated.timestamp if events.updated else None),
+            last_transfer=_decode_datetime(events.transferred.timestamp if events.transferred else None),
+            statuses=_get_statuses(state),
+        )
+
+    def get_registrar_by_handle(self, handle: str) -> Registrar:
+        try:
+            registrar = REGISTRAR_CLIENT.get_registrar_info(handle)
+        except ObjectDoesNotExist as error:
+            raise OBJECT_NOT_FOUND() from error
+        return Registrar(handle=registrar.registrar_handle, name=registrar.name,
+                         organization=registrar.organization, url=registrar.url, phone=registrar.telephone,
+                         fax=registrar.fax, address=_make_place_address(registrar.place))
+
+    def get_domain_by_handle(self, handle: str) -> Domain:
+        try:
+            domain_id = DOMAIN_CLIENT.get_domain_id(handle)
+            domain = DOMAIN_CLIENT.get_domain_info(domain_id)
+            statuses = _get_statuses(DOMAIN_CLIENT.get_domain_state(domain_id))
+            if STATUS_DELETE_CANDIDATE in statuses:
+                raise OBJECT_DELETE_CANDIDATE()
+            registrant_handle = CONTACT_CLIENT.get_contact_info(domain.registrant).contact_handle
+            admin_contact_handles = self._get_handles(domain.administrative_contacts)
+            nsset_handle = NSSET_CLIENT.get_nsset_info(domain.nsset).nsset_handle if domain.nsset else None
+            keyset_handle = KEYSET_CLIENT.get_keyset_info(domain.keyset).keyset_handle if domain.keyset else None
+        except ObjectDoesNotExist as error:
+            raise OBJECT_NOT_FOUND() from error
+        events = domain.events
+        # Only ENUM domains are validated.
+        validated_to = getattr(domain, 'validation_expires_at', None)
+        return Domain(
+            handle=domain.fqdn,
+            registrant_handle=registrant_handle,
+            admin_contact_handles=admin_contact_handles,
+            nsset_handle=nsset_handle,
+            keyset_handle=keyset_handle,
+            registrar_handle=domain.sponsoring_registrar,
+            statuses=statuses,
+            registered=_decode_datetime(events.registered.timestamp if events.registered else None),
+            changed=_decode_datetime(events.updated.timestamp if events.updated else None),
+            last_transfer=_decode_datetime(events.transferred.timestamp if events.transferred else None),
+            expire=_decode_date(domain.expires_at),
+            expire_time_estimate=_decode_datetime(domain.expires_at),
+            expire_time_actual=None,
+            validated_to=_decode_date(validated_to),
+            validated_to_time_estimate=_decode_datetime(validated_to),
+            validated_to_time_actual=None,
+        )
+
+
+class MemoryWhoisBackend(WhoisBackend):
+    """Whois backend which serves objects from memory.
+
+    Intended for tests and benchmarks.
+    Objects are stored under their handles, status descriptions are the same for all languages.
+    """
+
+    def __init__(self, *, contacts: Sequence[Contact] = (), nssets: Sequence[NSSet] = (),
+                 keysets: Sequence[KeySet] = (), domains: Sequence[Domain] = (), registrars: Sequence[Registrar] = (),
+                 status_descriptions: Optional[Dict[str, List[ObjectStatusDesc]]] = None,
+                 registrar_groups: Sequence[RegistrarGroup] = (),
+                 registrar_certifications: Sequence[RegistrarCertification] = (),
+                 managed_zones: Sequence[str] = ()):
+        self.contacts = {o.handle: o for o in contacts}
+        self.nssets = {o.handle: o for o in nssets}
+        self.keysets = {o.handle: o for o in keysets}
+        self.domains = {o.handle: o for o in domains}
+        self.registrars = {o.handle: o for o in registrars}
+        self.status_descriptions = status_descriptions or {}
+        self.registrar_groups = list(registrar_groups)
+        self.registrar_certifications = list(registrar_certifications)
+        self.managed_zones = list(managed_zones)
+
+    def _get(self, objects: Dict[str, Any], handle: str) -> Any:
+        try:
+            return objects[handle]
+        except KeyError as error:
+            raise OBJECT_NOT_FOUND() from error
+
+    def get_contact_by_handle(self, handle: str) -> Contact:
+        return self._get(self.contacts, handle)
+
+    def get_nsset_by_handle(self, handle: str) -> NSSet:
+        return self._get(self.nssets, handle)
+
+    def get_keyset_by_handle(self, handle: str) -> KeySet:
+        return self._get(self.keysets, handle)
+
+    def get_registrar_by_handle(self, handle: str) -> Registrar:
+        return self._get(self.registrars, handle)
+
+    def get_domain_by_handle(self, handle: str) -> Domain:
+        domain = self._get(self.domains, handle)
+        if STATUS_DELETE_CANDIDATE in domain.statuses:
+            raise OBJECT_DELETE_CANDIDATE()
+        return domain
+
+    def get_contact_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return self.status_descriptions.get('contact', [])
+
+    def get_nsset_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return self.status_descriptions.get('nsset', [])
+
+    def get_keyset_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return self.status_descriptions.get('keyset', [])
+
+    def get_domain_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return self.status_descriptions.get('domain', [])
+
+    def get_registrars(self) -> List[Registrar]:
+        return list(self.registrars.values())
+
+    def get_registrar_groups(self) -> List[RegistrarGroup]:
+        return self.registrar_groups
+
+    def get_registrar_certification_list(self) -> List[RegistrarCertification]:
+        return self.registrar_certifications
+
+    def get_managed_zone_list(self) -> List[str]:
+        return self.managed_zones
+
+
+class CachedWhoisBackend(WhoisBackend):
+    """Whois backend which caches registry objects looked up by another backend.
+
+    Errors, e.g. objects not found, are not cached.
+    """
+
+    def __init__(self, backend: WhoisBackend, cache: TwoTierCache):
+        self.backend = backend
+        self.cache = cache
+
+    def _get_cached(self, method: str, handle: str) -> Any:
+        key = 'webwhois_object_{}'.format(hashlib.sha1('{}\n{}'.format(method, handle).encode()).hexdigest())
+        return self.cache.get_or_load(key, partial(getattr(self.backend, method), handle))
+
+    def get_contact_by_handle(self, handle: str) -> Contact:
+        return self._get_cached('get_contact_by_handle', handle)
+
+    def get_nsset_by_handle(self, handle: str) -> NSSet:
+        return self._get_cached('get_nsset_by_handle', handle)
+
+    def get_keyset_by_handle(self, handle: str) -> KeySet:
+        return self._get_cached('get_keyset_by_handle', handle)
+
+    def get_registrar_by_handle(self, handle: str) -> Registrar:
+        return self._get_cached('get_registrar_by_handle', handle)
+
+    def get_domain_by_handle(self, handle: str) -> Domain:
+        return self._get_cached('get_domain_by_handle', handle)
+
+    def get_contact_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return self.backend.get_contact_status_descriptions(lang)
+
+    def get_nsset_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return self.backend.get_nsset_status_descriptions(lang)
+
+    def get_keyset_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return self.backend.get_keyset_status_descriptions(lang)
+
+    def get_domain_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return self.backend.get_domain_status_descriptions(lang)
+
+    def get_registrars(self) -> List[Registrar]:
+        return self.backend.get_registrars()
+
+    def get_registrar_groups(self) -> List[RegistrarGroup]:
+        return self.backend.get_registrar_groups()
+
+    def get_registrar_certification_list(self) -> List[RegistrarCertification]:
+        return self.backend.get_registrar_certification_list()
+
+    def get_managed_zone_list(self) -> List[str]:
+        return self.backend.get_managed_zone_list()
+
+
+class CoalescingWhoisBackend(WhoisBackend):
+    """Whois backend which coalesces concurrent lookups of the same registry object by another backend."""
+
+    def __init__(self, backend: WhoisBackend, single_flight: SingleFlight):
+        self.backend = backend
+        self.single_flight = single_flight
+
+    def _get_coalesced(self, method: str, handle: str) -> Any:
+        return self.single_flight.do('{}\n{}'.format(method, handle), partial(getattr(self.backend, method), handle))
+
+    def get_contact_by_handle(self, handle: str) -> Contact:
+        return self._get_coalesced('get_contact_by_handle', handle)
+
+    def get_nsset_by_handle(self, handle: str) -> NSSet:
+        return self._get_coalesced('get_nsset_by_handle', handle)
+
+    def get_keyset_by_handle(self, handle: str) -> KeySet:
+        return self._get_coalesced('get_keyset_by_handle', handle)
+
+    def get_registrar_by_handle(self, handle: str) -> Registrar:
+        return self._get_coalesced('get_registrar_by_handle', handle)
+
+    def get_domain_by_handle(self, handle: str) -> Domain:
+        return self._get_coalesced('get_domain_by_handle', handle)
+
+    def get_contact_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return self.backend.get_contact_status_descriptions(lang)
+
+    def get_nsset_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return self.backend.get_nsset_status_descriptions(lang)
+
+    def get_keyset_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return self.backend.get_keyset_status_descriptions(lang)
+
+    def get_domain_status_descriptions(self, lang: str) -> List[ObjectStatusDesc]:
+        return self.backend.get_domain_status_descriptions(lang)
+
+    def get_registrars(self) -> List[Registrar]:
+        return self.backend.get_registrars()
+
+    def get_registrar_groups(self) -> List[RegistrarGroup]:
+        return self.backend.get_registrar_groups()
+
+    def get_registrar_certification_list(self) -> List[RegistrarCertification]:
+        return self.backend.get_registrar_certification_list()
+
+    def get_managed_zone_list(self) -> List[str]:
+        return self.backend.get_managed_zone_list()
+
+
+@lru_cache()
+def get_backend() -> WhoisBackend:
+    """Return the whois backend instance.
+
+    Utility function to cache the backend instance.
+    Concurrent lookups of registry objects are coalesced, if `SINGLE_FLIGHT` is set.
+    Registry objects are cached, if `OBJECT_CACHE_TIMEOUT` is set.
+    """
+    backend = cast(WhoisBackend, import_string(WEBWHOIS_SETTINGS.BACKEND)())
+    if WEBWHOIS_SETTINGS.SINGLE_FLIGHT:
+        single_flight = SingleFlight(lease_timeout=WEBWHOIS_SETTINGS.SINGLE_FLIGHT_LEASE_TIMEOUT,
+                                     poll_interval=WEBWHOIS_SETTINGS.SINGLE_FLIGHT_POLL_INTERVAL)
+        backend = CoalescingWhoisBackend(backend, single_flight)
+    if WEBWHOIS_SETTINGS.OBJECT_CACHE_TIMEOUT:
+        backend = CachedWhoisBackend(backend, get_object_cache())
+    return backend
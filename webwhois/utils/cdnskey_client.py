@@ -17,19 +17,20 @@
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
 """Utilities for cdnskey processor client."""
-import itertools
+import asyncio
+from contextlib import contextmanager
 from functools import lru_cache
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional, Type
 
 from django.core.exceptions import ImproperlyConfigured
 from django.http import Http404
-from grpc import ChannelCredentials, RpcError, StatusCode, ssl_channel_credentials
+from grpc import ChannelCredentials, RpcError, StatusCode, aio, ssl_channel_credentials
 
 try:
     from cdnskey_processor_api import service_report_grpc_pb2_grpc
     from cdnskey_processor_api.common_types_pb2 import (Cdnskey, CdnskeyStatus as CdnskeyStatusProto, DnskeyAlg,
                                                         DnskeyFlags)
-    from cdnskey_processor_api.service_report_grpc_pb2 import RawScanResultsRequest
+    from cdnskey_processor_api.service_report_grpc_pb2 import RawScanResultsReply, RawScanResultsRequest
     from frgal import GrpcClient, GrpcDecoder
 except ImportError:
     Cdnskey, DnskeyAlg, DnskeyFlags = None, None, None
@@ -43,6 +44,18 @@ except ImportError:
 from webwhois.settings import WEBWHOIS_SETTINGS
 
 from ..constants import CdnskeyStatus, DnskeyAlgorithm, DnskeyFlag
+from .instrumentation import SPAN_BACKEND, measure, measure_iterable
+
+
+@contextmanager
+def _convert_errors(domain: str) -> Iterator[None]:
+    """Convert errors of the cdnskey processor calls of the domain."""
+    try:
+        yield
+    except RpcError as error:
+        if error.code() == StatusCode.NOT_FOUND:
+            raise Http404("Domain '{}' not found.".format(domain)) from error
+        raise error
 
 
 class CdnskeyDecoder(GrpcDecoder):
@@ -84,16 +97,96 @@ class CdnskeyClient(GrpcClient):
                          credentials=credentials)
 
     def raw_scan_results(self, domain: str) -> Iterable[Dict[str, Any]]:
-        """Return scan results for a domain."""
+        """Return scan results for a domain.
+
+        The results are streamed, so the errors are raised while they're iterated.
+        """
+        return measure_iterable(SPAN_BACKEND, 'CDNSKEY.raw_scan_results', self._iter_raw_scan_results(domain),
+                                (domain, ))
+
+    def _iter_raw_scan_results(self, domain: str) -> Iterator[Dict[str, Any]]:
+        request = RawScanResultsRequest()
+        request.domain_fqdn.value = domain
+        with _convert_errors(domain):
+            response_data = self.call_stream(self.grpc_service, 'raw_scan_results', request,
+                                             timeout=WEBWHOIS_SETTINGS.CDNSKEY_TIMEOUT)
+            for scan_results in response_data:
+                yield from scan_results
+
+
+class AsyncCdnskeyClient:
+    """Asynchronous gRPC client for cdnskey processor based on `grpc.aio`."""
+
+    grpc_service = 'Report'
+
+    def __init__(self, netloc: str, credentials: Optional[ChannelCredentials] = None):
+        """Initialize asynchronous client.
+
+        Arguments:
+            netloc: Network location of a gRPC server.
+            credentials: Credentials for a secure channel connection. If None, insecure channel is used.
+        """
+        self.netloc = netloc
+        self.credentials = credentials
+        self.decoder = CdnskeyDecoder()
+        self._channels = {}  # type: Dict[asyncio.AbstractEventLoop, aio.Channel]
+
+    def _get_channel(self) -> aio.Channel:
+        """Return a channel for the running event loop.
+
+        Channels of `grpc.aio` are bound to the event loop they were created in.
+        Channels of closed event loops are dropped, they can't be closed without their loops.
+        """
+        loop = asyncio.get_running_loop()
+        for closed_loop in [channel_loop for channel_loop in self._channels if channel_loop.is_closed()]:
+            del self._channels[closed_loop]
+        if loop not in self._channels:
+            if self.credentials is None:
+                self._channels[loop] = aio.insecure_channel(self.netloc)
+            else:
+                self._channels[loop] = aio.secure_channel(self.netloc, self.credentials)
+        return self._channels[loop]
+
+    async def close(self) -> None:
+        """Close the channel of the running event loop, e.g. on shutdown of the application."""
+        channel = self._channels.pop(asyncio.get_running_loop(), None)
+        if channel is not None:
+            await channel.close()
+
+    def _get_method(self, name: str) -> str:
+        """Return path of the method of the gRPC service defined by the cdnskey processor API."""
+        service = RawScanResultsRequest.DESCRIPTOR.file.services_by_name[self.grpc_service]
+        return '/{}/{}'.format(service.full_name, service.methods_by_name[name].name)
+
+    def _call_stream(self, method: str, request: Any, response_type: Type,
+                     timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        """Make a unary-stream call and return an asynchronous iterator over the responses."""
+        stream = self._get_channel().unary_stream(method, request_serializer=type(request).SerializeToString,
+                                                  response_deserializer=response_type.FromString)
+        return stream(request, timeout=timeout)  # type: ignore[no-any-return]
+
+    async def raw_scan_results(self, domain: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield scan results for a domain as they arrive."""
         request = RawScanResultsRequest()
         request.domain_fqdn.value = domain
-        try:
-            response_data = self.call_stream(self.grpc_service, 'raw_scan_results', request)
-            return itertools.chain.from_iterable(response_data)
-        except RpcError as error:
-            if error.code() == StatusCode.NOT_FOUND:
-                raise Http404("Domain '{}' not found.".format(domain)) from error
-            raise error
+        # Errors of `grpc.aio` calls, i.e. `aio.AioRpcError`, are also `RpcError`s.
+        with measure(SPAN_BACKEND, 'CDNSKEY.raw_scan_results', (domain, )), _convert_errors(domain):
+            replies = self._call_stream(self._get_method('raw_scan_results'), request, RawScanResultsReply,
+                                        timeout=WEBWHOIS_SETTINGS.CDNSKEY_TIMEOUT)
+            async for reply in replies:
+                for scan_result in self.decoder.decode(reply):
+                    yield scan_result
+
+
+def _get_credentials() -> Optional[ChannelCredentials]:
+    """Return credentials for the cdnskey processor."""
+    if Cdnskey is None:
+        raise ImproperlyConfigured("WEBWHOIS_CDNSKEY_NETLOC is installed, but cdnskey_processor_api is not available.")
+    credentials = None
+    if WEBWHOIS_SETTINGS.CDNSKEY_SSL_CERT:
+        with open(WEBWHOIS_SETTINGS.CDNSKEY_SSL_CERT) as file:
+            credentials = ssl_channel_credentials(file.read())
+    return credentials
 
 
 @lru_cache()
@@ -104,10 +197,15 @@ def get_cdnskey_client() -> Optional[CdnskeyClient]:
     """
     if not WEBWHOIS_SETTINGS.CDNSKEY_NETLOC:
         return None
-    if Cdnskey is None:
-        raise ImproperlyConfigured("WEBWHOIS_CDNSKEY_NETLOC is installed, but cdnskey_processor_api is not available.")
-    credentials = None
-    if WEBWHOIS_SETTINGS.CDNSKEY_SSL_CERT:
-        with open(WEBWHOIS_SETTINGS.CDNSKEY_SSL_CERT) as file:
-            credentials = ssl_channel_credentials(file.read())
-    return CdnskeyClient(WEBWHOIS_SETTINGS.CDNSKEY_NETLOC, credentials=credentials)
+    return CdnskeyClient(WEBWHOIS_SETTINGS.CDNSKEY_NETLOC, credentials=_get_credentials())
+
+
+@lru_cache()
+def get_async_cdnskey_client() -> Optional[AsyncCdnskeyClient]:
+    """Return the asynchronous client instance.
+
+    Utility function to cache the client instance.
+    """
+    if not WEBWHOIS_SETTINGS.CDNSKEY_NETLOC:
+        return None
+    return AsyncCdnskeyClient(WEBWHOIS_SETTINGS.CDNSKEY_NETLOC, credentials=_get_credentials())
@@ -0,0 +1,224 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Compact codec of registry objects for caches.
+
+Registry objects are encoded into a msgpack based format, if `msgpack` is installed.
+Structures are encoded as arrays of their field values, so field names aren't stored in every cached value,
+dates, datetimes and enums are encoded as extension types.
+Types are checked strictly, so subclasses of builtin types, e.g. `str` and `int` based enums, aren't packed as their
+base types.
+Encoded data start with a header containing the codec version, the format and a fingerprint of the schema.
+Data encoded by another codec version or schema, e.g. before an upgrade, can't be decoded
+and they are treated as cache misses.
+
+Values, which aren't supported by the schema, are pickled. If `msgpack` isn't installed, whole values are pickled.
+Tuples are decoded as lists.
+"""
+import inspect
+import pickle
+import struct
+import zlib
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, List, Optional, Sequence, cast
+
+from django.core.cache import BaseCache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from fred_idl.Registry.Whois import (Contact, ContactIdentification, DisclosableContactIdentification,
+                                     DisclosablePlaceAddress, DisclosableString, DNSKey, Domain, IPAddress, IPv4, IPv6,
+                                     KeySet, NameServer, NSSet, ObjectStatusDesc, PlaceAddress, Registrar)
+
+from ..constants import CdnskeyStatus, DnskeyAlgorithm, DnskeyFlag
+from .instrumentation import record_cache_access
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CODEC_VERSION = 1
+FORMAT_MSGPACK = 1
+FORMAT_PICKLE = 2
+
+EXT_STRUCT = 1
+EXT_DATE = 2
+EXT_DATETIME = 3
+EXT_ENUM = 4
+EXT_PICKLE = 5
+EXT_ENUM_TYPE = 6
+
+# Codec version, format and schema fingerprint.
+_HEADER = struct.Struct('>BBI')
+
+# Only append new types to keep the type codes stable.
+STRUCTS = (Contact, ContactIdentification, DisclosableContactIdentification, DisclosablePlaceAddress,
+           DisclosableString, DNSKey, Domain, IPAddress, KeySet, NameServer, NSSet, ObjectStatusDesc, PlaceAddress,
+           Registrar)
+ENUMS = (IPv4, IPv6)
+# Only append new types to keep the type codes stable.
+ENUM_TYPES = (CdnskeyStatus, DnskeyAlgorithm, DnskeyFlag)
+
+
+class CodecError(ValueError):
+    """Data can't be decoded."""
+
+
+class Codec:
+    """Schema aware codec of registry objects.
+
+    Attributes:
+        structs: Types of structures encoded as arrays of field values.
+        fields: Names of fields of the structures in order of their constructor arguments.
+        enums: Enum items encoded by their index.
+        enum_types: Python enums encoded by their index and values of their items.
+        fingerprint: Checksum of the schema.
+    """
+
+    def __init__(self, structs: Sequence[type], enums: Sequence[Any], enum_types: Sequence[Any] = ()):
+        self.structs = tuple(structs)
+        self.fields = tuple(tuple(inspect.signature(cls).parameters) for cls in self.structs)
+        self.enums = tuple(enums)
+        self.enum_types = tuple(enum_types)
+        self._struct_codes = {cls: code for code, cls in enumerate(self.structs)}
+        self._enum_codes = {id(item): code for code, item in enumerate(self.enums)}
+        self._enum_type_codes = {cls: code for code, cls in enumerate(self.enum_types)}
+        schema: List[Any] = [(cls.__module__, cls.__qualname__, fields)
+                             for cls, fields in zip(self.structs, self.fields)]
+        schema.append([str(item) for item in self.enums])
+        schema.append([(cls.__module__, cls.__qualname__) for cls in self.enum_types])
+        self.fingerprint = zlib.crc32(repr(schema).encode())
+
+    def dumps(self, value: Any) -> bytes:
+        """Encode the value."""
+        if msgpack is None:
+            return _HEADER.pack(CODEC_VERSION, FORMAT_PICKLE, 0) + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return _HEADER.pack(CODEC_VERSION, FORMAT_MSGPACK, self.fingerprint) + self._pack(value)
+
+    def loads(self, data: Any) -> Any:
+        """Decode the value.
+
+        Raises:
+            CodecError: If data weren't encoded by this codec or they're corrupted.
+        """
+        if not isinstance(data, bytes) or len(data) < _HEADER.size:
+            raise CodecError('Data are not encoded by the codec.')
+        version, data_format, fingerprint = _HEADER.unpack_from(data)
+        if version != CODEC_VERSION:
+            raise CodecError('Unsupported codec version {}.'.format(version))
+        try:
+            if data_format == FORMAT_PICKLE:
+                return pickle.loads(data[_HEADER.size:])
+            if data_format != FORMAT_MSGPACK or msgpack is None:
+                raise CodecError('Unsupported format {}.'.format(data_format))
+            if fingerprint != self.fingerprint:
+                raise CodecError('Data were encoded with a different schema.')
+            return self._unpack(data[_HEADER.size:])
+        except CodecError:
+            raise
+        except Exception as error:
+            raise CodecError('Data are corrupted: {}'.format(error)) from error
+
+    def _pack(self, value: Any) -> bytes:
+        return cast(bytes, msgpack.packb(value, default=self._encode_ext, use_bin_type=True, strict_types=True))
+
+    def _unpack(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, ext_hook=self._decode_ext, raw=False, strict_map_key=False)
+
+    def _encode_ext(self, value: Any) -> Any:
+        """Encode values not supported by msgpack as extension types."""
+        code = self._struct_codes.get(type(value))
+        if code is not None:
+            items: List[Any] = [code]
+            items.extend(getattr(value, name) for name in self.fields[code])
+            return msgpack.ExtType(EXT_STRUCT, self._pack(items))
+        if isinstance(value, datetime):
+            offset = value.utcoffset()
+            seconds = value.hour * 3600 + value.minute * 60 + value.second
+            items = [value.toordinal(), seconds, value.microsecond,
+                     None if offset is None else offset // timedelta(seconds=1)]
+            return msgpack.ExtType(EXT_DATETIME, self._pack(items))
+        if isinstance(value, date):
+            return msgpack.ExtType(EXT_DATE, self._pack(value.toordinal()))
+        code = self._enum_codes.get(id(value))
+        if code is not None:
+            return msgpack.ExtType(EXT_ENUM, self._pack(code))
+        code = self._enum_type_codes.get(type(value))
+        if code is not None:
+            return msgpack.ExtType(EXT_ENUM_TYPE, self._pack([code, value.value]))
+        if type(value) is tuple:
+            return list(value)
+        return msgpack.ExtType(EXT_PICKLE, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+    def _decode_ext(self, code: int, data: bytes) -> Any:
+        """Decode extension types."""
+        if code == EXT_STRUCT:
+            items = self._unpack(data)
+            return self.structs[items[0]](*items[1:])
+        if code == EXT_DATETIME:
+            ordinal, seconds, microseconds, offset = self._unpack(data)
+            if offset is None:
+                tzinfo = None
+            elif offset:
+                tzinfo = timezone(timedelta(seconds=offset))
+            else:
+                tzinfo = timezone.utc
+            value = datetime.combine(date.fromordinal(ordinal), time(tzinfo=tzinfo))
+            return value + timedelta(seconds=seconds, microseconds=microseconds)
+        if code == EXT_DATE:
+            return date.fromordinal(self._unpack(data))
+        if code == EXT_ENUM:
+            return self.enums[self._unpack(data)]
+        if code == EXT_ENUM_TYPE:
+            enum_code, enum_value = self._unpack(data)
+            return self.enum_types[enum_code](enum_value)
+        if code == EXT_PICKLE:
+            return pickle.loads(data)
+        raise CodecError('Unsupported extension type {}.'.format(code))
+
+
+CODEC = Codec(STRUCTS, ENUMS, ENUM_TYPES)
+
+
+def dumps(value: Any) -> bytes:
+    """Encode the value by the codec of registry objects."""
+    return CODEC.dumps(value)
+
+
+def loads(data: Any) -> Any:
+    """Decode the value by the codec of registry objects."""
+    return CODEC.loads(data)
+
+
+def cache_get(cache: BaseCache, key: str, default: Any = None, *, name: Optional[str] = None) -> Any:
+    """Return the decoded value from the cache or `default`, if it's missing or it can't be decoded.
+
+    If `name` is set, the access is reported to the instrumentation as an access to a cache of that name.
+    """
+    data = cache.get(key)
+    try:
+        value = default if data is None else loads(data)
+    except CodecError:
+        value = default
+    if name is not None:
+        record_cache_access(name, hit=value is not default)
+    return value
+
+
+def cache_set(cache: BaseCache, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT) -> None:
+    """Encode the value and store it in the cache."""
+    cache.set(key, dumps(value), timeout)
@@ -17,6 +17,8 @@
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
 """Utilities for Corba."""
+from typing import Any, ContextManager
+
 from django.conf import settings
 from django.utils import timezone
 from django.utils.functional import SimpleLazyObject
@@ -34,6 +36,7 @@ from typist import SecretaryClient
 from webwhois.settings import WEBWHOIS_SETTINGS
 
 from ..constants import LOGGER_SERVICE, PUBLIC_REQUESTS_LOGGER_SERVICE, LogResult, PublicRequestsLogResult
+from .instrumentation import SPAN_LOG_ENTRY, instrument_client, measure_context
 
 
 class WebwhoisCorbaRecoder(CorbaRecoder):
@@ -77,18 +80,33 @@ def load_filemanager_from_idl():
     return _CLIENT.get_object('FileManager', FileManager)
 
 
+class InstrumentedLogger(Logger):
+    """Logger, which measures blocks of the log entries as spans of the instrumentation."""
+
+    def create(self, log_entry_type: Any, *args: Any, **kwargs: Any) -> ContextManager[Any]:
+        """Create a log entry."""
+        return measure_context(SPAN_LOG_ENTRY, 'LOGGER.create', super().create(log_entry_type, *args, **kwargs),
+                               (log_entry_type, ))
+
+
 _WHOIS = SimpleLazyObject(load_whois_from_idl)
 _PUBLIC_REQUEST = SimpleLazyObject(load_public_request_from_idl)
 _FILE_MANAGER = SimpleLazyObject(load_filemanager_from_idl)
 
-_LOGGER_CLIENT = get_logger_client(WEBWHOIS_SETTINGS.LOGGER, **WEBWHOIS_SETTINGS.LOGGER_OPTIONS)
-LOGGER = Logger(_LOGGER_CLIENT, LOGGER_SERVICE, LogResult.ERROR)
-PUBLIC_REQUESTS_LOGGER = Logger(_LOGGER_CLIENT, PUBLIC_REQUESTS_LOGGER_SERVICE, PublicRequestsLogResult.ERROR)
+_LOGGER_CLIENT = instrument_client(
+    get_logger_client(WEBWHOIS_SETTINGS.LOGGER, **WEBWHOIS_SETTINGS.LOGGER_OPTIONS), 'LOGGER')
+LOGGER = InstrumentedLogger(_LOGGER_CLIENT, LOGGER_SERVICE, LogResult.ERROR)
+PUBLIC_REQUESTS_LOGGER = InstrumentedLogger(_LOGGER_CLIENT, PUBLIC_REQUESTS_LOGGER_SERVICE,
+                                            PublicRequestsLogResult.ERROR)
 
-WHOIS = CorbaClientProxy(CorbaClient(_WHOIS, WebwhoisCorbaRecoder('utf-8'), Whois.INTERNAL_SERVER_ERROR))
-PUBLIC_REQUEST = CorbaClientProxy(CorbaClient(_PUBLIC_REQUEST, WebwhoisCorbaRecoder('utf-8'),
-                                              PublicRequest.INTERNAL_SERVER_ERROR))
-FILE_MANAGER = CorbaClientProxy(CorbaClient(_FILE_MANAGER, WebwhoisCorbaRecoder('utf-8'), FileManager.InternalError))
+WHOIS = instrument_client(
+    CorbaClientProxy(CorbaClient(_WHOIS, WebwhoisCorbaRecoder('utf-8'), Whois.INTERNAL_SERVER_ERROR)), 'WHOIS')
+PUBLIC_REQUEST = instrument_client(
+    CorbaClientProxy(CorbaClient(_PUBLIC_REQUEST, WebwhoisCorbaRecoder('utf-8'), PublicRequest.INTERNAL_SERVER_ERROR)),
+    'PUBLIC_REQUEST')
+FILE_MANAGER = instrument_client(
+    CorbaClientProxy(CorbaClient(_FILE_MANAGER, WebwhoisCorbaRecoder('utf-8'), FileManager.InternalError)),
+    'FILE_MANAGER')
 
 
 def _backport_log_entry_id(log_entry_id: str) -> int:
@@ -96,23 +114,32 @@ def _backport_log_entry_id(log_entry_id: str) -> int:
     return int(log_entry_id.partition('.')[0])
 
 
-CONTACT_CLIENT = ContactClient(WEBWHOIS_SETTINGS.REGISTRY_NETLOC,
-                               make_credentials(WEBWHOIS_SETTINGS.REGISTRY_SSL_CERT))
-DOMAIN_CLIENT = DomainClient(WEBWHOIS_SETTINGS.REGISTRY_NETLOC,
-                             make_credentials(WEBWHOIS_SETTINGS.REGISTRY_SSL_CERT))
-KEYSET_CLIENT = KeysetClient(WEBWHOIS_SETTINGS.REGISTRY_NETLOC,
-                             make_credentials(WEBWHOIS_SETTINGS.REGISTRY_SSL_CERT))
-NSSET_CLIENT = NssetClient(WEBWHOIS_SETTINGS.REGISTRY_NETLOC,
-                           make_credentials(WEBWHOIS_SETTINGS.REGISTRY_SSL_CERT))
-REGISTRAR_CLIENT = RegistrarClient(WEBWHOIS_SETTINGS.REGISTRY_NETLOC,
-                                   make_credentials(WEBWHOIS_SETTINGS.REGISTRY_SSL_CERT))
-SECRETARY_CLIENT = SecretaryClient(WEBWHOIS_SETTINGS.SECRETARY_URL, auth=WEBWHOIS_SETTINGS.SECRETARY_AUTH,
-                                   timeout=WEBWHOIS_SETTINGS.SECRETARY_TIMEOUT)
-STATEMENTOR = SyncStatementor(
-    secretary_client=SECRETARY_CLIENT,
-    contact_client=CONTACT_CLIENT,
-    domain_client=DOMAIN_CLIENT,
-    keyset_client=KEYSET_CLIENT,
-    nsset_client=NSSET_CLIENT,
-    registrar_client=REGISTRAR_CLIENT,
-)
+CONTACT_CLIENT = instrument_client(
+    ContactClient(WEBWHOIS_SETTINGS.REGISTRY_NETLOC, make_credentials(WEBWHOIS_SETTINGS.REGISTRY_SSL_CERT)),
+    'REGAL.contact')
+DOMAIN_CLIENT = instrument_client(
+    DomainClient(WEBWHOIS_SETTINGS.REGISTRY_NETLOC, make_credentials(WEBWHOIS_SETTINGS.REGISTRY_SSL_CERT)),
+    'REGAL.domain')
+KEYSET_CLIENT = instrument_client(
+    KeysetClient(WEBWHOIS_SETTINGS.REGISTRY_NETLOC, make_credentials(WEBWHOIS_SETTINGS.REGISTRY_SSL_CERT)),
+    'REGAL.keyset')
+NSSET_CLIENT = instrument_client(
+    NssetClient(WEBWHOIS_SETTINGS.REGISTRY_NETLOC, make_credentials(WEBWHOIS_SETTINGS.REGISTRY_SSL_CERT)),
+    'REGAL.nsset')
+REGISTRAR_CLIENT = instrument_client(
+    RegistrarClient(WEBWHOIS_SETTINGS.REGISTRY_NETLOC, make_credentials(WEBWHOIS_SETTINGS.REGISTRY_SSL_CERT)),
+    'REGAL.registrar')
+SECRETARY_CLIENT = instrument_client(
+    SecretaryClient(WEBWHOIS_SETTINGS.SECRETARY_URL, auth=WEBWHOIS_SETTINGS.SECRETARY_AUTH,
+                    timeout=WEBWHOIS_SETTINGS.SECRETARY_TIMEOUT),
+    'SECRETARY')
+STATEMENTOR = instrument_client(
+    SyncStatementor(
+        secretary_client=SECRETARY_CLIENT,
+        contact_client=CONTACT_CLIENT,
+        domain_client=DOMAIN_CLIENT,
+        keyset_client=KEYSET_CLIENT,
+        nsset_client=NSSET_CLIENT,
+        registrar_client=REGISTRAR_CLIENT,
+    ),
+    'STATEMENTOR')
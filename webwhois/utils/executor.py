@@ -0,0 +1,75 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Executor for concurrent blocking backend calls."""
+import asyncio
+import contextvars
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, ContextManager, Dict, Mapping, TypeVar
+
+from asgiref.sync import sync_to_async
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+T = TypeVar('T')
+
+
+@lru_cache()
+def get_executor() -> ThreadPoolExecutor:
+    """Return a bounded executor for blocking backend calls."""
+    return ThreadPoolExecutor(max_workers=WEBWHOIS_SETTINGS.EXECUTOR_MAX_WORKERS, thread_name_prefix='webwhois')
+
+
+def submit(func: Callable[..., T], *args: Any, **kwargs: Any) -> 'Future[T]':
+    """Schedule a blocking function in the bounded executor and return its future.
+
+    Function runs in a copy of the current context.
+    """
+    context = contextvars.copy_context()
+    return get_executor().submit(context.run, func, *args, **kwargs)
+
+
+def run_sync(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """Return an awaitable which runs a blocking function in the bounded executor.
+
+    Function isn't bound to the thread of the request, so multiple calls may run concurrently.
+    """
+    return sync_to_async(func, thread_sensitive=False, executor=get_executor())
+
+
+@asynccontextmanager
+async def sync_context(manager: ContextManager[T]) -> AsyncIterator[T]:
+    """Enter and exit a blocking context manager in the bounded executor."""
+    value = await run_sync(manager.__enter__)()
+    try:
+        yield value
+    except BaseException:
+        exc_info = sys.exc_info()  # type: Any
+        if not await run_sync(manager.__exit__)(*exc_info):
+            raise
+    else:
+        await run_sync(manager.__exit__)(None, None, None)
+
+
+async def gather_mapping(awaitables: Mapping[str, Awaitable[Any]]) -> Dict[str, Any]:
+    """Run awaitables concurrently and return a dictionary with their results under the same keys."""
+    results = await asyncio.gather(*awaitables.values())
+    return dict(zip(awaitables.keys(), results))
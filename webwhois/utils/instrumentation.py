@@ -0,0 +1,214 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Instrumentation of backend calls, views and caches.
+
+Measured operations, i.e. spans, and cache accesses are reported to observers, e.g. to collect metrics.
+Observers are registered either globally or for the current context, e.g. for a single request.
+Instrumentation is cheap when there are no observers.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, ContextManager, Generator, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar, cast
+
+T = TypeVar('T')
+ObserverT = TypeVar('ObserverT', bound='Observer')
+
+SPAN_BACKEND = 'backend'
+SPAN_VIEW = 'view'
+SPAN_RENDER = 'render'
+SPAN_STATUS_DESCRIPTIONS = 'status_descriptions'
+SPAN_LOG_ENTRY = 'log_entry'
+
+_OBSERVERS: List['Observer'] = []
+_CONTEXT_OBSERVERS: ContextVar[Tuple['Observer', ...]] = ContextVar('webwhois_observers', default=())
+
+
+class Span:
+    """Measured operation.
+
+    Attributes:
+        kind: Kind of the operation, e.g. `backend` for backend calls, `view` for views or `render` for rendering
+            of templates.
+        name: Name of the operation, e.g. `WHOIS.get_domain_by_handle`.
+        args: Arguments of the operation.
+        start: Start of the operation from `time.perf_counter`.
+        duration: Duration of the operation in seconds, `None` until the operation is finished.
+        error: Exception raised by the operation.
+    """
+
+    __slots__ = ('kind', 'name', 'args', 'start', 'duration', 'error', '_observers')
+
+    def __init__(self, kind: str, name: str, args: Sequence[Any] = ()):
+        self.kind = kind
+        self.name = name
+        self.args = args
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[BaseException] = None
+        self._observers: Sequence[Observer] = ()
+
+    def __repr__(self) -> str:
+        return '<Span {} {}>'.format(self.kind, self.name)
+
+
+class Observer:
+    """Base class for observers of the instrumentation."""
+
+    def span_started(self, span: Span) -> None:
+        """Handle started span."""
+
+    def span_finished(self, span: Span) -> None:
+        """Handle finished span."""
+
+    def cache_accessed(self, cache: str, hit: bool) -> None:
+        """Handle access to a cache."""
+
+
+def add_observer(observer: Observer) -> None:
+    """Register the observer."""
+    _OBSERVERS.append(observer)
+
+
+def remove_observer(observer: Observer) -> None:
+    """Unregister the observer."""
+    _OBSERVERS.remove(observer)
+
+
+def add_context_observer(observer: Observer) -> None:
+    """Register the observer for the current context.
+
+    The observer is also registered in contexts copied from the current context, e.g. in the threads of the executor.
+    """
+    _CONTEXT_OBSERVERS.set(_CONTEXT_OBSERVERS.get() + (observer,))
+
+
+def remove_context_observer(observer: Observer) -> None:
+    """Unregister the observer for the current context."""
+    _CONTEXT_OBSERVERS.set(tuple(o for o in _CONTEXT_OBSERVERS.get() if o is not observer))
+
+
+@contextmanager
+def observe(observer: ObserverT) -> Iterator[ObserverT]:
+    """Register the observer for the current context within the block."""
+    add_context_observer(observer)
+    try:
+        yield observer
+    finally:
+        remove_context_observer(observer)
+
+
+def get_observers() -> Tuple[Observer, ...]:
+    """Return the observers registered globally and for the current context."""
+    context_observers = _CONTEXT_OBSERVERS.get()
+    if context_observers:
+        return tuple(_OBSERVERS) + context_observers
+    return tuple(_OBSERVERS)
+
+
+def start_span(kind: str, name: str, args: Sequence[Any] = ()) -> Span:
+    """Start a span and report it to the observers."""
+    span = Span(kind, name, args)
+    span._observers = get_observers()
+    for observer in span._observers:
+        observer.span_started(span)
+    return span
+
+
+def finish_span(span: Span, error: Optional[BaseException] = None) -> None:
+    """Finish the span and report it to the observers, which were reported its start."""
+    span.duration = time.perf_counter() - span.start
+    if error is not None:
+        span.error = error
+    for observer in reversed(span._observers):
+        observer.span_finished(span)
+
+
+@contextmanager
+def measure(kind: str, name: str, args: Sequence[Any] = ()) -> Iterator[Optional[Span]]:
+    """Measure the block as a span. Yield `None` if there are no observers."""
+    if not _OBSERVERS and not _CONTEXT_OBSERVERS.get():
+        yield None
+        return
+    span = start_span(kind, name, args)
+    try:
+        yield span
+    except GeneratorExit:
+        # Measured generator was closed before it was exhausted.
+        finish_span(span)
+        raise
+    except BaseException as error:
+        finish_span(span, error)
+        raise
+    else:
+        finish_span(span)
+
+
+def measure_iterable(kind: str, name: str, iterable: Iterable[T],
+                     args: Sequence[Any] = ()) -> Generator[T, None, None]:
+    """Return iterator over the iterable measured as a span from the first item until the iterable is exhausted."""
+    with measure(kind, name, args):
+        yield from iterable
+
+
+@contextmanager
+def measure_context(kind: str, name: str, manager: ContextManager[T], args: Sequence[Any] = ()) -> Iterator[T]:
+    """Enter the context manager and measure its block as a span."""
+    with measure(kind, name, args):
+        with manager as value:
+            yield value
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """Report access to the cache to the observers."""
+    for observer in get_observers():
+        observer.cache_accessed(cache, hit)
+
+
+class InstrumentedClient:
+    """Proxy of a backend client, which measures calls of its public methods.
+
+    Attributes:
+        client: The proxied client.
+        service: Name of the backend service used in names of spans.
+    """
+
+    def __init__(self, client: Any, service: str):
+        self.client = client
+        self.service = service
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self.client, name)
+        if (not _OBSERVERS and not _CONTEXT_OBSERVERS.get()) or name.startswith('_') or not callable(value):
+            return value
+
+        def instrumented(*args: Any, **kwargs: Any) -> Any:
+            with measure(SPAN_BACKEND, '{}.{}'.format(self.service, name), args):
+                return value(*args, **kwargs)
+
+        instrumented.__wrapped__ = value  # type: ignore[attr-defined]
+        return instrumented
+
+    def __dir__(self) -> List[str]:
+        return sorted(set(super().__dir__()) | set(dir(self.client)))
+
+
+def instrument_client(client: T, service: str) -> T:
+    """Return the client with measured calls of its methods."""
+    return cast(T, InstrumentedClient(client, service))
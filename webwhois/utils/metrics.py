@@ -0,0 +1,91 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Prometheus metrics of backend calls, views and caches.
+
+Metrics are collected by an observer of the instrumentation and they require `prometheus_client`.
+Metrics of multiple processes, e.g. uWSGI workers, are aggregated if `PROMETHEUS_MULTIPROC_DIR` environment variable
+is set, see the multiprocess mode of `prometheus_client`.
+"""
+import os
+from functools import lru_cache
+from typing import Any, Optional, Tuple, cast
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .instrumentation import SPAN_BACKEND, SPAN_VIEW, Observer, Span
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None  # type: ignore[assignment]
+
+
+class MetricsObserver(Observer):
+    """Collects Prometheus metrics of the instrumented operations."""
+
+    def __init__(self, registry: Optional[Any] = None):
+        if prometheus_client is None:
+            raise ImproperlyConfigured('WEBWHOIS_METRICS is set, but prometheus_client is not available.')
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+        self.backend_duration = prometheus_client.Histogram(
+            'webwhois_backend_call_duration_seconds', 'Duration of backend calls.', ['operation'], registry=registry)
+        self.view_duration = prometheus_client.Histogram(
+            'webwhois_view_duration_seconds', 'Duration of views.', ['view'], registry=registry)
+        self.errors = prometheus_client.Counter(
+            'webwhois_errors', 'Exceptions raised by backend calls and views.', ['kind', 'name', 'exception'],
+            registry=registry)
+        self.cache_requests = prometheus_client.Counter(
+            'webwhois_cache_requests', 'Lookups in caches.', ['cache', 'result'], registry=registry)
+
+    def span_finished(self, span: Span) -> None:
+        """Observe duration of the span and count its error."""
+        duration = cast(float, span.duration)
+        if span.kind == SPAN_BACKEND:
+            self.backend_duration.labels(span.name).observe(duration)
+        elif span.kind == SPAN_VIEW:
+            self.view_duration.labels(span.name).observe(duration)
+        if span.error is not None:
+            self.errors.labels(span.kind, span.name, type(span.error).__name__).inc()
+
+    def cache_accessed(self, cache: str, hit: bool) -> None:
+        """Count the cache hit or miss."""
+        self.cache_requests.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+@lru_cache()
+def get_metrics_observer() -> MetricsObserver:
+    """Return the observer collecting metrics.
+
+    Utility function to register metrics only once.
+    """
+    return MetricsObserver()
+
+
+def generate_metrics() -> Tuple[bytes, str]:
+    """Return metrics in the Prometheus exposition format and its content type."""
+    if prometheus_client is None:
+        raise ImproperlyConfigured('WEBWHOIS_METRICS is set, but prometheus_client is not available.')
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
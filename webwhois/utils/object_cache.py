@@ -0,0 +1,180 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Two-tier cache of registry objects.
+
+The first tier is a small LRU cache in the memory of the worker, the second tier is a Django cache shared by workers.
+Values are written to both tiers. Values found only in the second tier are promoted to the first one,
+values evicted from the first tier are demoted, i.e. they remain available in the second tier only.
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from django.core.cache import caches
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+from .codec import cache_get, cache_set
+from .instrumentation import record_cache_access
+
+T = TypeVar('T')
+_MISSING = object()
+
+
+class TierStats:
+    """Hit and miss counters of a cache tier."""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def add(self, hit: bool) -> None:
+        """Count a lookup."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @property
+    def hit_ratio(self) -> float:
+        """Return ratio of hits to all lookups."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters as a dictionary."""
+        return {'hits': self.hits, 'misses': self.misses, 'hit_ratio': self.hit_ratio}
+
+
+class LRUCache:
+    """Thread safe in-memory cache with the least recently used entries evicted first and a TTL."""
+
+    def __init__(self, max_size: int, timeout: float):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.stats = TierStats()
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value or the default, if the value is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.stats.add(hit=False)
+                return default
+            self._entries.move_to_end(key)
+            self.stats.add(hit=True)
+            return entry[1]
+
+    def set(self, key: str, value: Any, timeout: Optional[float] = None) -> None:
+        """Store the value and evict the least recently used values, if the cache is full."""
+        if self.max_size <= 0:
+            return
+        expires = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Delete the value."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Delete all values."""
+        with self._lock:
+            self._entries.clear()
+
+
+class TwoTierCache:
+    """Cache with a per worker LRU cache as the first tier and a Django cache as the second tier.
+
+    Attributes:
+        l1: The in-memory LRU cache.
+        l2_stats: Hit and miss counters of the second tier.
+    """
+
+    def __init__(self, *, l1_size: int, l1_timeout: float, l2_timeout: int, l2_alias: str = 'default'):
+        # Values shouldn't live longer in the first tier than in the second one.
+        self.l1 = LRUCache(l1_size, min(l1_timeout, l2_timeout))
+        self.l2_timeout = l2_timeout
+        self.l2_alias = l2_alias
+        self.l2_stats = TierStats()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value from the first tier or the second tier and promote it."""
+        value = self.l1.get(key, _MISSING)
+        record_cache_access('object_l1', hit=value is not _MISSING)
+        if value is not _MISSING:
+            return value
+        value = cache_get(caches[self.l2_alias], key, _MISSING, name='object_l2')
+        self.l2_stats.add(hit=value is not _MISSING)
+        if value is _MISSING:
+            return default
+        self.l1.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store the value in both tiers."""
+        self.l1.set(key, value)
+        cache_set(caches[self.l2_alias], key, value, self.l2_timeout)
+
+    def delete(self, key: str) -> None:
+        """Delete the value from both tiers."""
+        self.l1.delete(key)
+        caches[self.l2_alias].delete(key)
+
+    def get_or_load(self, key: str, load: Callable[[], T]) -> T:
+        """Return the cached value or load and store it.
+
+        Exceptions raised by `load` are not cached.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = load()
+            self.set(key, value)
+        return value  # type: ignore[no-any-return]
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return statistics of both tiers."""
+        l1_stats = dict(self.l1.stats.as_dict(), size=len(self.l1), max_size=self.l1.max_size,
+                        evictions=self.l1.evictions)
+        return {'l1': l1_stats, 'l2': self.l2_stats.as_dict()}
+
+
+@lru_cache()
+def get_object_cache() -> TwoTierCache:
+    """Return the cache of registry objects."""
+    return TwoTierCache(l1_size=WEBWHOIS_SETTINGS.OBJECT_CACHE_L1_SIZE,
+                        l1_timeout=WEBWHOIS_SETTINGS.OBJECT_CACHE_L1_TIMEOUT,
+                        l2_timeout=WEBWHOIS_SETTINGS.OBJECT_CACHE_TIMEOUT)
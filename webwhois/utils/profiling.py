@@ -0,0 +1,69 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Storage of profiles of requests."""
+import cProfile
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Optional
+
+WEBWHOIS_LOGGING = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = '.prof'
+# Characters not allowed in names of profile directories.
+_UNSAFE_CHARS = re.compile(r'[^\w.-]')
+
+
+def save_profile(profile: cProfile.Profile, directory: str, view_name: str, duration: float,
+                 max_files: int) -> Optional[str]:
+    """Save the profile of a view in pstats format and return its path or `None` if it can't be saved.
+
+    Profiles are stored in a subdirectory for each view.
+    Only `max_files` newest profiles are kept in the subdirectory.
+    """
+    view_directory = os.path.join(directory, _UNSAFE_CHARS.sub('_', view_name.replace(':', '.')))
+    filename = '{:%Y%m%dT%H%M%S%f}-{}-{}ms{}'.format(
+        datetime.now(), os.getpid(), round(duration * 1000), PROFILE_SUFFIX)
+    path = os.path.join(view_directory, filename)
+    try:
+        os.makedirs(view_directory, exist_ok=True)
+        profile.dump_stats(path)
+    except OSError as error:
+        WEBWHOIS_LOGGING.warning("Profile of %s couldn't be saved: %s", view_name, error)
+        return None
+    rotate_profiles(view_directory, max_files)
+    return path
+
+
+def rotate_profiles(directory: str, max_files: int) -> None:
+    """Remove the oldest profiles in the directory, so at most `max_files` profiles remain."""
+    try:
+        filenames = sorted(f for f in os.listdir(directory) if f.endswith(PROFILE_SUFFIX))
+    except OSError as error:
+        WEBWHOIS_LOGGING.warning("Profiles in %s couldn't be rotated: %s", directory, error)
+        return
+    for filename in filenames[:max(len(filenames) - max_files, 0)]:
+        try:
+            os.remove(os.path.join(directory, filename))
+        except FileNotFoundError:
+            # Profile was removed by another process.
+            pass
+        except OSError as error:
+            WEBWHOIS_LOGGING.warning("Profile %s couldn't be removed: %s", filename, error)
@@ -0,0 +1,64 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Breakdown of a request duration for the Server-Timing header."""
+from threading import Lock
+from typing import Dict, List
+
+from .instrumentation import SPAN_BACKEND, Observer, Span
+
+
+class ServerTiming(Observer):
+    """Observer, which sums durations of spans for the Server-Timing header.
+
+    Backend calls are grouped by the backend services, other spans by their kinds, e.g.
+    `whois;dur=12.3;desc="2 calls", render;dur=4.5;desc="1 call"`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        # Metric name => [count, duration]
+        self.timings: Dict[str, List[float]] = {}
+
+    @staticmethod
+    def get_metric_name(span: Span) -> str:
+        """Return name of the metric for the span."""
+        if span.kind == SPAN_BACKEND:
+            name = span.name.split('.', 1)[0]
+        else:
+            name = span.kind
+        return name.lower().replace('_', '-')
+
+    def span_finished(self, span: Span) -> None:
+        name = self.get_metric_name(span)
+        if span.duration is None:
+            return
+        with self._lock:
+            timing = self.timings.setdefault(name, [0, 0.0])
+            timing[0] += 1
+            timing[1] += span.duration
+
+    def get_header(self) -> str:
+        """Return value of the Server-Timing header."""
+        with self._lock:
+            timings = list(self.timings.items())
+        metrics = []
+        for name, (count, duration) in timings:
+            metrics.append('{};dur={:.1f};desc="{} {}"'.format(
+                name, duration * 1000, int(count), 'call' if count == 1 else 'calls'))
+        return ', '.join(metrics)
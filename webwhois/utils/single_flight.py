@@ -0,0 +1,116 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Coalescing of concurrent identical calls.
+
+Only one call per key is in flight, the other callers wait for its result.
+Calls are coalesced in threads of a worker by futures. If a lease timeout is set,
+calls are also coalesced across workers by a lease in the Django cache, the result is passed to other workers
+through the cache as well.
+"""
+import hashlib
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, TypeVar, cast
+
+from django.core.cache import caches
+from django.utils.crypto import get_random_string
+
+from .codec import cache_get, cache_set
+
+T = TypeVar('T')
+_MISSING = object()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key.
+
+    Exceptions are passed only to the callers in the same worker.
+    Callers in other workers will make the call themselves.
+
+    Attributes:
+        lease_timeout: Maximal time in seconds other workers wait for the result. Zero disables the lease.
+        poll_interval: Interval in seconds in which other workers check for the result.
+    """
+
+    def __init__(self, *, lease_timeout: int = 0, poll_interval: float = 0.05, cache_alias: str = 'default'):
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.cache_alias = cache_alias
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, call: Callable[[], T]) -> T:
+        """Return result of the call or result of the call with the same key already in flight."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if future is None:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()  # type: ignore[no-any-return]
+
+        try:
+            result = self._do_shared(key, call)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def _do_shared(self, key: str, call: Callable[[], T]) -> T:
+        """Make the call under a lease or wait for its result from another worker."""
+        if not self.lease_timeout:
+            return call()
+
+        cache = caches[self.cache_alias]
+        cache_key = 'webwhois_flight_{}'.format(hashlib.sha1(key.encode()).hexdigest())
+        lease_key = cache_key + '_lease'
+        token = get_random_string(32)
+        # Accept only results of the calls, which were in flight when we arrived.
+        started = time.time()
+        deadline = time.monotonic() + self.lease_timeout
+        while True:
+            if cache.add(lease_key, token, self.lease_timeout):
+                try:
+                    result = call()
+                    cache_set(cache, cache_key, {'result': result, 'stored': time.time()}, self.lease_timeout)
+                    return result
+                finally:
+                    # The lease may have expired and may be held by another worker.
+                    if cache.get(lease_key) == token:
+                        cache.delete(lease_key)
+            shared = self._get_result(cache_key, started)
+            if shared is not _MISSING:
+                return cast(T, shared)
+            if time.monotonic() >= deadline:
+                # Don't wait for the other worker any longer.
+                return call()
+            time.sleep(self.poll_interval)
+
+    def _get_result(self, cache_key: str, started: float) -> object:
+        """Return result stored by another worker or `_MISSING`."""
+        stored: Optional[Dict] = cache_get(caches[self.cache_alias], cache_key, name='single_flight')
+        if stored is None or stored['stored'] < started:
+            return _MISSING
+        return stored['result']
@@ -0,0 +1,112 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Log of slow requests.
+
+Slow requests are logged by `webwhois.utils.slow_requests` logger as JSON objects with the view, its arguments
+and the ordered list of backend calls including their arguments, durations and errors.
+"""
+import json
+import logging
+import reprlib
+import time
+from threading import Lock
+from typing import Any, Dict, List
+
+from django.http import HttpRequest, HttpResponse
+
+from .instrumentation import SPAN_BACKEND, SPAN_RENDER, SPAN_VIEW, Observer, Span
+
+WEBWHOIS_LOGGING = logging.getLogger(__name__)
+
+_REPR = reprlib.Repr()
+_REPR.maxstring = 100
+_REPR.maxother = 100
+
+
+def _format_value(value: Any) -> Any:
+    """Return JSON serializable representation of the value."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return _REPR.repr(value)
+
+
+class SlowRequestRecorder(Observer):
+    """Observer, which records spans and cache accesses of a request for the log of slow requests.
+
+    Attributes:
+        start: Start of the request from `time.perf_counter`.
+        spans: Finished spans.
+        caches: Counts of cache hits and misses by cache.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self.caches: Dict[str, Dict[str, int]] = {}
+
+    def span_finished(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def cache_accessed(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            counts = self.caches.setdefault(cache, {'hit': 0, 'miss': 0})
+            counts['hit' if hit else 'miss'] += 1
+
+    def get_duration(self) -> float:
+        """Return the duration of the request so far."""
+        return time.perf_counter() - self.start
+
+    def get_record(self, request: HttpRequest, response: HttpResponse) -> Dict[str, Any]:
+        """Return the record of the request for the log."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+            caches = {k: dict(v) for k, v in self.caches.items()}
+        record: Dict[str, Any] = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration': round(self.get_duration(), 6),
+            'view': None,
+            'args': [],
+            'render': None,
+            'calls': [],
+            'caches': caches,
+        }
+        for span in spans:
+            if span.kind == SPAN_VIEW:
+                record['view'] = span.name
+                record['args'] = [_format_value(a) for a in span.args]
+            elif span.kind == SPAN_RENDER:
+                record['render'] = round(span.duration or 0, 6)
+            elif span.kind == SPAN_BACKEND:
+                record['calls'].append({
+                    'name': span.name,
+                    'args': [_format_value(a) for a in span.args],
+                    'start': round(span.start - self.start, 6),
+                    'duration': round(span.duration or 0, 6),
+                    'error': None if span.error is None else _REPR.repr(span.error),
+                })
+        return record
+
+
+def log_slow_request(record: Dict[str, Any]) -> None:
+    """Log the record of a slow request as a JSON object on a single line."""
+    WEBWHOIS_LOGGING.warning('%s', json.dumps(record, default=_format_value))
@@ -0,0 +1,56 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Surrogate keys of cached pages and their purge from edge caches."""
+import logging
+import re
+from typing import Iterable, List
+from urllib.request import Request, urlopen
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+
+WEBWHOIS_LOGGING = logging.getLogger(__name__)
+
+# Keys are separated by whitespace or commas in surrogate key headers.
+_SEPARATORS = re.compile(r'[\s,]+')
+
+
+def make_surrogate_key(object_type: str, handle: str) -> str:
+    """Return surrogate key of a registry object.
+
+    Handles are case insensitive, so keys are lowercased.
+    """
+    return '{}:{}'.format(object_type, _SEPARATORS.sub('_', handle)).lower()
+
+
+def purge_surrogate_keys(keys: Iterable[str]) -> List[str]:
+    """Send purge requests for the surrogate keys to all edge caches and return URLs of failed purges."""
+    keys = sorted(set(keys))
+    failed: List[str] = []
+    if not keys:
+        return failed
+    for url in WEBWHOIS_SETTINGS.PURGE_URLS:
+        request = Request(url, method=WEBWHOIS_SETTINGS.PURGE_METHOD,
+                          headers={WEBWHOIS_SETTINGS.PURGE_HEADER: ' '.join(keys)})
+        try:
+            with urlopen(request, timeout=WEBWHOIS_SETTINGS.PURGE_TIMEOUT):
+                pass
+        except OSError as error:
+            WEBWHOIS_LOGGING.warning("Purge of %s from %s failed: %s", keys, url, error)
+            failed.append(url)
+    return failed
@@ -0,0 +1,112 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""OpenTelemetry tracing of views and backend calls.
+
+Spans are reported by an observer of the instrumentation and they require `opentelemetry-api`.
+Spans are exported only if an OpenTelemetry SDK is configured, otherwise tracing is a no-op.
+"""
+import logging
+import reprlib
+from contextvars import ContextVar
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from django.core.exceptions import ImproperlyConfigured
+
+import webwhois
+
+from .instrumentation import SPAN_BACKEND, Observer, Span
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:
+    trace = None  # type: ignore[assignment]
+
+WEBWHOIS_LOGGING = logging.getLogger(__name__)
+
+# The current OpenTelemetry span of the instrumentation.
+_CURRENT_SPAN: ContextVar[Optional[Any]] = ContextVar('webwhois_tracing_span', default=None)
+
+
+class TracingObserver(Observer):
+    """Reports the instrumented operations as OpenTelemetry spans.
+
+    Spans of the instrumentation started within other spans are reported as their children,
+    including spans started in threads of the executor.
+    """
+
+    def __init__(self, tracer_provider: Optional[Any] = None):
+        if trace is None:
+            raise ImproperlyConfigured('WEBWHOIS_TRACING is set, but opentelemetry-api is not available.')
+        self.tracer = trace.get_tracer('webwhois', webwhois.__version__, tracer_provider=tracer_provider)
+        self._lock = Lock()
+        # id(span) => (OpenTelemetry span, parent OpenTelemetry span)
+        self._spans: Dict[int, Tuple[Any, Optional[Any]]] = {}
+
+    @staticmethod
+    def get_attributes(span: Span) -> Dict[str, Any]:
+        """Return attributes of the OpenTelemetry span."""
+        attributes = {
+            'webwhois.kind': span.kind,
+            'webwhois.args': [a if isinstance(a, str) else reprlib.repr(a) for a in span.args],
+        }
+        if span.kind == SPAN_BACKEND:
+            service, _, method = span.name.rpartition('.')
+            attributes['rpc.service'] = service
+            attributes['rpc.method'] = method
+        return attributes
+
+    def span_started(self, span: Span) -> None:
+        parent = _CURRENT_SPAN.get()
+        context = trace.set_span_in_context(parent) if parent is not None else None
+        kind = SpanKind.CLIENT if span.kind == SPAN_BACKEND else SpanKind.INTERNAL
+        otel_span = self.tracer.start_span(span.name, context=context, kind=kind,
+                                           attributes=self.get_attributes(span))
+        with self._lock:
+            self._spans[id(span)] = (otel_span, parent)
+        _CURRENT_SPAN.set(otel_span)
+
+    def span_finished(self, span: Span) -> None:
+        with self._lock:
+            otel_span, parent = self._spans.pop(id(span), (None, None))
+        if otel_span is None:
+            return
+        if span.error is not None:
+            otel_span.record_exception(span.error)
+            otel_span.set_status(Status(StatusCode.ERROR, '{}: {}'.format(type(span.error).__name__, span.error)))
+        otel_span.end()
+        if _CURRENT_SPAN.get() is otel_span:
+            _CURRENT_SPAN.set(parent)
+
+    def cache_accessed(self, cache: str, hit: bool) -> None:
+        otel_span = _CURRENT_SPAN.get()
+        if otel_span is not None:
+            otel_span.add_event('cache', {'webwhois.cache': cache, 'webwhois.cache.hit': hit})
+
+
+@lru_cache()
+def get_tracing_observer() -> Optional[TracingObserver]:
+    """Return the tracing observer or `None` if OpenTelemetry is not available."""
+    try:
+        return TracingObserver()
+    except ImproperlyConfigured as error:
+        WEBWHOIS_LOGGING.warning('%s Tracing is disabled.', error)
+        return None
@@ -20,26 +20,36 @@
 
 isort:skip_file
 """
-from .detail_contact import ContactDetailMixin, ContactDetailView
-from .detail_keyset import KeysetDetailMixin, KeysetDetailView
-from .detail_nsset import NssetDetailMixin, NssetDetailView
-from .detail_domain import DomainDetailMixin, DomainDetailView
+from .detail_contact import AsyncContactDetailMixin, AsyncContactDetailView, ContactDetailMixin, ContactDetailView
+from .detail_keyset import AsyncKeysetDetailMixin, AsyncKeysetDetailView, KeysetDetailMixin, KeysetDetailView
+from .detail_nsset import AsyncNssetDetailMixin, AsyncNssetDetailView, NssetDetailMixin, NssetDetailView
+from .detail_domain import AsyncDomainDetailMixin, AsyncDomainDetailView, DomainDetailMixin, DomainDetailView
 from .form_whois import WhoisFormView
 from .public_request import BlockObjectFormView, CustomEmailView, EmailInRegistryView, NotarizedLetterView, \
     PersonalInfoFormView, PublicResponseNotFoundView, PublicResponsePdfView, PublicResponseView, SendPasswordFormView, \
     ServeNotarizedLetterView, UnblockObjectFormView
 from .record_statement import ServeRecordStatementView
-from .registrar import DownloadEvalFileView, RegistrarDetailMixin, RegistrarDetailView, RegistrarListMixin, \
+from .registrar import AsyncRegistrarDetailMixin, AsyncRegistrarDetailView, AsyncRegistrarListMixin, \
+    AsyncRegistrarListView, DownloadEvalFileView, RegistrarDetailMixin, RegistrarDetailView, RegistrarListMixin, \
     RegistrarListView
-from .resolve_handle_type import ResolveHandleTypeMixin, ResolveHandleTypeView
-from .scan_results import ScanResultsView
+from .resolve_handle_type import AsyncResolveHandleTypeMixin, AsyncResolveHandleTypeView, ResolveHandleTypeMixin, \
+    ResolveHandleTypeView
+from .api import BatchApiView, ContactApiView, DomainApiView, KeysetApiView, NssetApiView, RegistrarApiView, \
+    RegistryObjectApiMixin
+from .metrics import MetricsView
+from .scan_results import AsyncScanResultsSummaryView, AsyncScanResultsView, ScanResultsExportView, \
+    ScanResultsSummaryView, ScanResultsView
 
-__all__ = ['BlockObjectFormView', 'ContactDetailMixin', 'ContactDetailView', 'CustomEmailView', 'DomainDetailMixin',
-           'DomainDetailView', 'DownloadEvalFileView', 'EmailInRegistryView', 'KeysetDetailMixin', 'KeysetDetailView',
-           'NotarizedLetterView', 'NssetDetailMixin', 'NssetDetailView', 'PersonalInfoFormView',
-           'PublicResponseNotFoundView', 'PublicResponsePdfView', 'PublicResponseView',
-           'RegistrarDetailMixin', 'RegistrarDetailView',
-           'RegistrarListMixin',
-           'RegistrarListView', 'ResolveHandleTypeMixin', 'ResolveHandleTypeView', 'ScanResultsView',
-           'SendPasswordFormView', 'ServeNotarizedLetterView', 'ServeRecordStatementView', 'UnblockObjectFormView',
-           'WhoisFormView']
+__all__ = ['AsyncContactDetailMixin', 'AsyncContactDetailView', 'AsyncDomainDetailMixin', 'AsyncDomainDetailView',
+           'AsyncKeysetDetailMixin', 'AsyncKeysetDetailView', 'AsyncNssetDetailMixin', 'AsyncNssetDetailView',
+           'AsyncRegistrarDetailMixin', 'AsyncRegistrarDetailView', 'AsyncRegistrarListMixin', 'AsyncRegistrarListView',
+           'AsyncResolveHandleTypeMixin', 'AsyncResolveHandleTypeView', 'AsyncScanResultsSummaryView',
+           'AsyncScanResultsView', 'BatchApiView', 'BlockObjectFormView', 'ContactApiView', 'ContactDetailMixin',
+           'ContactDetailView', 'CustomEmailView', 'DomainApiView', 'DomainDetailMixin', 'DomainDetailView',
+           'DownloadEvalFileView', 'EmailInRegistryView', 'KeysetApiView', 'KeysetDetailMixin', 'KeysetDetailView',
+           'MetricsView', 'NotarizedLetterView', 'NssetApiView', 'NssetDetailMixin', 'NssetDetailView',
+           'PersonalInfoFormView', 'PublicResponseNotFoundView', 'PublicResponsePdfView', 'PublicResponseView',
+           'RegistrarApiView', 'RegistrarDetailMixin', 'RegistrarDetailView', 'RegistrarListMixin', 'RegistrarListView',
+           'RegistryObjectApiMixin', 'ResolveHandleTypeMixin', 'ResolveHandleTypeView', 'ScanResultsExportView',
+           'ScanResultsSummaryView', 'ScanResultsView', 'SendPasswordFormView', 'ServeNotarizedLetterView',
+           'ServeRecordStatementView', 'UnblockObjectFormView', 'WhoisFormView']
@@ -0,0 +1,375 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""JSON views with details of registry objects.
+
+Data are loaded the same way as in the detail views and serialized with the same disclose rules as in the templates.
+"""
+import json
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import translation
+from django.utils.decorators import method_decorator
+from django.utils.html import strip_tags
+from django.utils.translation import get_language
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from webwhois.constants import STATUS_DELETE_CANDIDATE
+from webwhois.settings import WEBWHOIS_SETTINGS
+from webwhois.utils.executor import submit
+
+from ..exceptions import WebwhoisError
+from .detail_contact import ContactDetailMixin
+from .detail_domain import DomainDetailMixin
+from .detail_keyset import KeysetDetailMixin
+from .detail_nsset import NssetDetailMixin
+from .registrar import RegistrarDetailMixin
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+def _json_dumps(data: Any) -> bytes:
+    """Serialize data to compact JSON by the standard library encoder."""
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def _orjson_dumps(data: Any) -> bytes:
+    """Serialize data to JSON by a fast `orjson` encoder with the same output as `_json_dumps`."""
+    # Dates and times are formatted by `DjangoJSONEncoder`, e.g. microseconds are truncated to milliseconds.
+    return orjson.dumps(data, default=DjangoJSONEncoder().default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+# Serialize data to JSON, by `orjson` if it's installed.
+dumps = _json_dumps if orjson is None else _orjson_dumps
+
+
+def serialize_address(address: Any) -> Optional[Dict[str, Any]]:
+    """Return place address as a dictionary."""
+    if address is None:
+        return None
+    return {'street': [s for s in (address.street1, address.street2, address.street3) if s],
+            'city': address.city, 'state_or_province': address.stateorprovince or None,
+            'postal_code': address.postalcode, 'country_code': address.country_code}
+
+
+def serialize_contact_brief(contact: Any) -> Dict[str, Any]:
+    """Return contact reference with its public name as displayed in the templates."""
+    data = {'handle': contact.handle}
+    if contact.organization.value:
+        if contact.organization.disclose:
+            data['organization'] = contact.organization.value
+    elif contact.name.disclose:
+        data['name'] = contact.name.value
+    return data
+
+
+def serialize_registrar_brief(handle: str, registrar: Any) -> Dict[str, Any]:
+    """Return registrar reference."""
+    return {'handle': handle, 'name': getattr(registrar, 'name', None)}
+
+
+def serialize_contact(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return contact from the registry objects context."""
+    contact = data['detail']
+    result = {
+        'handle': contact.handle,
+        'sponsoring_registrar': serialize_registrar_brief(contact.sponsoring_registrar_handle,
+                                                          data.get('sponsoring_registrar')),
+        'statuses': list(contact.statuses),
+        'is_linked': data['is_linked'],
+    }
+    # Personal data are displayed only for linked contacts.
+    if not data['is_linked']:
+        return result
+
+    not_disclosed = []
+    for field in ('organization', 'name', 'vat_number', 'email', 'notify_email', 'phone', 'fax'):
+        value = getattr(contact, field)
+        if value.disclose:
+            result[field] = value.value
+        else:
+            not_disclosed.append(field)
+    if contact.identification.disclose:
+        identification = contact.identification.value
+        if identification.identification_type == 'BIRTHDAY':
+            value = data['birthday']
+        else:
+            value = identification.identification_data
+        result['identification'] = {'type': identification.identification_type, 'value': value}
+    else:
+        not_disclosed.append('identification')
+    if contact.address.disclose:
+        result['address'] = serialize_address(contact.address.value)
+    else:
+        not_disclosed.append('address')
+    result.update({
+        'not_disclosed': not_disclosed,
+        'created': contact.created,
+        'changed': contact.changed,
+        'last_transfer': contact.last_transfer,
+        'creating_registrar': serialize_registrar_brief(contact.creating_registrar_handle,
+                                                        data.get('creating_registrar'))
+        if contact.creating_registrar_handle else None,
+        'verification_status': [status['code'] for status in data['verification_status']],
+        'status_descriptions': data['status_descriptions'],
+    })
+    return result
+
+
+def serialize_nsset(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return nsset from the registry objects context."""
+    nsset = data['detail']
+    return {
+        'handle': nsset.handle,
+        'nameservers': [{'fqdn': ns.fqdn, 'ip_addresses': [ip.address for ip in ns.ip_addresses]}
+                        for ns in nsset.nservers],
+        'tech_contacts': [serialize_contact_brief(admin) for admin in data['admins']],
+        'registrar': serialize_registrar_brief(nsset.registrar_handle, data['registrar']),
+        'created': nsset.created,
+        'last_transfer': nsset.last_transfer,
+        'statuses': list(nsset.statuses),
+        'status_descriptions': data['status_descriptions'],
+    }
+
+
+def serialize_keyset(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return keyset from the registry objects context."""
+    keyset = data['detail']
+    return {
+        'handle': keyset.handle,
+        'dns_keys': [{'flags': key.flags, 'protocol': key.protocol, 'alg': key.alg, 'public_key': key.public_key}
+                     for key in keyset.dns_keys],
+        'tech_contacts': [serialize_contact_brief(admin) for admin in data['admins']],
+        'registrar': serialize_registrar_brief(keyset.registrar_handle, data['registrar']),
+        'created': keyset.created,
+        'last_transfer': keyset.last_transfer,
+        'statuses': list(keyset.statuses),
+        'status_descriptions': data['status_descriptions'],
+    }
+
+
+def serialize_domain(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return domain from the registry objects context."""
+    domain = data['detail']
+    # Only a status is displayed for delete candidates.
+    if STATUS_DELETE_CANDIDATE in domain.statuses:
+        return {'handle': domain.handle, 'statuses': [STATUS_DELETE_CANDIDATE]}
+    return {
+        'handle': domain.handle,
+        'registered': domain.registered,
+        'changed': domain.changed,
+        'expire': domain.expire,
+        'validated_to': domain.validated_to,
+        'registrant': serialize_contact_brief(data['registrant']),
+        'admins': [serialize_contact_brief(admin) for admin in data['admins']],
+        'registrar': serialize_registrar_brief(domain.registrar_handle, data['registrar']),
+        'last_transfer': domain.last_transfer,
+        'dnssec': bool(domain.keyset_handle),
+        'nsset': serialize_nsset(data['nsset']) if 'nsset' in data else None,
+        'keyset': serialize_keyset(data['keyset']) if 'keyset' in data else None,
+        'statuses': list(domain.statuses),
+        'status_descriptions': data['status_descriptions'],
+    }
+
+
+def serialize_registrar(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return registrar from the registry objects context."""
+    registrar = data['detail']
+    return {
+        'handle': registrar.handle,
+        'name': registrar.name,
+        'phone': registrar.phone,
+        'fax': registrar.fax,
+        'url': registrar.url,
+        'address': serialize_address(registrar.address) if registrar.address.city else None,
+    }
+
+
+class RegistryObjectApiMixin:
+    """Mixin for JSON views with details of a registry object.
+
+    Must be combined with a detail mixin, which loads the registry objects.
+    """
+
+    # Error codes, which are responded by 404 Not Found. Other errors are responded by 400 Bad Request.
+    not_found_codes: List[str] = ['OBJECT_NOT_FOUND', 'UNMANAGED_ZONE']
+
+    def serialize(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Return serialized registry object."""
+        raise NotImplementedError
+
+    def serialize_error(self, error: WebwhoisError) -> Dict[str, Any]:
+        """Return serialized webwhois error."""
+        return {'error': {'code': error.code, 'title': str(error.title),
+                          'message': strip_tags(str(error.message)) if error.message else None}}
+
+    def get_result(self) -> Tuple[int, Dict[str, Any]]:
+        """Return HTTP status and either serialized registry object or an error."""
+        context = self._get_registry_objects()  # type: ignore[attr-defined]
+        error = context.get('server_exception')
+        if error is not None:
+            return 404 if error.code in self.not_found_codes else 400, self.serialize_error(error)
+        data = context[self._registry_objects_key][self.object_type_name]  # type: ignore[attr-defined]
+        return 200, self.serialize(data)
+
+    def get(self, request, *args, **kwargs):
+        status, result = self.get_result()
+        response = HttpResponse(dumps(result), status=status, content_type='application/json')
+        self._patch_stale_headers(response)  # type: ignore[attr-defined]
+        return response
+
+
+class ContactApiView(RegistryObjectApiMixin, ContactDetailMixin, View):
+    """JSON view with details of a contact."""
+
+    def serialize(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return serialize_contact(data)
+
+
+class NssetApiView(RegistryObjectApiMixin, NssetDetailMixin, View):
+    """JSON view with details of a nsset."""
+
+    def serialize(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return serialize_nsset(data)
+
+
+class KeysetApiView(RegistryObjectApiMixin, KeysetDetailMixin, View):
+    """JSON view with details of a keyset."""
+
+    def serialize(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return serialize_keyset(data)
+
+
+class DomainApiView(RegistryObjectApiMixin, DomainDetailMixin, View):
+    """JSON view with details of a domain."""
+
+    def serialize(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return serialize_domain(data)
+
+
+class RegistrarApiView(RegistryObjectApiMixin, RegistrarDetailMixin, View):
+    """JSON view with details of a registrar."""
+
+    def serialize(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return serialize_registrar(data)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class BatchApiView(View):
+    """Streams details of multiple registry objects of the same type as NDJSON.
+
+    Request body is a JSON object with a list of `handles` and an object `type`, `domain` by default.
+    Objects are looked up concurrently in the bounded executor and each line is sent as soon as its lookup completes.
+    """
+
+    http_method_names = ['post', 'options']
+    views: Dict[str, Type[RegistryObjectApiMixin]] = {
+        'contact': ContactApiView,
+        'nsset': NssetApiView,
+        'keyset': KeysetApiView,
+        'domain': DomainApiView,
+        'registrar': RegistrarApiView,
+    }
+
+    def post(self, request, *args, **kwargs):
+        try:
+            object_type, handles = self.parse_request()
+        except ValueError as error:
+            result = {'error': {'code': 'INVALID_REQUEST', 'title': 'Invalid request', 'message': str(error)}}
+            return HttpResponse(dumps(result), status=400, content_type='application/json')
+        lines = (dumps(line) + b'\n' for line in self.lookup(object_type, handles))
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
+    def parse_request(self) -> Tuple[str, List[str]]:
+        """Return object type and unique handles from the request body.
+
+        Raises:
+            ValueError: If the request is not valid.
+        """
+        try:
+            data = json.loads(self.request.body)
+        except ValueError as error:
+            raise ValueError('Request body is not a valid JSON.') from error
+        if not isinstance(data, dict):
+            raise ValueError('Request body must be a JSON object.')
+        object_type = data.get('type', 'domain')
+        if object_type not in self.views:
+            raise ValueError('Unknown object type {!r}.'.format(object_type))
+        handles = data.get('handles')
+        if not isinstance(handles, list) or not all(isinstance(h, str) for h in handles):
+            raise ValueError('Handles must be a list of strings.')
+        handles = list(dict.fromkeys(handles))
+        if len(handles) > WEBWHOIS_SETTINGS.BATCH_MAX_SIZE:
+            raise ValueError('At most {} handles are allowed.'.format(WEBWHOIS_SETTINGS.BATCH_MAX_SIZE))
+        return object_type, handles
+
+    def lookup(self, object_type: str, handles: List[str]) -> Iterator[Dict[str, Any]]:
+        """Yield results of lookups in the order of completion.
+
+        Only a limited number of lookups is scheduled at once, so a single batch doesn't occupy the whole executor.
+        """
+        language = get_language()
+        pending = iter(handles)
+        running: Dict['Future[Tuple[int, Dict[str, Any]]]', str] = {}
+        try:
+            while True:
+                while len(running) < max(WEBWHOIS_SETTINGS.BATCH_MAX_RUNNING, 1):
+                    handle = next(pending, None)
+                    if handle is None:
+                        break
+                    running[submit(self.lookup_object, object_type, handle, language)] = handle
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self.make_line(running.pop(future), future)
+        finally:
+            # Don't look up objects, which won't be sent, e.g. if the client disconnects.
+            for future in running:
+                future.cancel()
+
+    def lookup_object(self, object_type: str, handle: str, language: str) -> Tuple[int, Dict[str, Any]]:
+        """Look up the registry object and return HTTP status and the serialized result."""
+        view = self.views[object_type]()
+        view.setup(self.request, handle=handle)  # type: ignore[attr-defined]
+        with translation.override(language):
+            return view.get_result()
+
+    @staticmethod
+    def make_line(handle: str, future: 'Future[Tuple[int, Dict[str, Any]]]') -> Dict[str, Any]:
+        """Return NDJSON line for a completed lookup."""
+        line: Dict[str, Any] = {'handle': handle}
+        try:
+            status, result = future.result()
+        except Exception as error:
+            line.update(status=500, error={'code': 'SERVER_ERROR', 'title': 'Server error',
+                                           'message': error.__class__.__name__})
+            return line
+        line['status'] = status
+        if status == 200:
+            line['object'] = result
+        else:
+            line.update(result)
+        return line
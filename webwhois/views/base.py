@@ -16,18 +16,33 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
+import asyncio
+import hashlib
 import warnings
 from functools import lru_cache
-from typing import Any, Dict, Optional
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple, Type, cast
 
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
 from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.functional import lazy
 from django.utils.html import escape
+from django.utils.http import urlencode
 from django.utils.safestring import mark_safe
-from django.utils.translation import get_language, gettext_lazy as _
+from django.utils.translation import get_language, get_language_from_path, gettext_lazy as _
 from django.views.generic.base import ContextMixin
+from grpc import RpcError
+from omniORB import CORBA
 
+from webwhois.settings import WEBWHOIS_SETTINGS
 from webwhois.utils import LOGGER
+from webwhois.utils.codec import cache_get, cache_set
+from webwhois.utils.executor import run_sync, sync_context
+from webwhois.utils.instrumentation import SPAN_STATUS_DESCRIPTIONS, measure
+from webwhois.utils.surrogate_keys import make_surrogate_key
 
 from ..constants import STATUS_DELETE_CANDIDATE, LogEntryType, LogResult
 from ..exceptions import WebwhoisError
@@ -66,6 +81,12 @@ class RegistryObjectMixin(BaseContextMixin):
     server_exception_template = "webwhois/server_exception.html"
     object_type_name = None  # type: str
     log_entry_type = LogEntryType.INFO
+    # Backend errors, which cause the last known good copy of registry objects to be served.
+    stale_if_error_exceptions: Tuple[Type[BaseException], ...] = (
+        CORBA.TRANSIENT, CORBA.OBJECT_NOT_EXIST, CORBA.COMM_FAILURE, RpcError)
+    _backend_unavailable_key = 'webwhois_backend_unavailable'
+    # Query parameters, which change the page. Other parameters are ignored by the page cache.
+    page_cache_query_params: Tuple[str, ...] = ()
 
     @staticmethod
     def _get_status_descriptions(type_name, fnc_get_descriptions):
@@ -75,11 +96,12 @@ class RegistryObjectMixin(BaseContextMixin):
         """
         lang = get_language()
         cache_key = "webwhois_descr_%s_%s" % (lang, type_name)
-        descripts = cache.get(cache_key)
-        if not descripts:
-            descripts = {object_status_desc.handle: object_status_desc.name
-                         for object_status_desc in fnc_get_descriptions(lang)}
-            cache.set(cache_key, descripts)
+        with measure(SPAN_STATUS_DESCRIPTIONS, type_name, (lang,)):
+            descripts = cache_get(cache, cache_key, name='status_descriptions')
+            if not descripts:
+                descripts = {object_status_desc.handle: object_status_desc.name
+                             for object_status_desc in fnc_get_descriptions(lang)}
+                cache_set(cache, cache_key, descripts)
         return descripts
 
     @staticmethod
@@ -109,43 +131,114 @@ class RegistryObjectMixin(BaseContextMixin):
     def _get_registry_objects(self):
         """Return a dict with objects loaded from the registry."""
         if self._registry_objects_cache is None:
-            context = {self._registry_objects_key: {}}  # type: Dict[str, Any]
-            properties = {"handle": self.kwargs["handle"], "handleType": self.object_type_name}
-            with LOGGER.create(self.log_entry_type, source_ip=self.request.META.get('REMOTE_ADDR', ''),
-                               properties=properties) as log_entry:
+            context = self._get_stale_registry_objects()
+            if context is None:
                 try:
-                    default_load = self.load_registry_object.__func__  # type: ignore[attr-defined]
-                    if default_load.__module__.startswith('webwhois.views'):
-                        obj = self.get_object()
-                        context[self._registry_objects_key] = self._make_context(obj)
-                    else:
-                        warnings.warn(
-                            "Method load_registry_object is deprecated, use get_object or get_context_data instead.",
-                            DeprecationWarning)
-                        self.load_registry_object(context, self.kwargs["handle"])
-
-                except WebwhoisError as error:
-                    context['server_exception'] = error
-                except BaseException as error:
-                    log_entry.result = LogResult.ERROR
-                    log_entry.properties["exception"] = error.__class__.__name__
-                    raise
-
-                # It's here to handle `load_registry_object` results. Can be refactored, when removed.
-                found_types = sorted(context.get(self._registry_objects_key, {}).keys())
-                if len(found_types):
-                    log_entry.result = LogResult.SUCCESS
-                    log_entry.properties["foundType"] = found_types
+                    context = self._load_registry_objects()
+                    if len(context[self._registry_objects_key]) == 1:
+                        self.load_related_objects(context)
+                except self.stale_if_error_exceptions:
+                    context = self._get_stale_registry_objects(backend_failed=True)
+                    if context is None:
+                        raise
                 else:
-                    log_entry.result = LogResult.NOT_FOUND
-                    webwhois_error = context.get("server_exception")
-                    if webwhois_error and webwhois_error.code != "OBJECT_NOT_FOUND":
-                        log_entry.properties["reason"] = webwhois_error.code
-            if len(context[self._registry_objects_key]) == 1:
-                self.load_related_objects(context)
+                    self._store_stale_registry_objects(context)
             self._registry_objects_cache = context
         return self._registry_objects_cache
 
+    def get_stale_cache_key(self) -> str:
+        """Return cache key of the last known good copy of the registry objects."""
+        key = '\n'.join((str(self.object_type_name), self.kwargs['handle'], get_language()))
+        return 'webwhois_stale_{}'.format(hashlib.sha1(key.encode()).hexdigest())
+
+    def _store_stale_registry_objects(self, context: Dict[str, Any]) -> None:
+        """Store the registry objects as the last known good copy, if they were found."""
+        if not WEBWHOIS_SETTINGS.STALE_IF_ERROR_TIMEOUT:
+            return
+        if 'server_exception' in context or not context[self._registry_objects_key]:
+            return
+        stale = {'context': context, 'stored': timezone.now()}
+        cache_set(cache, self.get_stale_cache_key(), stale, WEBWHOIS_SETTINGS.STALE_IF_ERROR_TIMEOUT)
+
+    def _get_stale_registry_objects(self, backend_failed: bool = False) -> Optional[Dict[str, Any]]:
+        """Return the last known good copy of the registry objects, if the backend is unavailable.
+
+        When backend fails, it's considered unavailable for `STALE_IF_ERROR_BACKOFF` seconds.
+        Meanwhile the copies are served without any backend calls, so the recovering backend isn't overloaded.
+        Searches served without backend calls are logged here, failed backend calls are logged as errors on load.
+        """
+        if not WEBWHOIS_SETTINGS.STALE_IF_ERROR_TIMEOUT:
+            return None
+        if backend_failed:
+            cache.set(self._backend_unavailable_key, True, WEBWHOIS_SETTINGS.STALE_IF_ERROR_BACKOFF)
+        elif not cache.get(self._backend_unavailable_key):
+            return None
+        stale = cache_get(cache, self.get_stale_cache_key(), name='stale')
+        if stale is None:
+            return None
+        context = cast(Dict[str, Any], stale['context'])
+        context['stale_since'] = stale['stored']
+        if not backend_failed:
+            with self._create_log_entry() as log_entry:
+                self._log_result(log_entry, context)
+        return context
+
+    def _patch_stale_headers(self, response: HttpResponse) -> None:
+        """Add headers to response with the last known good copy of the registry objects."""
+        context = self._get_registry_objects()
+        if 'stale_since' in context:
+            response['Warning'] = '110 - "Response is Stale"'
+            response['Age'] = str(max(int((timezone.now() - context['stale_since']).total_seconds()), 0))
+
+    def _uses_get_object(self) -> bool:
+        """Return whether objects are loaded by `get_object` rather than deprecated `load_registry_object`."""
+        default_load = self.load_registry_object.__func__  # type: ignore[attr-defined]
+        return cast(bool, default_load.__module__.startswith('webwhois.views'))
+
+    def _create_log_entry(self) -> ContextManager[Any]:
+        """Return a context manager with a log entry for the registry object search."""
+        properties = {"handle": self.kwargs["handle"], "handleType": self.object_type_name}
+        return LOGGER.create(self.log_entry_type,
+                             source_ip=self.request.META.get('REMOTE_ADDR', ''),
+                             properties=properties)
+
+    def _log_result(self, log_entry: Any, context: Dict[str, Any]) -> None:
+        """Store result of the registry object search into the log entry."""
+        # It's here to handle `load_registry_object` results. Can be refactored, when removed.
+        found_types = sorted(context.get(self._registry_objects_key, {}).keys())
+        if len(found_types):
+            log_entry.result = LogResult.SUCCESS
+            log_entry.properties["foundType"] = found_types
+        else:
+            log_entry.result = LogResult.NOT_FOUND
+            webwhois_error = context.get("server_exception")
+            if webwhois_error and webwhois_error.code != "OBJECT_NOT_FOUND":
+                log_entry.properties["reason"] = webwhois_error.code
+
+    def _load_registry_objects(self) -> Dict[str, Any]:
+        """Load the main registry objects and log the search."""
+        context = {self._registry_objects_key: {}}  # type: Dict[str, Any]
+        with self._create_log_entry() as log_entry:
+            try:
+                if self._uses_get_object():
+                    obj = self.get_object()
+                    context[self._registry_objects_key] = self._make_context(obj)
+                else:
+                    warnings.warn(
+                        "Method load_registry_object is deprecated, use get_object or get_context_data instead.",
+                        DeprecationWarning)
+                    self.load_registry_object(context, self.kwargs["handle"])
+
+            except WebwhoisError as error:
+                context['server_exception'] = error
+            except BaseException as error:
+                log_entry.result = LogResult.ERROR
+                log_entry.properties["exception"] = error.__class__.__name__
+                raise
+
+            self._log_result(log_entry, context)
+        return context
+
     def _make_context(self, obj: Any) -> Dict[str, Any]:
         """Turn object into a context."""
         return {self.object_type_name: {"detail": obj}}
@@ -187,3 +280,246 @@ class RegistryObjectMixin(BaseContextMixin):
         if "server_exception" in context:
             return [self.server_exception_template]
         return super(RegistryObjectMixin, self).get_template_names()
+
+    def _iter_registry_objects(self, data: Any) -> Iterator[Any]:
+        """Yield all registry objects, i.e. main and related objects, from the data."""
+        if isinstance(data, dict):
+            for value in data.values():
+                yield from self._iter_registry_objects(value)
+        elif isinstance(data, (list, tuple)):
+            for value in data:
+                yield from self._iter_registry_objects(value)
+        elif hasattr(data, 'handle'):
+            yield data
+
+    def get_etag(self) -> Optional[str]:
+        """Return ETag of the registry objects.
+
+        ETag is a digest of complete main and related objects and the language, so any change of displayed data changes
+        it. Timestamps of the objects are not used as validators, because not all changes are reflected in them,
+        e.g. changes of related objects or registrars, which don't have any.
+        Returns `None` if there are no objects to validate, e.g. if an error occured, or they may be outdated.
+        """
+        context = self._get_registry_objects()
+        if 'server_exception' in context or 'stale_since' in context or not context[self._registry_objects_key]:
+            return None
+        state = [get_language()]
+        for obj in self._iter_registry_objects(context[self._registry_objects_key]):
+            state.append('{}:{!r}'.format(type(obj).__name__, obj))
+        return 'W/"{}"'.format(hashlib.sha1('\n'.join(state).encode()).hexdigest())
+
+    def get_page_cache_timeout(self) -> int:
+        """Return timeout of the cached page, `0` if the page shouldn't be cached."""
+        return cast(int, WEBWHOIS_SETTINGS.PAGE_CACHE_TIMEOUTS.get(self.object_type_name, 0))
+
+    def get_page_cache_key(self) -> str:
+        """Return cache key of the page based on its path, query parameters, language and URL namespace.
+
+        Only parameters from `page_cache_query_params` are included, so arbitrary parameters don't flood the cache.
+        """
+        query = urlencode(sorted((name, value) for name in set(self.page_cache_query_params)
+                                 for value in self.request.GET.getlist(name)))
+        key = '\n'.join((self.request.path, query, get_language(), self.request.resolver_match.namespace))
+        return 'webwhois_page_{}'.format(hashlib.sha1(key.encode()).hexdigest())
+
+    @lru_cache()
+    def get_cached_page(self) -> Optional[Dict[str, Any]]:
+        """Return the page from the cache or `None`."""
+        if not self.get_page_cache_timeout():
+            return None
+        return cast(Optional[Dict[str, Any]], cache_get(cache, self.get_page_cache_key(), name='page'))
+
+    def _cache_page(self, response: HttpResponse) -> None:
+        """Store the rendered page into the cache, unless it's an error or it's too large."""
+        context = self._get_registry_objects()
+        if response.status_code != 200 or 'server_exception' in context:
+            return
+        if len(response.content) > WEBWHOIS_SETTINGS.PAGE_CACHE_MAX_SIZE:
+            return
+        cached_headers = ('ETag', WEBWHOIS_SETTINGS.SURROGATE_KEY_HEADER)
+        page = {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'headers': {header: response[header] for header in cached_headers if header and header in response},
+            'found_types': sorted(context[self._registry_objects_key].keys()),
+        }
+        cache_set(cache, self.get_page_cache_key(), page, self.get_page_cache_timeout())
+
+    def _get_cached_response(self, page: Dict[str, Any]) -> HttpResponse:
+        """Log the search and return response with the cached page."""
+        with self._create_log_entry() as log_entry:
+            log_entry.result = LogResult.SUCCESS
+            log_entry.properties["foundType"] = page['found_types']
+        headers = page['headers']
+        response = get_conditional_response(self.request, etag=headers.get('ETag'))
+        if response is None:
+            response = HttpResponse(page['content'], content_type=page['content_type'])
+        for header, value in headers.items():
+            response[header] = value
+        self._patch_cache_control(response)
+        return response
+
+    def get_surrogate_keys(self) -> List[str]:
+        """Return surrogate keys of all registry objects displayed on the page."""
+        context = self._get_registry_objects()
+        objects = self._iter_registry_objects(context[self._registry_objects_key])
+        return sorted({make_surrogate_key(type(obj).__name__, obj.handle) for obj in objects})
+
+    def _is_language_from_cookie(self) -> bool:
+        """Return whether the language may be selected by a cookie rather than by the URL or Accept-Language."""
+        if get_language_from_path(self.request.path_info):
+            return False
+        return settings.LANGUAGE_COOKIE_NAME in self.request.COOKIES
+
+    def _patch_cache_control(self, response: HttpResponse) -> None:
+        """Add headers which control caching in browsers and edge caches.
+
+        Pages in a language selected by a cookie are private, because caches vary them only by Accept-Language.
+        """
+        if self._is_language_from_cookie():
+            if WEBWHOIS_SETTINGS.CACHE_CONTROL or WEBWHOIS_SETTINGS.SURROGATE_CONTROL:
+                patch_cache_control(response, private=True)
+            return
+        if WEBWHOIS_SETTINGS.CACHE_CONTROL:
+            response['Cache-Control'] = WEBWHOIS_SETTINGS.CACHE_CONTROL
+        if WEBWHOIS_SETTINGS.SURROGATE_CONTROL:
+            response['Surrogate-Control'] = WEBWHOIS_SETTINGS.SURROGATE_CONTROL
+
+    def _patch_cache_headers(self, response: HttpResponse) -> None:
+        """Add cache headers to response with registry objects."""
+        self._patch_cache_control(response)
+        if WEBWHOIS_SETTINGS.SURROGATE_KEY_HEADER:
+            response[WEBWHOIS_SETTINGS.SURROGATE_KEY_HEADER] = ' '.join(self.get_surrogate_keys())
+
+    def get(self, request, *args, **kwargs):
+        page = self.get_cached_page()
+        if page is not None:
+            return self._get_cached_response(page)
+
+        if 'stale_since' in self._get_registry_objects():
+            response = super().get(request, *args, **kwargs)
+            self._patch_stale_headers(response)
+            return response
+
+        # Registry objects are loaded anyway, but the template is rendered only if the client doesn't have it.
+        etag = self.get_etag()
+        response = None
+        if etag is not None:
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                self._patch_cache_headers(response)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if etag is not None and response.status_code == 200:
+                response['ETag'] = etag
+                self._patch_cache_headers(response)
+            if self.get_page_cache_timeout() and hasattr(response, 'add_post_render_callback'):
+                response.add_post_render_callback(self._cache_page)
+        return response
+
+
+class AsyncViewMixin:
+    """Mixin for views with asynchronous request handlers.
+
+    Blocking backend calls are expected to run in the bounded executor, see `webwhois.utils.executor`.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)  # type: ignore[misc]
+        # Django older than 4.1 doesn't detect asynchronous class-based views.
+        return markcoroutinefunction(view)
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)  # type: ignore[misc]
+        if asyncio.iscoroutine(response):
+            return response
+        # Responses of synchronous handlers, e.g. `options`, has to be awaitable as well.
+        return self._as_coroutine(response)
+
+    @staticmethod
+    async def _as_coroutine(value: Any) -> Any:
+        return value
+
+
+class AsyncRegistryObjectMixin(AsyncViewMixin, RegistryObjectMixin):
+    """Asynchronous variant of `RegistryObjectMixin`.
+
+    Registry objects are loaded before the response is rendered, independent backend calls run concurrently.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        page = await run_sync(self.get_cached_page)()
+        if page is not None:
+            return await run_sync(self._get_cached_response)(page)
+        context = await self.aget_registry_objects()
+        await self.aload_context_data(context)
+        # All blocking calls are made in advance, the synchronous handler only builds the response.
+        return super().get(request, *args, **kwargs)
+
+    async def aload_context_data(self, context: Dict[str, Any]) -> None:
+        """Load data from backend required by the context data, other than the registry objects."""
+
+    async def aget_registry_objects(self) -> Dict[str, Any]:
+        """Return a dict with objects loaded from the registry."""
+        if self._registry_objects_cache is None:
+            if not WEBWHOIS_SETTINGS.STALE_IF_ERROR_TIMEOUT:
+                self._registry_objects_cache = await self._aload_all_registry_objects()
+                return self._registry_objects_cache
+
+            context = await run_sync(self._get_stale_registry_objects)()
+            if context is None:
+                try:
+                    context = await self._aload_all_registry_objects()
+                except self.stale_if_error_exceptions:
+                    context = await run_sync(self._get_stale_registry_objects)(backend_failed=True)
+                    if context is None:
+                        raise
+                else:
+                    await run_sync(self._store_stale_registry_objects)(context)
+            self._registry_objects_cache = context
+        return self._registry_objects_cache
+
+    async def _aload_all_registry_objects(self) -> Dict[str, Any]:
+        """Load the main registry objects and their related objects."""
+        context = await self._aload_registry_objects()
+        if len(context[self._registry_objects_key]) == 1:
+            await self.aload_related_objects(context)
+        return context
+
+    async def _aload_registry_objects(self) -> Dict[str, Any]:
+        """Load the main registry objects and log the search."""
+        if not self._uses_get_object():
+            return await run_sync(self._load_registry_objects)()
+
+        context = {self._registry_objects_key: {}}  # type: Dict[str, Any]
+        async with sync_context(self._create_log_entry()) as log_entry:
+            try:
+                obj = await self.aget_object()
+                context[self._registry_objects_key] = self._make_context(obj)
+            except WebwhoisError as error:
+                context['server_exception'] = error
+            except BaseException as error:
+                log_entry.result = LogResult.ERROR
+                log_entry.properties["exception"] = error.__class__.__name__
+                raise
+
+            self._log_result(log_entry, context)
+        return context
+
+    async def aget_object(self) -> Any:
+        """Fetch and return an object from registry.
+
+        Raises:
+            WebwhoisError: If an expected error is returned from registry backend.
+        """
+        return await run_sync(self.get_object)()
+
+    async def aload_related_objects(self, context: Dict[str, Any]) -> None:
+        """Load objects related to the main registry object and append them into the context."""
+        await run_sync(self.load_related_objects)(context)
+
+    @classmethod
+    async def _aget_status_descriptions(cls, type_name, fnc_get_descriptions):
+        """Get status descriptions from the cache or a backend."""
+        return await run_sync(cls._get_status_descriptions)(type_name, fnc_get_descriptions)
@@ -17,7 +17,7 @@
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
 import datetime
-from typing import Any, Dict
+from typing import Any, Awaitable, Dict
 
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import TemplateView
@@ -25,8 +25,9 @@ from fred_idl.Registry.Whois import INVALID_HANDLE, OBJECT_NOT_FOUND
 
 from webwhois.constants import (STATUS_CONDITIONALLY_IDENTIFIED, STATUS_IDENTIFIED, STATUS_LINKED, STATUS_VALIDATED,
                                 STATUS_VERIFICATION_FAILED, STATUS_VERIFICATION_IN_PROCESS, STATUS_VERIFICATION_PASSED)
-from webwhois.utils import WHOIS
-from webwhois.views.base import RegistryObjectMixin
+from webwhois.utils.backend import get_backend
+from webwhois.utils.executor import gather_mapping, run_sync
+from webwhois.views.base import AsyncRegistryObjectMixin, RegistryObjectMixin
 
 from ..exceptions import WebwhoisError
 
@@ -50,7 +51,7 @@ class ContactDetailMixin(RegistryObjectMixin):
     def load_registry_object(cls, context, handle):
         """Load contact of the handle and append it into the context."""
         try:
-            contact = WHOIS.get_contact_by_handle(handle)
+            contact = get_backend().get_contact_by_handle(handle)
             birthday = None
             if contact.identification.value.identification_type == "BIRTHDAY":
                 try:
@@ -74,7 +75,7 @@ class ContactDetailMixin(RegistryObjectMixin):
 
     def _get_object(self, handle: str) -> Any:
         try:
-            return WHOIS.get_contact_by_handle(handle)
+            return get_backend().get_contact_by_handle(handle)
         except OBJECT_NOT_FOUND as error:
             raise WebwhoisError(
                 'OBJECT_NOT_FOUND',
@@ -100,10 +101,19 @@ class ContactDetailMixin(RegistryObjectMixin):
 
     def load_related_objects(self, context):
         """Load objects related to the contact and append them into the context."""
-        descriptions = self._get_status_descriptions("contact", WHOIS.get_contact_status_descriptions)
+        backend = get_backend()
+        descriptions = self._get_status_descriptions("contact", backend.get_contact_status_descriptions)
         data = context[self._registry_objects_key]["contact"]  # detail, type, label, href
         registry_object = data["detail"]
+        self._append_statuses(data, descriptions)
+        if registry_object.creating_registrar_handle:
+            data["creating_registrar"] = backend.get_registrar_by_handle(registry_object.creating_registrar_handle)
+        if registry_object.sponsoring_registrar_handle:
+            data["sponsoring_registrar"] = backend.get_registrar_by_handle(registry_object.sponsoring_registrar_handle)
 
+    def _append_statuses(self, data: Dict[str, Any], descriptions: Dict[str, str]) -> None:
+        """Append statuses of the contact into the data context."""
+        registry_object = data["detail"]
         ver_status = [{"code": key, "label": descriptions[key],
                        "icon": self.VERIFICATION_STATUS_ICON.get(key, self.VERIFICATION_STATUS_ICON["DEFAULT"])}
                       for key in registry_object.statuses if key in self.CONTACT_VERIFICATION_STATUS]
@@ -113,11 +123,33 @@ class ContactDetailMixin(RegistryObjectMixin):
             "verification_status": ver_status,
             "is_linked": STATUS_LINKED in registry_object.statuses
         })
-        if registry_object.creating_registrar_handle:
-            data["creating_registrar"] = WHOIS.get_registrar_by_handle(registry_object.creating_registrar_handle)
-        if registry_object.sponsoring_registrar_handle:
-            data["sponsoring_registrar"] = WHOIS.get_registrar_by_handle(registry_object.sponsoring_registrar_handle)
 
 
 class ContactDetailView(ContactDetailMixin, TemplateView):
     """View with details of a contact."""
+
+
+class AsyncContactDetailMixin(AsyncRegistryObjectMixin, ContactDetailMixin):
+    """Asynchronous variant of `ContactDetailMixin`."""
+
+    async def aload_related_objects(self, context):
+        """Load objects related to the contact and append them into the context."""
+        backend = get_backend()
+        data = context[self._registry_objects_key]["contact"]  # detail, type, label, href
+        registry_object = data["detail"]
+        tasks: Dict[str, Awaitable[Any]] = {
+            "descriptions": self._aget_status_descriptions("contact", backend.get_contact_status_descriptions),
+        }
+        if registry_object.creating_registrar_handle:
+            tasks["creating_registrar"] = run_sync(backend.get_registrar_by_handle)(
+                registry_object.creating_registrar_handle)
+        if registry_object.sponsoring_registrar_handle:
+            tasks["sponsoring_registrar"] = run_sync(backend.get_registrar_by_handle)(
+                registry_object.sponsoring_registrar_handle)
+        results = await gather_mapping(tasks)
+        self._append_statuses(data, results.pop("descriptions"))
+        data.update(results)
+
+
+class AsyncContactDetailView(AsyncContactDetailMixin, TemplateView):
+    """Asynchronous view with details of a contact."""
@@ -16,8 +16,9 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
+import asyncio
 import re
-from typing import Any, Dict, cast
+from typing import Any, Awaitable, Dict, cast
 
 import idna
 from django.urls import reverse
@@ -27,10 +28,11 @@ from fred_idl.Registry.Whois import (INVALID_LABEL, OBJECT_DELETE_CANDIDATE, OBJ
                                      UNMANAGED_ZONE, Domain)
 
 from webwhois.constants import STATUS_DELETE_CANDIDATE
-from webwhois.utils import WHOIS
+from webwhois.utils.backend import get_backend
 from webwhois.utils.cdnskey_client import get_cdnskey_client
-from webwhois.views import KeysetDetailMixin, NssetDetailMixin
-from webwhois.views.base import RegistryObjectMixin
+from webwhois.utils.executor import gather_mapping, run_sync
+from webwhois.views import AsyncKeysetDetailMixin, AsyncNssetDetailMixin, KeysetDetailMixin, NssetDetailMixin
+from webwhois.views.base import AsyncRegistryObjectMixin, RegistryObjectMixin
 
 from ..context_processors import _get_managed_zones
 from ..exceptions import WebwhoisError
@@ -65,7 +67,7 @@ class DomainDetailMixin(RegistryObjectMixin):
 
         try:
             context[cls._registry_objects_key]["domain"] = {
-                "detail": WHOIS.get_domain_by_handle(idna_handle),
+                "detail": get_backend().get_domain_by_handle(idna_handle),
                 "label": _("Domain"),
             }
         except OBJECT_DELETE_CANDIDATE:
@@ -110,7 +112,7 @@ class DomainDetailMixin(RegistryObjectMixin):
             raise WebwhoisError(**self.message_invalid_handle(handle, "IDNAError"))
 
         try:
-            return WHOIS.get_domain_by_handle(idna_handle)
+            return get_backend().get_domain_by_handle(idna_handle)
         except OBJECT_DELETE_CANDIDATE:
             return Domain(handle, None, (), None, None, None, ['deleteCandidate'], None, None, None, None, None, None,
                           None, None, None)
@@ -158,7 +160,8 @@ class DomainDetailMixin(RegistryObjectMixin):
 
     def load_related_objects(self, context):
         """Load objects related to the domain and append them into the context."""
-        descriptions = self._get_status_descriptions("domain", WHOIS.get_domain_status_descriptions)
+        backend = get_backend()
+        descriptions = self._get_status_descriptions("domain", backend.get_domain_status_descriptions)
         data = context[self._registry_objects_key]["domain"]  # detail, type, label, href
         if data is None:
             # Domain is a delete candidate
@@ -168,15 +171,15 @@ class DomainDetailMixin(RegistryObjectMixin):
         if STATUS_DELETE_CANDIDATE in registry_object.statuses:
             return
         data.update({
-            "registrant": WHOIS.get_contact_by_handle(registry_object.registrant_handle),
-            "registrar": WHOIS.get_registrar_by_handle(registry_object.registrar_handle),
-            "admins": [WHOIS.get_contact_by_handle(handle) for handle in registry_object.admin_contact_handles],
+            "registrant": backend.get_contact_by_handle(registry_object.registrant_handle),
+            "registrar": backend.get_registrar_by_handle(registry_object.registrar_handle),
+            "admins": [backend.get_contact_by_handle(handle) for handle in registry_object.admin_contact_handles],
         })
         if registry_object.nsset_handle:
-            data["nsset"] = {"detail": WHOIS.get_nsset_by_handle(registry_object.nsset_handle)}
+            data["nsset"] = {"detail": backend.get_nsset_by_handle(registry_object.nsset_handle)}
             NssetDetailMixin.append_nsset_related(data["nsset"])
         if registry_object.keyset_handle:
-            data["keyset"] = {"detail": WHOIS.get_keyset_by_handle(registry_object.keyset_handle)}
+            data["keyset"] = {"detail": backend.get_keyset_by_handle(registry_object.keyset_handle)}
             KeysetDetailMixin.append_keyset_related(data["keyset"])
 
 
@@ -188,3 +191,59 @@ class DomainDetailView(DomainDetailMixin, TemplateView):
         if get_cdnskey_client() is not None:
             context['scan_results_link'] = reverse('webwhois:scan_results', kwargs={'handle': handle})
         return context
+
+
+class AsyncDomainDetailMixin(AsyncRegistryObjectMixin, DomainDetailMixin):
+    """Asynchronous variant of `DomainDetailMixin`."""
+
+    async def aload_context_data(self, context: Dict[str, Any]) -> None:
+        """Load managed zones listed on the page of unmanaged zone."""
+        if getattr(context.get('server_exception'), 'code', None) == 'UNMANAGED_ZONE':
+            await run_sync(_get_managed_zones)()
+
+    async def aload_related_objects(self, context):
+        """Load objects related to the domain and append them into the context."""
+        data = context[self._registry_objects_key]["domain"]  # detail, type, label, href
+        if data is None:
+            # Domain is a delete candidate
+            return
+        backend = get_backend()
+        registry_object = data["detail"]
+        tasks: Dict[str, Awaitable[Any]] = {
+            "descriptions": self._aget_status_descriptions("domain", backend.get_domain_status_descriptions),
+        }
+        if STATUS_DELETE_CANDIDATE not in registry_object.statuses:
+            get_contact = run_sync(backend.get_contact_by_handle)
+            tasks.update({
+                "registrant": get_contact(registry_object.registrant_handle),
+                "registrar": run_sync(backend.get_registrar_by_handle)(registry_object.registrar_handle),
+                "admins": asyncio.gather(*(get_contact(handle) for handle in registry_object.admin_contact_handles)),
+            })
+            if registry_object.nsset_handle:
+                tasks["nsset"] = self._aget_nsset(registry_object.nsset_handle)
+            if registry_object.keyset_handle:
+                tasks["keyset"] = self._aget_keyset(registry_object.keyset_handle)
+        results = await gather_mapping(tasks)
+        descriptions = results.pop("descriptions")
+        data["status_descriptions"] = [descriptions[key] for key in registry_object.statuses]
+        if "admins" in results:
+            results["admins"] = list(results["admins"])
+        data.update(results)
+
+    @staticmethod
+    async def _aget_nsset(handle: str) -> Dict[str, Any]:
+        """Return context of the nsset with its related objects."""
+        nsset = {"detail": await run_sync(get_backend().get_nsset_by_handle)(handle)}
+        await AsyncNssetDetailMixin.aappend_nsset_related(nsset)
+        return nsset
+
+    @staticmethod
+    async def _aget_keyset(handle: str) -> Dict[str, Any]:
+        """Return context of the keyset with its related objects."""
+        keyset = {"detail": await run_sync(get_backend().get_keyset_by_handle)(handle)}
+        await AsyncKeysetDetailMixin.aappend_keyset_related(keyset)
+        return keyset
+
+
+class AsyncDomainDetailView(AsyncDomainDetailMixin, DomainDetailView):
+    """Asynchronous view with details of a domain."""
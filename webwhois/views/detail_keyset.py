@@ -16,14 +16,16 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
+import asyncio
 from typing import Any, Dict
 
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import TemplateView
 from fred_idl.Registry.Whois import INVALID_HANDLE, OBJECT_NOT_FOUND
 
-from webwhois.utils import WHOIS
-from webwhois.views.base import RegistryObjectMixin
+from webwhois.utils.backend import get_backend
+from webwhois.utils.executor import run_sync
+from webwhois.views.base import AsyncRegistryObjectMixin, RegistryObjectMixin
 
 from ..exceptions import WebwhoisError
 
@@ -36,11 +38,12 @@ class KeysetDetailMixin(RegistryObjectMixin):
     @classmethod
     def append_keyset_related(cls, data):
         """Load objects related to the nsset and append them into the data context."""
-        descriptions = cls._get_status_descriptions("keyset", WHOIS.get_keyset_status_descriptions)
+        backend = get_backend()
+        descriptions = cls._get_status_descriptions("keyset", backend.get_keyset_status_descriptions)
         registry_object = data["detail"]
         data.update({
-            "admins": [WHOIS.get_contact_by_handle(handle) for handle in registry_object.tech_contact_handles],
-            "registrar": WHOIS.get_registrar_by_handle(registry_object.registrar_handle),
+            "admins": [backend.get_contact_by_handle(handle) for handle in registry_object.tech_contact_handles],
+            "registrar": backend.get_registrar_by_handle(registry_object.registrar_handle),
             "status_descriptions": [descriptions[key] for key in registry_object.statuses],
         })
 
@@ -49,7 +52,7 @@ class KeysetDetailMixin(RegistryObjectMixin):
         """Load keyset of the handle and append it into the context."""
         try:
             context[cls._registry_objects_key]["keyset"] = {
-                "detail": WHOIS.get_keyset_by_handle(handle),
+                "detail": get_backend().get_keyset_by_handle(handle),
                 "label": _("Keyset"),
             }
         except OBJECT_NOT_FOUND as error:
@@ -63,7 +66,7 @@ class KeysetDetailMixin(RegistryObjectMixin):
 
     def _get_object(self, handle: str) -> Any:
         try:
-            return WHOIS.get_keyset_by_handle(handle)
+            return get_backend().get_keyset_by_handle(handle)
         except OBJECT_NOT_FOUND as error:
             raise WebwhoisError(
                 'OBJECT_NOT_FOUND',
@@ -86,3 +89,32 @@ class KeysetDetailMixin(RegistryObjectMixin):
 
 class KeysetDetailView(KeysetDetailMixin, TemplateView):
     """View with details of a keyset."""
+
+
+class AsyncKeysetDetailMixin(AsyncRegistryObjectMixin, KeysetDetailMixin):
+    """Asynchronous variant of `KeysetDetailMixin`."""
+
+    @classmethod
+    async def aappend_keyset_related(cls, data):
+        """Load objects related to the keyset and append them into the data context."""
+        backend = get_backend()
+        registry_object = data["detail"]
+        get_contact = run_sync(backend.get_contact_by_handle)
+        descriptions, admins, registrar = await asyncio.gather(
+            cls._aget_status_descriptions("keyset", backend.get_keyset_status_descriptions),
+            asyncio.gather(*(get_contact(handle) for handle in registry_object.tech_contact_handles)),
+            run_sync(backend.get_registrar_by_handle)(registry_object.registrar_handle),
+        )
+        data.update({
+            "admins": list(admins),
+            "registrar": registrar,
+            "status_descriptions": [descriptions[key] for key in registry_object.statuses],
+        })
+
+    async def aload_related_objects(self, context):
+        """Load objects related to the keyset and append them into the context."""
+        await self.aappend_keyset_related(context[self._registry_objects_key]["keyset"])
+
+
+class AsyncKeysetDetailView(AsyncKeysetDetailMixin, TemplateView):
+    """Asynchronous view with details of a keyset."""
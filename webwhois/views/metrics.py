@@ -0,0 +1,34 @@
+#
+# Copyright (C) 2022  CZ.NIC, z. s. p. o.
+#
+# This file is part of FRED.
+#
+# FRED is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# FRED is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with FRED.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Prometheus metrics view."""
+from django.http import Http404, HttpRequest, HttpResponse
+from django.views.generic import View
+
+from webwhois.settings import WEBWHOIS_SETTINGS
+from webwhois.utils.metrics import generate_metrics
+
+
+class MetricsView(View):
+    """Expose Prometheus metrics, if `WEBWHOIS_METRICS` is set."""
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        if not WEBWHOIS_SETTINGS.METRICS:
+            raise Http404('Metrics are disabled.')
+        content, content_type = generate_metrics()
+        return HttpResponse(content, content_type=content_type)
@@ -38,6 +38,7 @@ from webwhois.forms.public_request import (CONFIRMATION_METHOD_IDL_MAP, LOCK_TYP
                                            LOCK_TYPE_URL_PARAM, SEND_TO_CUSTOM, SEND_TO_IN_REGISTRY)
 from webwhois.forms.widgets import DeliveryType
 from webwhois.utils.corba_wrapper import PUBLIC_REQUEST, PUBLIC_REQUESTS_LOGGER, SECRETARY_CLIENT
+from webwhois.utils.instrumentation import record_cache_access
 from webwhois.utils.public_response import BlockResponse, PersonalInfoResponse, PublicResponse, SendPasswordResponse
 from webwhois.views.base import BaseContextMixin
 from webwhois.views.public_request_mixin import PublicRequestFormView, PublicRequestKnownException
@@ -270,6 +271,7 @@ class PublicResponseMixin:
         if self._public_response is None:
             public_key = self.kwargs['public_key']
             public_response = cache.get(public_key)
+            record_cache_access('public_response', hit=public_response is not None)
             if public_response is None:
                 raise PublicResponseNotFound(public_key)
             self._public_response = public_response
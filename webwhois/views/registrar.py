@@ -16,6 +16,7 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
+import asyncio
 import random
 import warnings
 from typing import Any, Dict, Optional, cast
@@ -25,8 +26,10 @@ from django.utils.translation import gettext_lazy as _
 from django.views.generic import TemplateView, View
 from fred_idl.Registry.Whois import INVALID_HANDLE, OBJECT_NOT_FOUND
 
-from webwhois.utils import FILE_MANAGER, WHOIS
-from webwhois.views.base import BaseContextMixin, RegistryObjectMixin
+from webwhois.utils import FILE_MANAGER
+from webwhois.utils.backend import get_backend
+from webwhois.utils.executor import run_sync
+from webwhois.views.base import AsyncRegistryObjectMixin, AsyncViewMixin, BaseContextMixin, RegistryObjectMixin
 
 from ..exceptions import WebwhoisError
 from ..utils.deprecation import deprecated_context
@@ -43,7 +46,7 @@ class RegistrarDetailMixin(RegistryObjectMixin):
         """Load registrar of the handle and append it into the context."""
         try:
             context[cls._registry_objects_key]["registrar"] = {
-                "detail": WHOIS.get_registrar_by_handle(handle),
+                "detail": get_backend().get_registrar_by_handle(handle),
                 "label": _("Registrar"),
             }
         except OBJECT_NOT_FOUND as error:
@@ -57,7 +60,7 @@ class RegistrarDetailMixin(RegistryObjectMixin):
 
     def _get_object(self, handle: str) -> Any:
         try:
-            return WHOIS.get_registrar_by_handle(handle)
+            return get_backend().get_registrar_by_handle(handle)
         except OBJECT_NOT_FOUND as error:
             raise WebwhoisError(
                 'OBJECT_NOT_FOUND',
@@ -78,6 +81,14 @@ class RegistrarDetailView(RegistrarDetailMixin, TemplateView):
     """View with details of a registrar."""
 
 
+class AsyncRegistrarDetailMixin(AsyncRegistryObjectMixin, RegistrarDetailMixin):
+    """Asynchronous variant of `RegistrarDetailMixin`."""
+
+
+class AsyncRegistrarDetailView(AsyncRegistrarDetailMixin, TemplateView):
+    """Asynchronous view with details of a registrar."""
+
+
 class RegistrarListMixin(BaseContextMixin):
     """Mixin for a list of registrars.
 
@@ -90,6 +101,7 @@ class RegistrarListMixin(BaseContextMixin):
     def __init__(self, *args, **kwargs):
         super(RegistrarListMixin, self).__init__(*args, **kwargs)
         # Caches for backend responses
+        self._registrars = None
         self._groups = None
         self._certifications = None
 
@@ -98,7 +110,9 @@ class RegistrarListMixin(BaseContextMixin):
 
         Results are filtered according to `group_name` attribute.
         """
-        registrars = WHOIS.get_registrars()
+        if self._registrars is None:
+            self._registrars = get_backend().get_registrars()
+        registrars = self._registrars
         if self.group_name:
             groups = self.get_groups()
             if self.group_name not in groups:
@@ -110,13 +124,14 @@ class RegistrarListMixin(BaseContextMixin):
     def get_groups(self):
         """Return dictionary of registrar groups."""
         if self._groups is None:
-            self._groups = {group.name: group for group in WHOIS.get_registrar_groups()}
+            self._groups = {group.name: group for group in get_backend().get_registrar_groups()}
         return self._groups
 
     def get_certifications(self):
         """Return dictionary of registrar certifications."""
         if self._certifications is None:
-            self._certifications = {cert.registrar_handle: cert for cert in WHOIS.get_registrar_certification_list()}
+            self._certifications = {cert.registrar_handle: cert
+                                    for cert in get_backend().get_registrar_certification_list()}
         return self._certifications
 
     def get_registrar_context(self, registrar):
@@ -165,6 +180,29 @@ class RegistrarListView(RegistrarListMixin, TemplateView):
     """View with list of a registrars."""
 
 
+class AsyncRegistrarListMixin(AsyncViewMixin, RegistrarListMixin):
+    """Asynchronous variant of `RegistrarListMixin`.
+
+    Registrars, their groups and certifications are fetched concurrently.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        backend = get_backend()
+        registrars, groups, certifications = await asyncio.gather(
+            run_sync(backend.get_registrars)(),
+            run_sync(backend.get_registrar_groups)(),
+            run_sync(backend.get_registrar_certification_list)(),
+        )
+        self._registrars = registrars
+        self._groups = {group.name: group for group in groups}
+        self._certifications = {cert.registrar_handle: cert for cert in certifications}
+        return super().get(request, *args, **kwargs)
+
+
+class AsyncRegistrarListView(AsyncRegistrarListMixin, TemplateView):
+    """Asynchronous view with list of a registrars."""
+
+
 class DownloadEvalFileView(View):
     def _serve_file(self, file_id):
         # file_info: ccReg.FileInfo(id=1, name='test.txt', path='2015/12/9/1', mimetype='text/plain', filetype=6,
@@ -182,7 +220,7 @@ class DownloadEvalFileView(View):
         return response
 
     def get(self, request, handle):
-        for cert in WHOIS.get_registrar_certification_list():
+        for cert in get_backend().get_registrar_certification_list():
             # cert: Registry.Whois.RegistrarCertification(registrar_handle='REG-FRED_A', score=2, evaluation_file_id=1L)
             if cert.registrar_handle == handle:
                 return self._serve_file(cert.evaluation_file_id)
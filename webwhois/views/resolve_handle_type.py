@@ -16,8 +16,10 @@
 # You should have received a copy of the GNU General Public License
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
+import asyncio
 from contextlib import suppress
-from typing import Any, Dict
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple, Type
 
 import idna
 from django.http import HttpResponseRedirect
@@ -27,9 +29,10 @@ from django.views.generic import TemplateView
 from fred_idl.Registry.Whois import (INVALID_HANDLE, INVALID_LABEL, OBJECT_DELETE_CANDIDATE, OBJECT_NOT_FOUND,
                                      TOO_MANY_LABELS, UNMANAGED_ZONE)
 
-from webwhois.utils import WHOIS
+from webwhois.utils.backend import get_backend
+from webwhois.utils.executor import run_sync
 from webwhois.views import ContactDetailMixin, DomainDetailMixin, KeysetDetailMixin, NssetDetailMixin
-from webwhois.views.base import RegistryObjectMixin
+from webwhois.views.base import AsyncRegistryObjectMixin, RegistryObjectMixin
 from webwhois.views.registrar import RegistrarDetailMixin
 
 from ..context_processors import _get_managed_zones
@@ -78,30 +81,45 @@ class ResolveHandleTypeMixin(RegistryObjectMixin):
                       current_app=self.request.resolver_match.namespace)
         context.setdefault("redirect_to_type", url)
 
-    def _get_object(self, handle: str) -> Any:
-        objects = {}
-        with suppress(OBJECT_NOT_FOUND, INVALID_HANDLE):
-            objects['contact'] = WHOIS.get_contact_by_handle(handle)
-        with suppress(OBJECT_NOT_FOUND, INVALID_HANDLE):
-            objects['nsset'] = WHOIS.get_nsset_by_handle(handle)
-        with suppress(OBJECT_NOT_FOUND, INVALID_HANDLE):
-            objects['keyset'] = WHOIS.get_keyset_by_handle(handle)
-        with suppress(OBJECT_NOT_FOUND, INVALID_HANDLE):
-            objects['registrar'] = WHOIS.get_registrar_by_handle(handle)
+    def _get_lookups(self, handle: str) -> List[Tuple[str, Callable[[], Any], Tuple[Type[Exception], ...]]]:
+        """Return lookups of the handle as triples of object type, lookup function and ignored errors."""
+        backend = get_backend()
+        lookups = [
+            ('contact', partial(backend.get_contact_by_handle, handle), (OBJECT_NOT_FOUND, INVALID_HANDLE)),
+            ('nsset', partial(backend.get_nsset_by_handle, handle), (OBJECT_NOT_FOUND, INVALID_HANDLE)),
+            ('keyset', partial(backend.get_keyset_by_handle, handle), (OBJECT_NOT_FOUND, INVALID_HANDLE)),
+            ('registrar', partial(backend.get_registrar_by_handle, handle), (OBJECT_NOT_FOUND, INVALID_HANDLE)),
+        ]  # type: List[Tuple[str, Callable[[], Any], Tuple[Type[Exception], ...]]]
         if not handle.startswith("."):
-            with suppress(OBJECT_NOT_FOUND, UNMANAGED_ZONE, INVALID_LABEL, TOO_MANY_LABELS, idna.IDNAError):
+            with suppress(idna.IDNAError):
                 idna_handle = idna.encode(handle).decode()
-                try:
-                    objects['domain'] = WHOIS.get_domain_by_handle(idna_handle)
-                except OBJECT_DELETE_CANDIDATE:
-                    objects['domain'] = None
+                lookups.append(('domain', partial(self._get_domain, idna_handle),
+                                (OBJECT_NOT_FOUND, UNMANAGED_ZONE, INVALID_LABEL, TOO_MANY_LABELS)))
+        return lookups
+
+    @staticmethod
+    def _get_domain(idna_handle: str) -> Any:
+        """Return domain or `None` if it's a delete candidate."""
+        try:
+            return get_backend().get_domain_by_handle(idna_handle)
+        except OBJECT_DELETE_CANDIDATE:
+            return None
+
+    def _make_not_found_error(self, handle: str) -> WebwhoisError:
+        return WebwhoisError(
+            code="OBJECT_NOT_FOUND",
+            title=_("Record not found"),
+            message=self.message_with_handle_in_html(_("%s does not match any record."), handle),
+            object_not_found=True,
+        )
+
+    def _get_object(self, handle: str) -> Any:
+        objects = {}
+        for type_name, lookup, errors in self._get_lookups(handle):
+            with suppress(*errors):
+                objects[type_name] = lookup()
         if not objects:
-            raise WebwhoisError(
-                code="OBJECT_NOT_FOUND",
-                title=_("Record not found"),
-                message=self.message_with_handle_in_html(_("%s does not match any record."), handle),
-                object_not_found=True,
-            )
+            raise self._make_not_found_error(handle)
         return objects
 
     def _make_context(self, obj: Dict[str, Any]) -> Dict[str, Any]:
@@ -132,3 +150,40 @@ class ResolveHandleTypeMixin(RegistryObjectMixin):
 
 class ResolveHandleTypeView(ResolveHandleTypeMixin, TemplateView):
     """View which searches all types of objects."""
+
+
+class AsyncResolveHandleTypeMixin(AsyncRegistryObjectMixin, ResolveHandleTypeMixin):
+    """Asynchronous variant of `ResolveHandleTypeMixin`.
+
+    Objects of all types are looked up concurrently.
+    """
+
+    async def aget_object(self) -> Any:
+        handle = self.kwargs['handle']
+        lookups = self._get_lookups(handle)
+        results = await asyncio.gather(*(self._alookup(lookup, errors) for _, lookup, errors in lookups))
+        objects = {type_name: obj for (type_name, _, _), (found, obj) in zip(lookups, results) if found}
+        if not objects:
+            raise self._make_not_found_error(handle)
+        return objects
+
+    @staticmethod
+    async def _alookup(lookup: Callable[[], Any], errors: Tuple[Type[Exception], ...]) -> Tuple[bool, Any]:
+        """Run the lookup and return whether an object was found and the object."""
+        try:
+            return True, await run_sync(lookup)()
+        except errors:
+            return False, None
+
+    async def aload_related_objects(self, context):
+        # No backend calls are made, just prepare the redirect.
+        self.load_related_objects(context)
+
+    async def aload_context_data(self, context: Dict[str, Any]) -> None:
+        """Load managed zones listed on the page of not found object."""
+        if getattr(context.get('server_exception'), 'code', None) == 'OBJECT_NOT_FOUND':
+            await run_sync(_get_managed_zones)()
+
+
+class AsyncResolveHandleTypeView(AsyncResolveHandleTypeMixin, TemplateView):
+    """Asynchronous view which searches all types of objects."""
@@ -17,30 +17,141 @@
 # along with FRED.  If not, see <https://www.gnu.org/licenses/>.
 #
 """Views for cdnskey scan results."""
-import operator
-from datetime import datetime
-from typing import Any, Dict, Optional, cast
+import asyncio
+import csv
+import hashlib
+import heapq
+import itertools
+import json
+from collections import Counter
+from concurrent.futures import Future
+from datetime import date, datetime, time, timedelta
+from operator import itemgetter
+from typing import Any, AsyncIterator, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple, Union, cast
 
 import idna
-from django.http import Http404
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
 from django.views.generic import TemplateView
 from omniORB import CORBA
 
-from webwhois.utils import WHOIS
+from webwhois.forms import ScanResultsFilterForm
+from webwhois.settings import WEBWHOIS_SETTINGS
+from webwhois.utils.backend import get_backend
+from webwhois.utils.codec import cache_get, cache_set
 from webwhois.utils.corba_wrapper import LOGGER
+from webwhois.utils.executor import run_sync, submit, sync_context
 
 from ..constants import LogEntryType, LogResult
-from ..utils.cdnskey_client import get_cdnskey_client
-from .base import BaseContextMixin
+from ..utils.cdnskey_client import get_async_cdnskey_client, get_cdnskey_client
+from .base import AsyncViewMixin, BaseContextMixin
 
 
-class ScanResultsView(BaseContextMixin, TemplateView):
-    """Provides a list of results from cdnskey scan results."""
+class ScanResultsSelection:
+    """Base class for selections of scan results computed in a single streaming pass."""
+
+    def __init__(self):
+        self.count = 0
+
+    def add(self, scan_result: Dict[str, Any]) -> None:
+        """Add scan result to the selection."""
+        raise NotImplementedError
+
+
+class NewestScanResults(ScanResultsSelection):
+    """Streaming selection of the newest scan results.
+
+    Only `size` results are kept in a heap, so memory doesn't depend on the length of the scan history.
+    """
+
+    def __init__(self, size: int):
+        super().__init__()
+        self.size = size
+        self._heap: List[Tuple[datetime, int, Dict[str, Any]]] = []
+
+    def add(self, scan_result: Dict[str, Any]) -> None:
+        # The counter keeps the order of results scanned at the same time.
+        item = (scan_result['scan_at'], self.count, scan_result)
+        self.count += 1
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, item)
+        else:
+            heapq.heappushpop(self._heap, item)
+
+    def get_results(self) -> List[Dict[str, Any]]:
+        """Return selected results sorted by scan time."""
+        return [scan_result for _, _, scan_result in sorted(self._heap)]
+
+
+class ScanResultsSummary(ScanResultsSelection):
+    """Streaming summary of scan results.
+
+    Only the latest result of each name server address and counts of statuses are kept.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.status_counts: Counter = Counter()
+        self._latest: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def add(self, scan_result: Dict[str, Any]) -> None:
+        """Add scan result to the summary."""
+        self.count += 1
+        self.status_counts[scan_result['cdnskey']['status']] += 1
+        key = (scan_result.get('nameserver') or '', scan_result.get('nameserver_ip') or '')
+        latest = self._latest.get(key)
+        # Later results of the same scan time win, as in the raw results.
+        if latest is None or scan_result['scan_at'] >= latest['scan_at']:
+            self._latest[key] = scan_result
+
+    def get_latest(self) -> List[Dict[str, Any]]:
+        """Return the latest result of each name server address sorted by the name server."""
+        return [self._latest[key] for key in sorted(self._latest)]
+
+    def get_status_counts(self) -> List[Tuple[Any, int]]:
+        """Return statuses with their counts, the most common first."""
+        return self.status_counts.most_common()
+
+
+class CacheableScanResults:
+    """Collection of all scan results of a domain, which is dropped if it grows over `max_size`."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.results: Optional[List[Dict[str, Any]]] = []
+
+    def add(self, scan_result: Dict[str, Any]) -> None:
+        """Add scan result to the collection."""
+        if self.results is not None:
+            self.results.append(scan_result)
+            if len(self.results) > self.max_size:
+                self.results = None
+
+
+class BaseScanResultsView(BaseContextMixin, TemplateView):
+    """Base view for cdnskey scan results of a domain.
+
+    Scan results are streamed in a single pass into a selection, see `get_selection`.
+    Results of a domain may be cached until the end of the current scan period, see `get_cache_timeout`.
+    """
 
-    template_name = 'webwhois/scan_results.html'
     request_type = LogEntryType.SCAN_RESULTS
     result_success = LogResult.SUCCESS
     result_not_found = LogResult.NOT_FOUND
+    cache_not_found = 'NOT_FOUND'
+    # Maximal number of scan results buffered while the domain registration is looked up.
+    registered_buffer_size = 1000
+
+    def get_window(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Return the date window as a half-open interval of datetimes."""
+        return None, None
+
+    def get_selection(self) -> ScanResultsSelection:
+        """Return an empty selection of scan results."""
+        raise NotImplementedError
 
     def get_domain_registered(self, handle: str) -> Optional[datetime]:
         """Return domain registration datetime."""
@@ -50,28 +161,403 @@ class ScanResultsView(BaseContextMixin, TemplateView):
             return None
 
         try:
-            domain = WHOIS.get_domain_by_handle(idna_handle)
+            domain = get_backend().get_domain_by_handle(idna_handle)
         except CORBA.Exception:
             return None
         return cast(datetime, domain.registered)
 
+    def _create_log_entry(self, handle: str) -> ContextManager[Any]:
+        """Return a context manager with a log entry for the scan results request."""
+        return LOGGER.create(self.request_type,
+                             source_ip=self.request.META.get('REMOTE_ADDR', ''),
+                             properties={'domain': handle})
+
+    @classmethod
+    def filter_registered(cls, scan_results: Iterable[Dict[str, Any]],
+                          domain_registered: 'Future[Optional[datetime]]') -> Iterator[Dict[str, Any]]:
+        """Yield scan results which aren't older than the domain.
+
+        Results are buffered only until the domain registration is known, the rest is filtered as it arrives.
+        If the buffer reaches `registered_buffer_size`, the lookup is awaited before the stream continues.
+        """
+        scan_results = iter(scan_results)
+        buffered = []
+        for scan_result in scan_results:
+            buffered.append(scan_result)
+            if domain_registered.done() or len(buffered) >= cls.registered_buffer_size:
+                break
+        registered = domain_registered.result()
+        for scan_result in itertools.chain(buffered, scan_results):
+            if registered is None or scan_result['scan_at'] >= registered:
+                yield scan_result
+
+    @staticmethod
+    def in_window(scan_result: Dict[str, Any], since: Optional[datetime], until: Optional[datetime]) -> bool:
+        """Return whether the scan result is within the date window."""
+        return (since is None or scan_result['scan_at'] >= since) and (until is None or scan_result['scan_at'] < until)
+
+    def get_cache_key(self, handle: str) -> str:
+        """Return cache key for scan results of the domain."""
+        return 'webwhois_scan_results_{}'.format(hashlib.sha1(handle.encode()).hexdigest())
+
+    @staticmethod
+    def get_cache_timeout() -> int:
+        """Return number of seconds until the end of the current scan period.
+
+        Scan periods are aligned to multiples of `SCAN_RESULTS_CACHE_TIMEOUT` since the epoch,
+        so all cached results expire at once, when new scan results are expected.
+        """
+        period = cast(int, WEBWHOIS_SETTINGS.SCAN_RESULTS_CACHE_TIMEOUT)
+        return period - int(timezone.now().timestamp()) % period
+
+    def get_cached_scan_results(self, handle: str) -> Optional[List[Dict[str, Any]]]:
+        """Return cached scan results of the domain sorted by scan time or `None` if they're not cached.
+
+        Raises:
+            Http404: If the domain is cached as not found.
+        """
+        if not WEBWHOIS_SETTINGS.SCAN_RESULTS_CACHE_TIMEOUT:
+            return None
+        scan_results = cache_get(cache, self.get_cache_key(handle), name='scan_results')
+        if scan_results == self.cache_not_found:
+            raise Http404('Scan results not found.')
+        return cast(Optional[List[Dict[str, Any]]], scan_results)
+
+    def get_cacheable(self) -> Optional[CacheableScanResults]:
+        """Return collection for scan results to be cached or `None` if cache is disabled."""
+        if not WEBWHOIS_SETTINGS.SCAN_RESULTS_CACHE_TIMEOUT:
+            return None
+        return CacheableScanResults(WEBWHOIS_SETTINGS.SCAN_RESULTS_CACHE_MAX_SIZE)
+
+    def set_cached_scan_results(self, handle: str, scan_results: Union[List[Dict[str, Any]], str]) -> None:
+        """Store scan results of the domain or a not found mark in the cache."""
+        if not WEBWHOIS_SETTINGS.SCAN_RESULTS_CACHE_TIMEOUT:
+            return
+        if not isinstance(scan_results, str):
+            scan_results = sorted(scan_results, key=itemgetter('scan_at'))
+        cache_set(cache, self.get_cache_key(handle), scan_results, self.get_cache_timeout())
+
+    def select_scan_results(self, scan_results: Iterable[Dict[str, Any]], since: Optional[datetime],
+                            until: Optional[datetime]) -> ScanResultsSelection:
+        """Return selection of scan results within the date window."""
+        selection = self.get_selection()
+        for scan_result in scan_results:
+            if self.in_window(scan_result, since, until):
+                selection.add(scan_result)
+        return selection
+
+    def iter_scan_results(self, client: Any, handle: str) -> Iterator[Dict[str, Any]]:
+        """Yield scan results of the domain which aren't older than the domain.
+
+        Results are taken from the cache, if possible. Otherwise they are streamed from the cdnskey processor
+        and cached, when the stream is exhausted.
+        """
+        cached = self.get_cached_scan_results(handle)
+        if cached is not None:
+            yield from cached
+            return
+
+        # Look up the domain while the scan results are streamed.
+        domain_registered = submit(self.get_domain_registered, handle)
+        cacheable = self.get_cacheable()
+        try:
+            for scan_result in self.filter_registered(client.raw_scan_results(handle), domain_registered):
+                if cacheable is not None:
+                    cacheable.add(scan_result)
+                yield scan_result
+        except Http404:
+            self.set_cached_scan_results(handle, self.cache_not_found)
+            raise
+        if cacheable is not None and cacheable.results is not None:
+            self.set_cached_scan_results(handle, cacheable.results)
+
+    def get_scan_results(self, handle: str) -> ScanResultsSelection:
+        """Return selection of scan results of the domain."""
+        client = get_cdnskey_client()
+        if client is None:
+            raise Http404('Cdnskey processor not defined.')
+
+        with self._create_log_entry(handle) as log_entry:
+            try:
+                since, until = self.get_window()
+                selection = self.select_scan_results(self.iter_scan_results(client, handle), since, until)
+                log_entry.result = self.result_success
+            except Http404:
+                log_entry.result = self.result_not_found
+                raise
+        return selection
+
+
+class ScanResultsView(BaseScanResultsView):
+    """Provides a list of raw results from cdnskey scan results.
+
+    Results are paginated from the newest ones, each page is sorted by scan time.
+    """
+
+    template_name = 'webwhois/scan_results.html'
+    form_class = ScanResultsFilterForm
+
+    _form: Optional[ScanResultsFilterForm] = None
+
+    def get_paginate_by(self) -> int:
+        """Return number of scan results on a page."""
+        return cast(int, WEBWHOIS_SETTINGS.SCAN_RESULTS_PAGE_SIZE)
+
+    def get_max_pages(self) -> int:
+        """Return maximal number of pages, older scan results aren't displayed."""
+        return cast(int, WEBWHOIS_SETTINGS.SCAN_RESULTS_MAX_PAGES)
+
+    def get_page_number(self) -> int:
+        """Return the requested page number."""
+        try:
+            page = int(self.request.GET.get('page', 1))
+        except ValueError:
+            return 1
+        return min(max(page, 1), self.get_max_pages())
+
+    def get_form(self) -> ScanResultsFilterForm:
+        """Return form with a date window."""
+        if self._form is None:
+            self._form = self.form_class(self.request.GET)
+            self._form.is_valid()
+        return self._form
+
+    def get_window(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        cleaned_data = self.get_form().cleaned_data
+        since, until = cleaned_data.get('since'), cleaned_data.get('until')
+        return (self._get_day_start(since) if since else None,
+                self._get_day_start(until + timedelta(days=1)) if until else None)
+
+    @staticmethod
+    def _get_day_start(value: date) -> datetime:
+        # Scan times are always aware.
+        return cast(datetime, timezone.make_aware(datetime.combine(value, time.min)))
+
+    def get_selection_size(self) -> int:
+        """Return number of the newest scan results required to display the requested page."""
+        return self.get_page_number() * self.get_paginate_by()
+
+    def get_selection(self) -> NewestScanResults:
+        return NewestScanResults(self.get_selection_size())
+
+    def get_context_data(self, **kwargs) -> Dict[str, Any]:
+        context = cast(Dict[str, Any], super().get_context_data(**kwargs))
+        selection = cast(NewestScanResults, self.get_scan_results(self.kwargs['handle']))
+        scan_results = selection.get_results()
+
+        paginate_by = self.get_paginate_by()
+        paginator = Paginator(range(min(selection.count, self.get_max_pages() * paginate_by)), paginate_by)
+        page = paginator.get_page(self.get_page_number())
+        # Pages are counted from the newest results.
+        end = len(scan_results) - (page.number - 1) * paginate_by
+        page.object_list = scan_results[max(end - paginate_by, 0):end]
+
+        query = self.request.GET.copy()
+        query.pop('page', None)
+        context.update({
+            'scan_results': page.object_list,
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'page_query': query.urlencode(),
+            'form': self.get_form(),
+        })
+        return context
+
+
+class ScanResultsSummaryView(BaseScanResultsView):
+    """Provides a summary of cdnskey scan results.
+
+    Only the latest result of each name server address and counts of statuses are displayed.
+    """
+
+    template_name = 'webwhois/scan_results_summary.html'
+
+    def get_selection(self) -> ScanResultsSummary:
+        return ScanResultsSummary()
+
     def get_context_data(self, **kwargs) -> Dict[str, Any]:
         context = cast(Dict[str, Any], super().get_context_data(**kwargs))
+        summary = cast(ScanResultsSummary, self.get_scan_results(self.kwargs['handle']))
+        context.update({
+            'scan_results': summary.get_latest(),
+            'status_counts': summary.get_status_counts(),
+            'scan_results_count': summary.count,
+        })
+        return context
+
+
+class _Echo:
+    """File-like object, which returns written values, see `csv.writer`."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+class ScanResultsExportView(BaseScanResultsView):
+    """Streams all scan results of a domain as NDJSON or CSV.
+
+    Scan results are streamed as they arrive from the cdnskey processor, they aren't sorted.
+    """
+
+    content_types = {
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson',
+    }
+    csv_fields = ('scan_at', 'worker_name', 'nameserver', 'nameserver_ip', 'status', 'flags', 'alg', 'proto',
+                  'public_key')
+
+    def get(self, request, *args, **kwargs):
+        export_format = kwargs['format']
+        if export_format not in self.content_types:
+            raise Http404('Unknown export format.')
+
+        rows = self.stream_scan_results(kwargs['handle'])
+        # Start the stream, so errors, e.g. unknown domain, are returned before the response.
+        try:
+            first = next(rows)
+        except StopIteration:
+            rows = iter(())
+        else:
+            rows = itertools.chain((first, ), rows)
 
+        encode = self.encode_csv if export_format == 'csv' else self.encode_ndjson
+        response = StreamingHttpResponse(encode(rows), content_type=self.content_types[export_format])
+        response['Content-Disposition'] = 'attachment; filename="scan-results.{}"'.format(export_format)
+        return response
+
+    def stream_scan_results(self, handle: str) -> Iterator[Dict[str, Any]]:
+        """Yield serialized scan results of the domain."""
         client = get_cdnskey_client()
         if client is None:
             raise Http404('Cdnskey processor not defined.')
 
-        with LOGGER.create(self.request_type, source_ip=self.request.META.get('REMOTE_ADDR', ''),
-                           properties={'domain': self.kwargs['handle']}) as log_entry:
+        with self._create_log_entry(handle) as log_entry:
             try:
-                scan_results = client.raw_scan_results(self.kwargs['handle'])
-                domain_registered = self.get_domain_registered(self.kwargs['handle'])
-                if domain_registered:
-                    scan_results = (r for r in scan_results if r['scan_at'] >= domain_registered)
-                context['scan_results'] = sorted(scan_results, key=operator.itemgetter('scan_at'))
+                for scan_result in self.iter_scan_results(client, handle):
+                    yield self.serialize(scan_result)
                 log_entry.result = self.result_success
             except Http404:
                 log_entry.result = self.result_not_found
                 raise
-        return context
+
+    @staticmethod
+    def serialize(scan_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Return scan result as a flat dictionary of plain values."""
+        cdnskey = scan_result['cdnskey']
+        return {
+            'scan_at': scan_result['scan_at'],
+            'worker_name': scan_result['worker_name'],
+            'nameserver': scan_result['nameserver'],
+            'nameserver_ip': scan_result['nameserver_ip'],
+            'status': cdnskey['status'].value,
+            'flags': int(cdnskey['flags']) if cdnskey.get('flags') is not None else None,
+            'alg': int(cdnskey['alg']) if cdnskey.get('alg') is not None else None,
+            'proto': cdnskey.get('proto'),
+            'public_key': cdnskey.get('public_key'),
+        }
+
+    def encode_csv(self, rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """Yield CSV lines with a header."""
+        writer = csv.DictWriter(_Echo(), fieldnames=self.csv_fields)
+        yield cast(str, writer.writeheader())
+        for row in rows:
+            yield cast(str, writer.writerow(dict(row, scan_at=row['scan_at'].isoformat())))
+
+    @staticmethod
+    def encode_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """Yield JSON lines."""
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+class AsyncScanResultsMixin(AsyncViewMixin, BaseScanResultsView):
+    """Asynchronous variant of `BaseScanResultsView`.
+
+    Scan results are streamed by an asynchronous cdnskey client.
+    """
+
+    _selection: Optional[ScanResultsSelection] = None
+
+    async def get(self, request, *args, **kwargs):
+        self._selection = await self.aget_scan_results(kwargs['handle'])
+        return super().get(request, *args, **kwargs)
+
+    async def aget_scan_results(self, handle: str) -> ScanResultsSelection:
+        """Return selection of scan results of the domain."""
+        client = get_async_cdnskey_client()
+        if client is None:
+            raise Http404('Cdnskey processor not defined.')
+
+        async with sync_context(self._create_log_entry(handle)) as log_entry:
+            try:
+                since, until = self.get_window()
+                cached = await run_sync(self.get_cached_scan_results)(handle)
+                if cached is not None:
+                    selection = self.select_scan_results(cached, since, until)
+                else:
+                    selection = await self._aload_scan_results(client, handle, since, until)
+                log_entry.result = self.result_success
+            except Http404:
+                log_entry.result = self.result_not_found
+                raise
+        return selection
+
+    async def _aload_scan_results(self, client: Any, handle: str, since: Optional[datetime],
+                                  until: Optional[datetime]) -> ScanResultsSelection:
+        """Stream scan results from the cdnskey processor and cache them, if possible."""
+        # Look up the domain while the scan results are streamed.
+        domain_registered = asyncio.ensure_future(run_sync(self.get_domain_registered)(handle))
+        selection = self.get_selection()
+        cacheable = self.get_cacheable()
+        try:
+            async for scan_result in self.afilter_registered(client.raw_scan_results(handle), domain_registered):
+                if cacheable is not None:
+                    cacheable.add(scan_result)
+                if self.in_window(scan_result, since, until):
+                    selection.add(scan_result)
+        except Http404:
+            await run_sync(self.set_cached_scan_results)(handle, self.cache_not_found)
+            raise
+        if cacheable is not None and cacheable.results is not None:
+            await run_sync(self.set_cached_scan_results)(handle, cacheable.results)
+        return selection
+
+    @classmethod
+    async def afilter_registered(cls, scan_results: AsyncIterator[Dict[str, Any]],
+                                 domain_registered: 'asyncio.Future[Optional[datetime]]',
+                                 ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield scan results which aren't older than the domain.
+
+        Results are buffered only until the domain registration is known, the rest is filtered as it arrives.
+        If the buffer reaches `registered_buffer_size`, the lookup is awaited before the stream continues.
+        """
+        try:
+            buffered = []
+            async for scan_result in scan_results:
+                buffered.append(scan_result)
+                if domain_registered.done() or len(buffered) >= cls.registered_buffer_size:
+                    break
+            registered = await domain_registered
+            for scan_result in buffered:
+                if registered is None or scan_result['scan_at'] >= registered:
+                    yield scan_result
+            async for scan_result in scan_results:
+                if registered is None or scan_result['scan_at'] >= registered:
+                    yield scan_result
+        finally:
+            # Don't leave the lookup behind, if the stream fails.
+            domain_registered.cancel()
+
+    def get_scan_results(self, handle: str) -> ScanResultsSelection:
+        # Scan results are already loaded in `get`.
+        assert self._selection is not None
+        return self._selection
+
+
+class AsyncScanResultsView(AsyncScanResultsMixin, ScanResultsView):
+    """Asynchronous variant of `ScanResultsView`."""
+
+
+class AsyncScanResultsSummaryView(AsyncScanResultsMixin, ScanResultsSummaryView):
+    """Asynchronous variant of `ScanResultsSummaryView`."""